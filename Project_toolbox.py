@@ -8,19 +8,2732 @@ Created on Thu Jan 30 12:30:09 2025
 import subprocess
 import sys
 import os
+import re
+import glob
+import json
+import time
+import gzip
+import shutil
+import shlex
+import hashlib
+import asyncio
+import pickle
+import marshal
+import socket
+import argparse
+import atexit
+import statistics
+import sysconfig
+import fnmatch
+import ast
+import tempfile
+import contextlib
+import contextvars
+import collections
+import itertools
+import functools
+import selectors
+import concurrent.futures
+import threading
+import http.client
+import importlib.metadata
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import NamedTuple
+
+# fcntl solo existe en sistemas tipo Unix, en Windows los bloqueos de archivos se omiten
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# resource solo existe en sistemas tipo Unix, en Windows no se mide el uso de recursos de los comandos
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# packaging es opcional, si no esta instalado se usa la copia incluida en pip
+try:
+    from packaging.version import Version, InvalidVersion
+    from packaging.specifiers import SpecifierSet, InvalidSpecifier
+    from packaging.requirements import Requirement, InvalidRequirement
+    from packaging.markers import default_environment
+except ImportError:
+    from pip._vendor.packaging.version import Version, InvalidVersion
+    from pip._vendor.packaging.specifiers import SpecifierSet, InvalidSpecifier
+    from pip._vendor.packaging.requirements import Requirement, InvalidRequirement
+    from pip._vendor.packaging.markers import default_environment
+
+# Almacenes de ambientes virtuales: plantillas, instantaneas y deduplicacion (Project_toolbox_stores.py)
+from Project_toolbox_stores import (VenvTemplateStore, VenvSnapshot, VenvSnapshotStore, DedupReport, VenvDedupStore,
+                                    print_dedup_report)
+
+# Directorio de trabajo del toolbox (caches compartidas entre proyectos)
+TOOLBOX_HOME = os.environ.get('PROJECT_TOOLBOX_HOME', os.path.join(os.path.expanduser('~'), '.project_toolbox'))
+
+# Indice de paquetes por defecto
+DEFAULT_INDEX_URL = 'https://pypi.org/simple/'
+
+# Directorio, junto a este archivo, de los programas que el toolbox ejecuta con el interprete de cada ambiente (proceso
+# auxiliar, compilacion de bytecode, lanzadores y proceso de trabajo). Los archivos .tmpl se completan con str.format
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Project_toolbox_scripts')
+
+
+# Funcion para leer uno de los programas de SCRIPTS_DIR
+@functools.lru_cache(maxsize=None)
+def _read_script(name:str) -> str:
+    with open(os.path.join(SCRIPTS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+# Trazas y tiempos de las operaciones ------------------------------------------------------------------------------------
+
+class Span(NamedTuple):
+    """
+    Intervalo medido de una operacion de Project (category='operation'), de un comando externo ('command')
+    o de una fase de pip ('phase'). start es la hora de inicio en segundos desde epoch, wall y cpu son duraciones
+    en segundos. attributes contiene datos adicionales, por ejemplo exit_code, child_cpu y max_rss_kb en los comandos.
+    """
+    name: str
+    category: str
+    start: float
+    wall: float
+    cpu: float|None
+    pid: int
+    tid: int
+    span_id: int
+    parent_id: int|None
+    attributes: dict
+
+
+# Intervalo en curso en el contexto actual, usado como padre de los intervalos anidados
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """
+    Registra intervalos de tiempo en un buffer circular de tamaño fijo, por lo que se puede dejar activo siempre:
+    cada intervalo cuesta unas pocas lecturas de reloj y los mas antiguos se descartan al llenarse el buffer.
+    Los intervalos se pueden exportar como JSON lines o en formato Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, max_spans:int=10000, enabled:bool=True):
+        """
+        :param max_spans: Numero maximo de intervalos guardados.
+        :param enabled: Indicador booleano, si es False no se registra nada.
+        """
+        self.enabled = enabled
+        self._spans = collections.deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+
+    @contextlib.contextmanager
+    def span(self, name:str, category:str='operation', **attributes):
+        """
+        Mide el bloque de codigo como un intervalo. Devuelve el diccionario de atributos para agregar datos al intervalo.
+
+        :param name: Nombre del intervalo.
+        :param category: Categoria del intervalo.
+        :param attributes: Atributos iniciales.
+        """
+        if not self.enabled:
+            yield attributes
+            return
+
+        span_id = next(self._ids)
+        parent_id = _current_span.get()
+        token = _current_span.set(span_id)
+        start = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes['error'] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self._spans.append(Span(name, category, start, time.perf_counter() - wall_start, time.thread_time() - cpu_start,
+                                    os.getpid(), threading.get_ident(), span_id, parent_id, attributes))
+
+    def record(self, name:str, category:str, start:float, wall:float, **attributes):
+        """
+        Registra un intervalo ya medido como hijo del intervalo en curso.
+
+        :param name: Nombre del intervalo.
+        :param category: Categoria del intervalo.
+        :param start: Hora de inicio en segundos desde epoch.
+        :param wall: Duracion en segundos.
+        :param attributes: Atributos del intervalo.
+        """
+        if self.enabled:
+            self._spans.append(Span(name, category, start, wall, None, os.getpid(), threading.get_ident(),
+                                    next(self._ids), _current_span.get(), attributes))
+
+    def spans(self) -> list[Span]:
+        """
+        :return: Lista de intervalos registrados, en orden de finalizacion.
+        """
+        return list(self._spans)
+
+    def clear(self):
+        """
+        Elimina los intervalos registrados.
+        """
+        self._spans.clear()
+
+    def export_jsonl(self, path:str) -> int:
+        """
+        Guarda los intervalos en un archivo JSON lines, un objeto por linea.
+
+        :param path: Ruta del archivo.
+        :return: Numero de intervalos guardados.
+        """
+        spans = self.spans()
+        with open(path, 'w', encoding='utf-8') as file:
+            for span in spans:
+                file.write(json.dumps(span._asdict(), default=str) + '\n')
+        return len(spans)
+
+    def export_chrome_trace(self, path:str) -> int:
+        """
+        Guarda los intervalos en formato Chrome trace (eventos completos "X", tiempos en microsegundos).
+
+        :param path: Ruta del archivo.
+        :return: Numero de intervalos guardados.
+        """
+        spans = self.spans()
+        events = [{
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': round(span.start * 1e6),
+            'dur': round(span.wall * 1e6),
+            'pid': span.pid,
+            'tid': span.tid,
+            'args': dict(span.attributes, cpu=span.cpu, span_id=span.span_id, parent_id=span.parent_id),
+        } for span in spans]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, default=str)
+        return len(spans)
+
+
+# Registro de intervalos por defecto, compartido por los proyectos que no indican uno propio
+default_tracer = Tracer()
+
+
+# Funcion para obtener el registro de intervalos del proyecto activo
+def _active_tracer() -> Tracer:
+    project = _active_project.get()
+    return project.tracer if project is not None else default_tracer
+
+
+# Funcion para obtener un nombre corto de un comando, por ejemplo "pip install" o "venv"
+def _command_name(command:list[str]) -> str:
+    if '-m' in command[:2] and len(command) > 2:
+        index = command.index('-m')
+        return ' '.join(arg for arg in command[index + 1:index + 3] if not arg.startswith('-'))
+    return os.path.basename(command[0])
+
+
+# Funcion para esperar un proceso y obtener su uso de recursos (CPU y memoria maxima), si el sistema lo permite
+def _wait_with_usage(process:subprocess.Popen) -> tuple[int, dict]:
+    if resource is None or not hasattr(os, 'wait4'):
+        return process.wait(), {}
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss esta en kilobytes en Linux y en bytes en macOS
+    max_rss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    return process.returncode, {'child_cpu': usage.ru_utime + usage.ru_stime, 'max_rss_kb': max_rss}
+
+
+# Ejecucion de comandos externos -----------------------------------------------------------------------------------------
+
+class OperationCancelled(BaseException):
+    """
+    La operacion fue cancelada (por ejemplo por un tiempo limite) mientras se ejecutaban sus comandos.
+    Igual que asyncio.CancelledError hereda de BaseException, para que los bloques except Exception de las
+    operaciones no la oculten y la operacion se detenga en lugar de continuar con el siguiente paso.
+    """
+
+
+class CommandRunner:
+    """
+    Ejecuta los comandos externos del toolbox (pip, venv). Todos los comandos pasan por run_command,
+    que usa el ejecutor activo en el contexto actual; por defecto se usa subprocess de forma bloqueante.
+    """
+
+    # Indica si la operacion que usa el ejecutor fue cancelada, ver _check_cancelled
+    cancelled = False
+
+    def run(self, command:list[str], capture_output:bool=False, quiet_stderr:bool=False, capture_stderr:bool=False) -> str|None:
+        """
+        Ejecuta el comando y lanza subprocess.CalledProcessError si termina con error.
+
+        :param command: Comando y argumentos.
+        :param capture_output: Indicador booleano, si es True devuelve la salida estandar como texto.
+        :param quiet_stderr: Indicador booleano, si es True descarta la salida de errores.
+        :param capture_stderr: Indicador booleano, si es True devuelve la salida de errores como texto y descarta la salida estandar.
+        :return: Salida estandar si capture_output es True, salida de errores si capture_stderr es True, en otro caso None.
+        """
+        with _active_tracer().span(_command_name(command), 'command', command=command) as attributes:
+            # La salida se lee linea por linea para mostrarla en vivo y convertirla en eventos de progreso
+            tracker = None if capture_output or capture_stderr else ProgressTracker.for_command(command)
+            env = dict(os.environ, PYTHONUNBUFFERED='1')
+            stdout = subprocess.DEVNULL if capture_stderr else subprocess.PIPE
+            if capture_stderr:
+                stderr = subprocess.PIPE
+            elif capture_output:
+                stderr = subprocess.DEVNULL if quiet_stderr else None
+            else:
+                stderr = subprocess.DEVNULL if quiet_stderr else subprocess.STDOUT
+            with subprocess.Popen(command, stdout=stdout, stderr=stderr, text=True, errors='replace', bufsize=1, env=env) as process:
+                if capture_stderr:
+                    output = process.stderr.read()
+                elif capture_output:
+                    output = process.stdout.read()
+                else:
+                    output = None
+                    for line in process.stdout:
+                        line = line.rstrip('\n')
+                        print(line, flush=True)
+                        if tracker is not None:
+                            tracker.feed(line)
+                returncode, usage = _wait_with_usage(process)
+            attributes.update(usage, exit_code=returncode)
+            if tracker is not None:
+                tracker.finish(returncode)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, output)
+        return output
+
+
+# Ejecutor activo, se puede reemplazar por contexto (por ejemplo en AsyncProject)
+_command_runner = contextvars.ContextVar('command_runner', default=CommandRunner())
+
+# Funcion para detener la operacion en curso entre dos pasos si su ejecutor fue cancelado
+def _check_cancelled():
+    if _command_runner.get().cancelled:
+        raise OperationCancelled("Operación cancelada.")
+
+
+# Indica si las operaciones de Project propagan los errores que normalmente solo muestran, por ejemplo en ProjectFleet,
+# donde el estado de cada proyecto depende de si la operacion lanzo una excepcion
+_raise_command_errors = contextvars.ContextVar('raise_command_errors', default=False)
+
+
+# Funcion para ejecutar un comando externo con el ejecutor activo
+def run_command(command:list[str], capture_output:bool=False, quiet_stderr:bool=False, capture_stderr:bool=False) -> str|None:
+    """
+    Ejecuta un comando externo con el ejecutor activo en el contexto actual.
+
+    :param command: Comando y argumentos.
+    :param capture_output: Indicador booleano, si es True devuelve la salida estandar como texto.
+    :param quiet_stderr: Indicador booleano, si es True descarta la salida de errores.
+    :param capture_stderr: Indicador booleano, si es True devuelve la salida de errores como texto y descarta la salida estandar.
+    :return: Salida estandar si capture_output es True, salida de errores si capture_stderr es True, en otro caso None.
+    """
+    return _command_runner.get().run(command, capture_output=capture_output, quiet_stderr=quiet_stderr, capture_stderr=capture_stderr)
+
+# Eventos de progreso de pip ---------------------------------------------------------------------------------------------
+
+class ProgressEvent(NamedTuple):
+    """
+    Evento de progreso de una instalacion, obtenido de la salida de pip.
+    phase es una de: collect, download, build, install, uninstall, done, error.
+    """
+    phase: str
+    package: str|None
+    message: str
+    timestamp: float
+    command: tuple
+
+
+# Patrones de la salida de pip para cada fase
+_PIP_PHASE_PATTERNS = [
+    ('collect', re.compile(r'^\s*(?:Collecting|Requirement already satisfied:|Processing|Obtaining)\s+(\S+)')),
+    ('download', re.compile(r'^\s*Downloading\s+(\S+)')),
+    ('download', re.compile(r'^\s*Using cached\s+(\S+)')),
+    ('build', re.compile(r'^\s*Building wheel for\s+(\S+)')),
+    ('build', re.compile(r'^\s*Running setup\.py install for\s+(\S+)')),
+    ('uninstall', re.compile(r'^\s*Attempting uninstall:\s+(\S+)')),
+    ('uninstall', re.compile(r'^\s*Found existing installation:\s+(\S+)')),
+    ('install', re.compile(r'^\s*Installing collected packages:\s+(.+)$')),
+    ('done', re.compile(r'^\s*Successfully (?:installed|uninstalled)\s+(.+)$')),
+    ('error', re.compile(r'^\s*ERROR:\s+(.+)$')),
+]
+
+
+# Funcion para obtener el nombre de la libreria de un requisito, archivo o URL de la salida de pip
+def _package_from_pip_token(token:str) -> str|None:
+    token = token.rstrip(',')
+    if '/' in token or token.endswith(('.whl', '.tar.gz', '.zip')):
+        token = token.rstrip('/').rsplit('/', 1)[-1].split('#', 1)[0]
+        token = token.split('-', 1)[0] if token.endswith('.whl') else re.sub(r'-\d.*$', '', token)
+    match = re.match(r'[A-Za-z0-9][A-Za-z0-9._-]*', token)
+    return canonicalize_name(match.group(0)) if match else None
+
+
+class ProgressTracker:
+    """
+    Convierte la salida de pip, linea por linea, en eventos de progreso y mide la duracion de cada fase por libreria.
+    Una fase dura desde su linea hasta la siguiente fase reconocida; la fase de instalacion es comun a todas las
+    librerias instaladas en el mismo comando y se registra con el nombre '*'.
+    """
+
+    def __init__(self, command:list[str], callbacks:list=None, project=None, tracer:Tracer=None, clock=time.perf_counter,
+                 phase_timings:dict=None):
+        """
+        :param command: Comando de pip que se esta ejecutando.
+        :param callbacks: Funciones que reciben cada ProgressEvent.
+        :param project: Proyecto de la operacion, cuyo bloqueo protege las duraciones acumuladas, opcional.
+        :param tracer: Registro donde se guarda cada fase como un intervalo, opcional.
+        :param clock: Funcion de reloj para medir las duraciones.
+        :param phase_timings: Diccionario de la operacion donde se acumulan las duraciones al terminar, opcional.
+        """
+        self.command = tuple(command)
+        self.callbacks = list(callbacks or [])
+        self.project = project
+        self.tracer = tracer
+        self.clock = clock
+        self.phase_timings = phase_timings
+        self.timings = {}
+        self._active = None
+
+    @classmethod
+    def for_command(cls, command:list[str]) -> 'ProgressTracker|None':
+        """
+        Crea un seguimiento para el comando si es una llamada a pip dentro de una operacion de un proyecto.
+
+        :param command: Comando y argumentos.
+        :return: Objeto ProgressTracker, o None si no hay un proyecto activo o el comando no es de pip.
+        """
+        project = _active_project.get()
+        if project is None or 'pip' not in command[:3]:
+            return None
+        return cls(command, callbacks=project.progress_callbacks, project=project, tracer=project.tracer,
+                   phase_timings=_operation_timings.get())
+
+    def _close_active(self, now:float):
+        if self._active is not None:
+            package, phase, start = self._active
+            phases = self.timings.setdefault(package, {})
+            phases[phase] = phases.get(phase, 0.0) + (now - start)
+            self._active = None
+            if self.tracer is not None:
+                self.tracer.record(f'{phase} {package}', 'phase', time.time() - (self.clock() - start), now - start, package=package, phase=phase)
+
+    def _emit(self, phase:str, package:str|None, message:str):
+        event = ProgressEvent(phase, package, message, time.time(), self.command)
+        for callback in self.callbacks:
+            callback(event)
+
+    def feed(self, line:str):
+        """
+        Procesa una linea de salida de pip.
+
+        :param line: Linea de salida sin salto de linea.
+        """
+        for phase, pattern in _PIP_PHASE_PATTERNS:
+            match = pattern.match(line)
+            if match is None:
+                continue
+            now = self.clock()
+            if phase == 'install':
+                self._close_active(now)
+                self._active = ('*', 'install', now)
+                for package in match.group(1).split(','):
+                    self._emit(phase, _package_from_pip_token(package.strip()), line)
+            elif phase == 'done':
+                self._close_active(now)
+                for package in match.group(1).split():
+                    self._emit(phase, _package_from_pip_token(package.rsplit('-', 1)[0]), line)
+            elif phase == 'error':
+                self._emit(phase, None, match.group(1))
+            else:
+                package = _package_from_pip_token(match.group(1))
+                # El mensaje "Requirement already satisfied" no inicia una fase con duracion
+                self._close_active(now)
+                if not line.lstrip().startswith('Requirement already satisfied'):
+                    self._active = (package, phase, now)
+                self._emit(phase, package, line)
+            return
+
+    def finish(self, returncode:int):
+        """
+        Cierra la fase en curso y acumula las duraciones en las de la operacion.
+
+        :param returncode: Codigo de salida de pip.
+        """
+        self._close_active(self.clock())
+        if self.phase_timings is not None:
+            with self.project._timings_lock if self.project is not None else contextlib.nullcontext():
+                for package, phases in self.timings.items():
+                    totals = self.phase_timings.setdefault(package, {})
+                    for phase, seconds in phases.items():
+                        totals[phase] = totals.get(phase, 0.0) + seconds
+
+
+# Proyecto cuya operacion esta en curso en el contexto actual, usado para enviar los eventos de progreso
+_active_project = contextvars.ContextVar('active_project', default=None)
+
+# Duraciones por fase de la operacion en curso en el contexto actual, donde ProgressTracker acumula las de cada comando
+_operation_timings = contextvars.ContextVar('operation_timings', default=None)
+
+
+# Funcion de ejemplo para mostrar los eventos de progreso de forma resumida
+def print_progress(event:ProgressEvent):
+    """
+    Muestra un evento de progreso en una linea, por ejemplo "[download] requests".
+
+    :param event: Objeto ProgressEvent.
+    """
+    print(f"[{event.phase}] {event.package or event.message}", flush=True)
+
+
+# Informacion de ambientes virtuales -------------------------------------------------------------------------------------
+
+class VenvInfo:
+    """
+    Vista de un ambiente virtual: interprete, configuracion de pyvenv.cfg, version de Python y directorios site-packages
+    (purelib y platlib). Se obtiene sin iniciar el interprete, leyendo pyvenv.cfg y la estructura del ambiente una sola vez,
+    y se vuelve a leer cuando cambia la fecha de modificacion de pyvenv.cfg o del directorio del ambiente
+    (por ejemplo, si el ambiente se borra y se vuelve a crear). Las instancias se comparten por ruta con VenvInfo.get.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path:str):
+        """
+        :param path: Ruta del ambiente virtual.
+        """
+        self.path = path
+        self._key = None
+        self._data = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, path:str) -> 'VenvInfo':
+        """
+        Devuelve la instancia compartida del ambiente virtual en la ruta dada.
+
+        :param path: Ruta del ambiente virtual.
+        :return: Objeto VenvInfo.
+        """
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isdir(self.path)
+
+    @property
+    def python_executable(self) -> str:
+        if os.name == 'nt':
+            return os.path.join(self.path, 'Scripts', 'python.exe')
+        return os.path.join(self.path, 'bin', 'python')
+
+    @property
+    def scripts_dir(self) -> str:
+        return os.path.join(self.path, 'Scripts' if os.name == 'nt' else 'bin')
+
+    def _current_key(self) -> tuple|None:
+        try:
+            cfg = os.stat(os.path.join(self.path, 'pyvenv.cfg'))
+            return cfg.st_ino, cfg.st_mtime_ns, os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> dict:
+        config = {}
+        try:
+            with open(os.path.join(self.path, 'pyvenv.cfg'), 'r') as cfg:
+                for line in cfg:
+                    key, separator, value = line.partition('=')
+                    if separator:
+                        config[key.strip()] = value.strip()
+        except OSError:
+            pass
+
+        version = None
+        for key in ('version', 'version_info'):
+            try:
+                version = tuple(int(part) for part in config[key].split('.')[:3])
+                break
+            except (KeyError, ValueError):
+                continue
+
+        if os.name == 'nt':
+            candidates = [os.path.join(self.path, 'Lib', 'site-packages')]
+        else:
+            candidates = sorted(glob.glob(os.path.join(self.path, 'lib*', 'python*', 'site-packages')))
+            # Primero el directorio de la version de pyvenv.cfg en lib (purelib), luego el resto (por ejemplo lib64, platlib)
+            if version is not None:
+                purelib = os.path.join(self.path, 'lib', f'python{version[0]}.{version[1]}', 'site-packages')
+                candidates.sort(key=lambda path: (path != purelib, path))
+
+        # Evita leer dos veces el mismo directorio (lib64 suele ser un enlace a lib)
+        site_packages = []
+        seen = set()
+        for path in candidates:
+            real_path = os.path.realpath(path)
+            if os.path.isdir(real_path) and real_path not in seen:
+                seen.add(real_path)
+                site_packages.append(path)
+
+        return {
+            'config': config,
+            'version': version,
+            'site_packages': site_packages,
+            'purelib': site_packages[0] if site_packages else None,
+            'platlib': site_packages[-1] if site_packages else None,
+        }
+
+    def _resolve(self) -> dict:
+        key = self._current_key()
+        with self._lock:
+            if self._data is None or key != self._key:
+                self._data = self._load()
+                self._key = key
+            return self._data
+
+    @property
+    def config(self) -> dict:
+        """Valores de pyvenv.cfg."""
+        return self._resolve()['config']
+
+    @property
+    def version(self) -> tuple|None:
+        """Version de Python del ambiente (mayor, menor, micro) segun pyvenv.cfg."""
+        return self._resolve()['version']
+
+    @property
+    def home(self) -> str|None:
+        """Directorio del interprete base."""
+        return self.config.get('home')
+
+    @property
+    def include_system_site_packages(self) -> bool:
+        return self.config.get('include-system-site-packages', 'false').lower() == 'true'
+
+    @property
+    def site_packages(self) -> list[str]:
+        """Directorios site-packages existentes, sin duplicados."""
+        return self._resolve()['site_packages']
+
+    @property
+    def purelib(self) -> str|None:
+        return self._resolve()['purelib']
+
+    @property
+    def platlib(self) -> str|None:
+        return self._resolve()['platlib']
+
+    def invalidate(self):
+        """
+        Descarta la informacion leida; se vuelve a leer en el siguiente acceso.
+        """
+        with self._lock:
+            self._data = None
+
+
+# Inventario de librerias instaladas -------------------------------------------------------------------------------------
+
+# Librerias que pip freeze omite por defecto
+FREEZE_EXCLUDED = {'pip'}
+FREEZE_EXCLUDED_BUILD_BACKENDS = {'setuptools', 'wheel', 'distribute'}
+
+
+# Funcion para normalizar el nombre de una libreria (PEP 503)
+def canonicalize_name(name:str) -> str:
+    """
+    Normaliza el nombre de una libreria para poder compararlo sin importar mayusculas, guiones o puntos.
+
+    :param name: Nombre de la libreria.
+    :return: Nombre normalizado.
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+class InstalledDistribution(NamedTuple):
+    """
+    Registro de una libreria instalada.
+    """
+    name: str
+    version: str
+    requires: tuple = ()
+    location: str = None
+    direct_url: dict = None
+
+    @property
+    def key(self) -> str:
+        return canonicalize_name(self.name)
+
+
+class PackageInventory:
+    """
+    Inventario de las librerias instaladas en un entorno de Python.
+    Lee directamente los metadatos *.dist-info del site-packages sin iniciar pip,
+    y guarda el resultado en memoria hasta que el contenido del site-packages cambia.
+    Si los metadatos no se pueden leer, se consulta al proceso auxiliar del ambiente y, como ultimo respaldo, a pip.
+    """
+
+    def __init__(self, python_executable:str, site_packages:list[str]=None, python_version:tuple=None, helper:'VenvHelper'=None):
+        """
+        :param python_executable: Ruta del interprete de Python del entorno, usado solo como respaldo con pip.
+        :param site_packages: Lista de directorios site-packages a leer. Si es None se usa el sys.path del interprete actual.
+        :param python_version: Version (mayor, menor, micro) del interprete del entorno, por defecto la del interprete actual.
+        :param helper: Proceso auxiliar del ambiente, usado como respaldo antes de pip.
+        """
+        self.python_executable = python_executable
+        self.site_packages = site_packages
+        self.python_version = tuple(python_version or sys.version_info[:3])
+        self.helper = helper
+        self._cache_key = None
+        self._records = None
+        self._index_records = None
+        self._index = None
+        self._modules_key = None
+        self._modules = None
+        self._graph_key = None
+        self._graph = None
+
+    @classmethod
+    def from_venv(cls, venv_path:str) -> 'PackageInventory':
+        """
+        Construye el inventario de un ambiente virtual a partir de su ruta.
+
+        :param venv_path: Ruta del ambiente virtual.
+        """
+        info = VenvInfo.get(venv_path)
+        return cls(info.python_executable, info.site_packages, info.version, helper=VenvHelper.get(info.python_executable))
+
+    def _search_paths(self) -> list[str]:
+        if self.site_packages is None:
+            return [path for path in sys.path if path and os.path.isdir(path)]
+        return self.site_packages
+
+    def _current_key(self) -> tuple:
+        # La fecha de modificacion del directorio cambia cuando se agrega o elimina un *.dist-info
+        return tuple((path, os.stat(path).st_mtime_ns) for path in self._search_paths())
+
+    def invalidate(self):
+        """
+        Descarta el inventario guardado en memoria.
+        """
+        self._cache_key = None
+        self._records = None
+        self._modules_key = None
+        self._modules = None
+        self._graph_key = None
+        self._graph = None
+
+    def records(self) -> list[InstalledDistribution]:
+        """
+        Devuelve los registros de las librerias instaladas, ordenados por nombre.
+
+        :return: Lista de InstalledDistribution.
+        """
+        try:
+            key = self._current_key()
+            if key != self._cache_key or self._records is None:
+                self._records = self._read_metadata(key)
+                self._cache_key = key
+        except Exception:
+            # Respaldo: los metadatos no se pudieron leer, se consulta al proceso auxiliar o a pip
+            self.invalidate()
+            if self.helper is not None:
+                try:
+                    return self.helper.records()
+                except HelperError:
+                    pass
+            return self._read_from_pip()
+
+        return self._records
+
+    def _read_metadata(self, key:tuple) -> list[InstalledDistribution]:
+        paths = [path for path, _ in key]
+        if not paths:
+            raise FileNotFoundError('No se encontró ningún directorio site-packages.')
+
+        found = {}
+        for dist in importlib.metadata.distributions(path=paths):
+            name = dist.metadata['Name']
+            if not name:
+                continue
+            # Como en sys.path, la primera aparicion tiene prioridad
+            if canonicalize_name(name) in found:
+                continue
+
+            direct_url = dist.read_text('direct_url.json')
+            found[canonicalize_name(name)] = InstalledDistribution(
+                name=name,
+                version=dist.version,
+                requires=tuple(dist.requires or ()),
+                location=str(dist.locate_file('')),
+                direct_url=json.loads(direct_url) if direct_url else None,
+            )
+
+        return sorted(found.values(), key=lambda record: record.key)
+
+    def _read_from_pip(self) -> list[InstalledDistribution]:
+        output = run_command([self.python_executable, '-m', 'pip', 'list', '--format=json'], capture_output=True)
+        records = []
+        for item in json.loads(output):
+            # pip list indica la ubicacion de las instalaciones editables, necesaria para las lineas -e de freeze
+            location = item.get('editable_project_location')
+            direct_url = {'url': 'file://' + urllib.request.pathname2url(location), 'dir_info': {'editable': True}} if location else None
+            records.append(InstalledDistribution(name=item['name'], version=item['version'], direct_url=direct_url))
+        return sorted(records, key=lambda record: record.key)
+
+    def digest(self) -> str:
+        """
+        Calcula un resumen del conjunto de librerias instaladas a partir de los nombres de los directorios
+        *.dist-info/*.egg-info (que incluyen nombre y version), sin leer los metadatos.
+
+        :return: Hash sha256 hexadecimal.
+        """
+        digest = hashlib.sha256()
+        for path in self._search_paths():
+            entries = sorted(entry for entry in os.listdir(path) if entry.endswith(('.dist-info', '.egg-info')))
+            digest.update(path.encode())
+            digest.update('\n'.join(entries).encode())
+        return digest.hexdigest()
+
+    def get(self, name:str) -> InstalledDistribution|None:
+        """
+        Busca una libreria instalada por su nombre.
+
+        :param name: Nombre de la libreria, se normaliza antes de buscar.
+        :return: Registro de la libreria o None si no esta instalada.
+        """
+        return self.by_key().get(canonicalize_name(name))
+
+    def by_key(self) -> dict[str, InstalledDistribution]:
+        """
+        Devuelve el indice de las librerias instaladas por nombre normalizado. Se construye una vez por cada lista de
+        registros (se reutiliza mientras el site-packages no cambia) y no se debe modificar.
+
+        :return: Diccionario {nombre normalizado: InstalledDistribution}.
+        """
+        records = self.records()
+        if self._index_records is not records:
+            self._index = {record.key: record for record in records}
+            self._index_records = records
+        return self._index
+
+    def top_level_modules(self) -> dict[str, list[str]]:
+        """
+        Devuelve los modulos importables que instala cada libreria, a partir de las rutas de su RECORD
+        (o de top_level.txt si no tiene RECORD). Para los paquetes de espacio de nombres (sin __init__.py, por ejemplo
+        google) tambien se incluye el segundo nivel (google.protobuf), ya que el primero lo comparten varias librerias.
+        El resultado se guarda en memoria hasta que el contenido del site-packages cambia.
+
+        :return: Diccionario {modulo: [nombres normalizados de las librerias que lo instalan]}.
+        """
+        key = self._current_key()
+        if self._modules is not None and key == self._modules_key:
+            return self._modules
+
+        modules = {}
+        for dist in importlib.metadata.distributions(path=[path for path, _ in key]):
+            name = dist.metadata['Name']
+            if not name:
+                continue
+            names = set()
+            files = dist.files
+            if files:
+                packages, namespace_children = set(), {}
+                for file in files:
+                    parts = file.parts
+                    if not parts or parts[0] in ('..', '__pycache__') or parts[0].endswith(('.dist-info', '.egg-info', '.data')):
+                        continue
+                    if len(parts) == 1:
+                        # Modulo suelto o extension compilada en la raiz del site-packages
+                        if parts[0].endswith('.py') or parts[0].endswith(('.so', '.pyd')):
+                            names.add(parts[0].split('.', 1)[0])
+                        continue
+                    names.add(parts[0])
+                    if parts[1] == '__init__.py':
+                        packages.add(parts[0])
+                    elif len(parts) > 2 or parts[1].endswith('.py'):
+                        namespace_children.setdefault(parts[0], set()).add(parts[1].split('.', 1)[0] if len(parts) == 2 else parts[1])
+                for package, children in namespace_children.items():
+                    if package not in packages:
+                        names.update(f'{package}.{child}' for child in children if child != '__pycache__')
+            else:
+                top_level = dist.read_text('top_level.txt') or ''
+                names = {line.strip().replace('/', '.') for line in top_level.splitlines() if line.strip()}
+
+            for module in names:
+                if module.replace('.', '_').isidentifier():
+                    owners = modules.setdefault(module, [])
+                    if canonicalize_name(name) not in owners:
+                        owners.append(canonicalize_name(name))
+
+        self._modules = modules
+        self._modules_key = key
+        return modules
+
+    def dependency_graph(self, environment:dict=None) -> 'DependencyGraph':
+        """
+        Devuelve el indice del grafo de dependencias de las librerias instaladas.
+        El resultado se guarda en memoria hasta que el contenido del site-packages cambia.
+
+        :param environment: Entorno de evaluacion de marcadores. Por defecto el de la version de Python del inventario.
+        :return: Objeto DependencyGraph.
+        """
+        environment = environment or marker_environment(self.python_version)
+        records = self.records()
+        key = (self._cache_key, tuple(sorted(environment.items())))
+        if self._graph is None or self._graph_key != key or self._cache_key is None:
+            self._graph = DependencyGraph(self.by_key(), environment)
+            self._graph_key = key
+        return self._graph
+
+    def disk_size(self, name:str) -> int:
+        """
+        Calcula el espacio en disco de una libreria instalada sumando los archivos de su RECORD.
+
+        :param name: Nombre de la libreria.
+        :return: Tamaño en bytes, 0 si no esta instalada o no tiene RECORD.
+        """
+        for dist in importlib.metadata.distributions(name=name, path=self._search_paths()):
+            size = 0
+            for file in dist.files or []:
+                try:
+                    size += os.lstat(dist.locate_file(file)).st_size
+                except OSError:
+                    pass
+            return size
+        return 0
+
+    def freeze(self) -> list[str]:
+        """
+        Devuelve las lineas equivalentes a la salida de pip freeze.
+
+        :return: Lista de lineas con el formato nombre==version.
+        """
+        excluded = set(FREEZE_EXCLUDED)
+        # pip solo omite las librerias de construccion en versiones anteriores a Python 3.12
+        if self.python_version < (3, 12):
+            excluded |= FREEZE_EXCLUDED_BUILD_BACKENDS
+
+        try:
+            # Si los metadatos no se pudieron leer, records() ya devuelve los del proceso auxiliar o los de pip
+            records = self.records()
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            # Respaldo: no se obtuvo ningun registro, se usa directamente pip freeze
+            return run_command([self.python_executable, '-m', 'pip', 'freeze'], capture_output=True).splitlines()
+
+        lines = []
+        for record in sorted(records, key=lambda record: record.name.lower()):
+            if record.key in excluded:
+                continue
+            lines.append(_freeze_line(record))
+        return lines
+
+
+# Funcion para obtener la linea de pip freeze de una libreria
+def _freeze_line(record:InstalledDistribution) -> str:
+    direct_url = record.direct_url or {}
+    url = direct_url.get('url')
+
+    if not url:
+        return f'{record.name}=={record.version}'
+    if direct_url.get('dir_info', {}).get('editable'):
+        return f'-e {url}'
+    if 'vcs_info' in direct_url:
+        vcs_info = direct_url['vcs_info']
+        return f"{record.name} @ {vcs_info['vcs']}+{url}@{vcs_info['commit_id']}"
+    return f'{record.name} @ {url}'
+
+
+# Proceso auxiliar del ambiente ------------------------------------------------------------------------------------------
+
+# Segundos sin consultas tras los cuales el proceso auxiliar termina
+HELPER_IDLE_TIMEOUT = 300
+
+# Segundos maximos de espera de una respuesta del proceso auxiliar, incluido su inicio
+HELPER_REQUEST_TIMEOUT = 30
+
+
+class HelperError(Exception):
+    """
+    Error al consultar el proceso auxiliar del ambiente.
+    """
+
+
+class VenvHelper:
+    """
+    Proceso auxiliar de larga duracion que se ejecuta con el interprete de un ambiente y responde las consultas que
+    necesitan ese interprete (inventario, metadatos, entorno de marcadores, sys.path) sin iniciar un proceso por consulta.
+    Se inicia con la primera consulta, termina solo despues de idle_timeout segundos sin consultas y se vuelve a iniciar
+    cuando hace falta. Las instancias se comparten por interprete con VenvHelper.get.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, python_executable:str, idle_timeout:float=HELPER_IDLE_TIMEOUT, request_timeout:float=HELPER_REQUEST_TIMEOUT):
+        """
+        :param python_executable: Ruta del interprete del ambiente.
+        :param idle_timeout: Segundos sin consultas tras los cuales el proceso termina.
+        :param request_timeout: Segundos maximos de espera de cada respuesta. Si se superan, el proceso se detiene y se
+            lanza HelperError, para que quien consulta use su respaldo (por ejemplo un .pth o un montaje de red bloqueado).
+        """
+        self.python_executable = python_executable
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self._process = None
+        self._lock = threading.Lock()
+        self._environment = None
+        self._inventory_key = None
+        self._records = None
+        self._graph_key = None
+        self._graph = None
+
+    @classmethod
+    def get(cls, python_executable:str) -> 'VenvHelper':
+        """
+        Devuelve la instancia compartida del proceso auxiliar del interprete dado.
+
+        :param python_executable: Ruta del interprete del ambiente.
+        :return: Objeto VenvHelper.
+        """
+        key = os.path.abspath(python_executable)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self):
+        # El proceso sobrevive a la consulta, por eso se inicia con Popen y no con run_command
+        with _active_tracer().span('helper', 'command', command=[self.python_executable, '-I', '-c', '<helper>']):
+            self._process = subprocess.Popen([self.python_executable, '-I', '-c', _read_script('venv_helper.py'), str(self.idle_timeout)],
+                                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def _read_exact(self, size:int, deadline:float|None) -> bytes:
+        # Se lee el descriptor directamente, sin el buffer de stdout, para que select vea todos los datos pendientes
+        data = b''
+        fd = self._process.stdout.fileno()
+        while len(data) < size:
+            if deadline is not None:
+                with selectors.DefaultSelector() as selector:
+                    selector.register(fd, selectors.EVENT_READ)
+                    if not selector.select(max(0.0, deadline - time.monotonic())):
+                        raise TimeoutError
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        return data
+
+    def _read_reply(self):
+        if os.name != 'nt':
+            deadline = time.monotonic() + self.request_timeout
+            return marshal.loads(self._read_exact(int.from_bytes(self._read_exact(4, deadline), 'little'), deadline))
+
+        # En Windows select no admite pipes: se lee en un hilo y se espera con tiempo limite
+        reply = []
+        reader = threading.Thread(target=lambda: reply.append(marshal.loads(self._read_exact(int.from_bytes(self._read_exact(4, None), 'little'), None))), daemon=True)
+        reader.start()
+        reader.join(self.request_timeout)
+        if reader.is_alive():
+            raise TimeoutError
+        if not reply:
+            raise EOFError
+        return reply[0]
+
+    def request(self, operation:str, argument=None):
+        """
+        Envia una consulta al proceso auxiliar, iniciandolo si no esta en ejecucion.
+
+        :param operation: Operacion: 'ping', 'environment', 'sys_path', 'inventory' o 'metadata'.
+        :param argument: Argumento de la operacion.
+        :return: Valor de la respuesta.
+        """
+        data = marshal.dumps((operation, argument), 4)
+        with self._lock:
+            # Si el proceso termino por inactividad entre la comprobacion y la consulta, se reintenta una vez
+            for attempt in range(2):
+                try:
+                    if not self.running:
+                        self._start()
+                    self._process.stdin.write(len(data).to_bytes(4, 'little') + data)
+                    self._process.stdin.flush()
+                    ok, value = self._read_reply()
+                    break
+                except TimeoutError:
+                    # Un proceso bloqueado no se reintenta, se detiene y quien consulta usa su respaldo
+                    self._stop(kill=True)
+                    raise HelperError(f'El proceso auxiliar de {self.python_executable} no respondió en {self.request_timeout} s a {operation!r}.')
+                except (OSError, EOFError, ValueError) as e:
+                    self._stop()
+                    if attempt:
+                        raise HelperError(f'El proceso auxiliar de {self.python_executable} no responde: {e}') from e
+        if not ok:
+            raise HelperError(value)
+        return value
+
+    def environment(self) -> dict:
+        """
+        Entorno de evaluacion de marcadores del interprete del ambiente.
+
+        :return: Diccionario con las variables de los marcadores.
+        """
+        if self._environment is None:
+            self._environment = self.request('environment')
+        return self._environment
+
+    def sys_path(self) -> list[str]:
+        """
+        sys.path del interprete del ambiente sin variables de entorno (python -I).
+
+        :return: Lista de rutas.
+        """
+        return self.request('sys_path')
+
+    def records(self) -> list[InstalledDistribution]:
+        """
+        Librerias instaladas segun el interprete del ambiente. Si el site-packages no cambio desde la consulta anterior,
+        el proceso auxiliar no vuelve a enviar el inventario.
+
+        :return: Lista de InstalledDistribution ordenada por nombre.
+        """
+        key, items = self.request('inventory', self._inventory_key)
+        if items is not None or self._records is None:
+            records = [InstalledDistribution(name, version, tuple(requires), location, json.loads(direct_url) if direct_url else None)
+                       for name, version, requires, location, direct_url in items or ()]
+            self._records = sorted(records, key=lambda record: record.key)
+            self._inventory_key = key
+        return self._records
+
+    def metadata(self, name:str) -> dict:
+        """
+        Metadatos de una libreria instalada.
+
+        :param name: Nombre de la libreria.
+        :return: Diccionario con 'fields' ({campo: [valores]}), 'location' y 'files' (numero de archivos del RECORD).
+        """
+        return self.request('metadata', name)
+
+    def graph(self) -> dict[str, set]:
+        """
+        Grafo de dependencias de las librerias instaladas, evaluado con el entorno de marcadores del ambiente.
+        Se guarda en memoria hasta que el site-packages cambia.
+
+        :return: Diccionario {nombre normalizado: conjunto de dependencias instaladas}.
+        """
+        records = self.records()
+        if self._graph is None or self._graph_key != self._inventory_key:
+            self._graph = _installed_graph({record.key: record for record in records}, self.environment())
+            self._graph_key = self._inventory_key
+        return self._graph
+
+    def _stop(self, kill:bool=False):
+        if self._process is not None:
+            with contextlib.suppress(OSError):
+                self._process.stdin.close()
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                self._process.wait(timeout=0 if kill else 5)
+            if self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def close(self):
+        """
+        Detiene el proceso auxiliar.
+        """
+        with self._lock:
+            self._stop()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Detiene los procesos auxiliares de todos los ambientes.
+        """
+        with cls._instances_lock:
+            helpers = list(cls._instances.values())
+        for helper in helpers:
+            helper.close()
+
+
+atexit.register(VenvHelper.close_all)
+
+
+# Revision de librerias desactualizadas ----------------------------------------------------------------------------------
+
+class OutdatedPackage(NamedTuple):
+    """
+    Registro de una libreria desactualizada.
+    """
+    name: str
+    version: str
+    latest_version: str
+
+
+# Lector de los enlaces de una pagina del indice simple en HTML (PEP 503)
+class _SimpleIndexHTMLParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.files = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        attrs = dict(attrs)
+        href = urlsplit(attrs.get('href') or '')
+        algorithm, _, value = href.fragment.partition('=')
+        self.files.append({
+            'filename': os.path.basename(href.path),
+            'requires-python': attrs.get('data-requires-python'),
+            'yanked': 'data-yanked' in attrs,
+            'hashes': {algorithm: value} if value else {},
+        })
+
+
+# Conjunto limitado de conexiones HTTP reutilizables (keep-alive) para consultar el indice
+class _ConnectionPool:
+    def __init__(self, timeout:float):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, scheme:str, netloc:str) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout)
+
+    def _release(self, scheme:str, netloc:str, connection:http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def get(self, url:str, headers:dict, max_redirects:int=5) -> tuple[int, dict, bytes, str]:
+        """
+        Realiza una peticion GET siguiendo redirecciones.
+
+        :return: Tupla (estado, encabezados, contenido, url final).
+        """
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+            for attempt in range(2):
+                connection = self._acquire(parts.scheme, parts.netloc)
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.HTTPException, OSError):
+                    # La conexion reutilizada pudo haber sido cerrada por el servidor, se reintenta una vez
+                    connection.close()
+                    if attempt:
+                        raise
+
+            response_headers = {key.lower(): value for key, value in response.getheaders()}
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(parts.scheme, parts.netloc, connection)
+
+            if response.status in (301, 302, 303, 307, 308) and 'location' in response_headers:
+                url = urljoin(url, response_headers['location'])
+                continue
+
+            if response_headers.get('content-encoding') == 'gzip':
+                body = gzip.decompress(body)
+            return response.status, response_headers, body, url
+
+        raise http.client.HTTPException(f'Demasiadas redirecciones al consultar {url}.')
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+class OutdatedChecker:
+    """
+    Revisa las versiones mas recientes de las librerias instaladas consultando un indice simple (PEP 503/691).
+    Las consultas se hacen de forma concurrente con asyncio sobre un conjunto limitado de conexiones,
+    y las respuestas se guardan en una cache en disco con tiempo de vida (TTL) y revalidacion por ETag.
+    El indice puede ser una URL http(s), una URL file:// o un directorio local.
+    """
+
+    ACCEPT = 'application/vnd.pypi.simple.v1+json, application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.01'
+
+    def __init__(self, index_url:str=None, cache_dir:str=None, ttl:float=3600, max_connections:int=10, timeout:float=15, include_prereleases:bool=False):
+        """
+        :param index_url: URL o directorio del indice simple. Por defecto PIP_INDEX_URL o PyPI.
+        :param cache_dir: Directorio de la cache en disco. Por defecto dentro de TOOLBOX_HOME.
+        :param ttl: Segundos durante los cuales una respuesta guardada se usa sin consultar el indice.
+        :param max_connections: Numero maximo de consultas simultaneas al indice.
+        :param timeout: Segundos de espera maxima por consulta.
+        :param include_prereleases: Indicador booleano, por defecto es igual a False con lo cual ignora las versiones preliminares.
+        """
+        index_url = index_url or os.environ.get('PIP_INDEX_URL') or DEFAULT_INDEX_URL
+        if os.path.isdir(index_url):
+            index_url = 'file://' + urllib.request.pathname2url(os.path.abspath(index_url))
+        self.index_url = index_url.rstrip('/') + '/'
+        self.ttl = ttl
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.include_prereleases = include_prereleases
+
+        index_hash = hashlib.sha256(self.index_url.encode()).hexdigest()[:16]
+        self.cache_dir = os.path.join(cache_dir or os.path.join(TOOLBOX_HOME, 'cache', 'simple'), index_hash)
+
+    # Cache en disco ----------------------------------------------------------------------------
+
+    def _cache_path(self, project_name:str) -> str:
+        return os.path.join(self.cache_dir, f'{project_name}.json')
+
+    def _read_cache(self, project_name:str) -> dict|None:
+        try:
+            with open(self._cache_path(project_name), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, project_name:str, entry:dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f'{self._cache_path(project_name)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, self._cache_path(project_name))
+
+    # Consulta del indice -----------------------------------------------------------------------
+
+    def _project_files(self, pool:_ConnectionPool, project_name:str) -> list[dict]:
+        """
+        Obtiene los archivos publicados de una libreria, usando la cache cuando esta vigente.
+        """
+        cached = self._read_cache(project_name)
+        if cached is not None and time.time() - cached['fetched_at'] < self.ttl:
+            return cached['files']
+
+        url = urljoin(self.index_url, f'{project_name}/')
+        last_modified = (cached or {}).get('last_modified')
+        if url.startswith('file:'):
+            files, validator = self._read_local_project(url)
+            if cached is not None and validator == cached.get('etag'):
+                files = cached['files']
+        else:
+            headers = {'Accept': self.ACCEPT, 'Accept-Encoding': 'gzip', 'User-Agent': 'Project_toolbox'}
+            if cached is not None and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached is not None and cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+            status, response_headers, body, final_url = pool.get(url, headers)
+            if status == 304 and cached is not None:
+                files, validator = cached['files'], cached.get('etag')
+            elif status == 404:
+                files, validator, last_modified = [], None, None
+            elif status == 200:
+                files = self._parse_page(body, response_headers.get('content-type', ''))
+                validator = response_headers.get('etag')
+                last_modified = response_headers.get('last-modified')
+            else:
+                raise http.client.HTTPException(f'Respuesta {status} al consultar {final_url}.')
+
+        self._write_cache(project_name, {
+            'fetched_at': time.time(),
+            'etag': validator,
+            'last_modified': last_modified,
+            'files': files,
+        })
+        return files
+
+    def _read_local_project(self, url:str) -> tuple[list[dict], str|None]:
+        # Indice en un directorio: se lee index.json/index.html o, en su defecto, los archivos del directorio
+        directory = urllib.request.url2pathname(urlsplit(url).path)
+        if not os.path.isdir(directory):
+            return [], None
+
+        for filename, content_type in (('index.json', 'application/vnd.pypi.simple.v1+json'), ('index.html', 'text/html')):
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    files = self._parse_page(f.read(), content_type)
+                return files, str(os.stat(path).st_mtime_ns)
+
+        files = [{'filename': filename, 'requires-python': None, 'yanked': False, 'hashes': {}} for filename in os.listdir(directory)]
+        return files, str(os.stat(directory).st_mtime_ns)
+
+    @staticmethod
+    def _parse_page(body:bytes, content_type:str) -> list[dict]:
+        if 'json' in content_type:
+            data = json.loads(body)
+            return [{
+                'filename': item['filename'],
+                'requires-python': item.get('requires-python'),
+                'yanked': bool(item.get('yanked')),
+                'hashes': item.get('hashes') or {},
+            } for item in data.get('files', [])]
+
+        parser = _SimpleIndexHTMLParser()
+        parser.feed(body.decode('utf-8', errors='replace'))
+        return parser.files
+
+    # Seleccion de versiones --------------------------------------------------------------------
+
+    @staticmethod
+    def _version_from_filename(project_name:str, filename:str) -> str|None:
+        if filename.endswith('.whl'):
+            parts = filename[:-4].split('-')
+            return parts[1] if len(parts) >= 5 else None
+
+        for extension in ('.tar.gz', '.zip', '.tar.bz2', '.tgz', '.tar'):
+            if filename.endswith(extension):
+                base = filename[:-len(extension)]
+                break
+        else:
+            return None
+
+        # El nombre de la libreria puede contener guiones, se busca el corte que coincide con el nombre
+        for index, character in enumerate(base):
+            if character == '-' and canonicalize_name(base[:index]) == project_name:
+                return base[index + 1:]
+        return None
+
+    def _latest_version(self, project_name:str, files:list[dict], installed_version:Version, python_version:str) -> Version|None:
+        latest = None
+        for file in files:
+            if file.get('yanked'):
+                continue
+
+            requires_python = file.get('requires-python')
+            if requires_python:
+                try:
+                    if python_version not in SpecifierSet(requires_python):
+                        continue
+                except InvalidSpecifier:
+                    pass
+
+            version_string = self._version_from_filename(project_name, file['filename'])
+            if version_string is None:
+                continue
+            try:
+                version = Version(version_string)
+            except InvalidVersion:
+                continue
+
+            if version.is_prerelease and not (self.include_prereleases or installed_version.is_prerelease):
+                continue
+            if latest is None or version > latest:
+                latest = version
+        return latest
+
+    async def files_async(self, project_names:list[str]) -> dict[str, list[dict]]:
+        """
+        Obtiene de forma concurrente los archivos publicados de varias librerias.
+
+        :param project_names: Lista de nombres de librerias.
+        :return: Diccionario {nombre normalizado: lista de archivos con 'filename', 'requires-python', 'yanked' y 'hashes'}.
+        """
+        project_names = sorted({canonicalize_name(name) for name in project_names})
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_connections)
+        pool = _ConnectionPool(self.timeout)
+
+        async def fetch(project_name:str) -> list[dict]:
+            async with semaphore:
+                return await loop.run_in_executor(executor, self._project_files, pool, project_name)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+                results = await asyncio.gather(*(fetch(project_name) for project_name in project_names))
+        finally:
+            pool.close()
+
+        return dict(zip(project_names, results))
+
+    def files(self, project_names:list[str]) -> dict[str, list[dict]]:
+        """
+        Version sincrona de files_async.
+        """
+        return asyncio.run(self.files_async(project_names))
+
+    @staticmethod
+    def artifact_hashes(files:list[dict], project_name:str, version:str) -> list[str]:
+        """
+        Devuelve los hashes publicados en el indice para los archivos de una version.
+
+        :param files: Archivos de la libreria, obtenidos con files/files_async.
+        :param project_name: Nombre de la libreria.
+        :param version: Version exacta.
+        :return: Lista de hashes con el formato 'sha256:...'.
+        """
+        project_name = canonicalize_name(project_name)
+        version = _canonical_version(version)
+        hashes = []
+        for file in files:
+            file_version = OutdatedChecker._version_from_filename(project_name, file['filename'])
+            if file_version is None or _canonical_version(file_version) != version:
+                continue
+            for algorithm, value in (file.get('hashes') or {}).items():
+                if algorithm == 'sha256':
+                    hashes.append(f'{algorithm}:{value}')
+        return hashes
+
+    async def check_async(self, records:list[InstalledDistribution], python_version:tuple=None) -> list[OutdatedPackage]:
+        """
+        Revisa de forma concurrente cuales de las librerias dadas tienen una version mas reciente en el indice.
+
+        :param records: Lista de InstalledDistribution a revisar.
+        :param python_version: Version del interprete del entorno, para descartar archivos incompatibles con requires-python.
+        :return: Lista de OutdatedPackage ordenada por nombre.
+        """
+        python_version = '.'.join(str(part) for part in (python_version or sys.version_info[:3]))
+
+        # Las librerias instaladas desde una URL o en modo editable no se comparan con el indice
+        candidates = []
+        for record in records:
+            if record.direct_url:
+                continue
+            try:
+                candidates.append((record, Version(record.version)))
+            except InvalidVersion:
+                continue
+
+        files = await self.files_async([record.key for record, _ in candidates])
+
+        outdated_packages = []
+        for record, installed_version in candidates:
+            latest = self._latest_version(record.key, files[record.key], installed_version, python_version)
+            if latest is not None and latest > installed_version:
+                outdated_packages.append(OutdatedPackage(record.name, record.version, str(latest)))
+
+        return sorted(outdated_packages, key=lambda result: result.name.lower())
+
+    def check(self, records:list[InstalledDistribution], python_version:tuple=None) -> list[OutdatedPackage]:
+        """
+        Version sincrona de check_async.
+        """
+        return asyncio.run(self.check_async(records, python_version))
+
+
+# Almacen local de wheels ------------------------------------------------------------------------------------------------
+
+# Funcion para normalizar una version, para poder comparar por ejemplo 1.0 y 1.0.0
+def _canonical_version(version:str) -> str:
+    try:
+        return str(Version(version))
+    except InvalidVersion:
+        return version
+
+
+# Funcion para calcular el hash sha256 de un archivo
+def _file_sha256(path:str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Bloqueo exclusivo de un archivo, para que varios procesos puedan compartir el mismo almacen
+@contextlib.contextmanager
+def _file_lock(path:str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Funcion para leer las lineas de un archivo requirements que se pueden repartir entre varios procesos de pip
+def _splittable_requirements(requirements_path:str) -> list[str]|None:
+    requirements = []
+    with open(requirements_path, 'r') as f:
+        for line in f:
+            line = line.split(' #')[0].strip()
+            if not line or line.startswith('#'):
+                continue
+            # Las opciones (-r, -e, --index-url, ...) dependen del archivo completo, no se reparten
+            if line.startswith('-'):
+                return None
+            # Se eliminan las opciones por requerimiento, por ejemplo --hash
+            requirements.append(re.split(r'\s+--?[a-zA-Z]', line, maxsplit=1)[0].strip())
+    return requirements
+
+
+# Funcion para obtener la version exacta de un requerimiento fijado con ==
+def _pinned_version(requirement:Requirement) -> str|None:
+    specifiers = list(requirement.specifier)
+    if requirement.url or len(specifiers) != 1 or specifiers[0].operator not in ('==', '===') or '*' in specifiers[0].version:
+        return None
+    return specifiers[0].version
+
+
+class Wheelhouse:
+    """
+    Almacen local de wheels compartido por todos los proyectos, direccionado por contenido (sha256).
+    Los wheels se guardan una sola vez en objects/ y se exponen por nombre de archivo en links/,
+    directorio que pip usa con --find-links/--no-index para instalar sin consultar el indice.
+    Registra el ultimo uso de cada wheel para poder liberar espacio por antiguedad (LRU).
+    """
+
+    def __init__(self, root:str=None, max_size:int=None):
+        """
+        :param root: Directorio del almacen. Por defecto dentro de TOOLBOX_HOME.
+        :param max_size: Tamaño maximo en bytes. Si se indica, los wheels menos usados se eliminan al superarlo.
+        """
+        self.root = root or os.path.join(TOOLBOX_HOME, 'wheelhouse')
+        self.max_size = max_size
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.links_dir = os.path.join(self.root, 'links')
+        self._index_path = os.path.join(self.root, 'index.json')
+        self._lock_path = os.path.join(self.root, '.lock')
+
+    # Indice de wheels --------------------------------------------------------------------------
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index:dict):
+        temp_path = f'{self._index_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(temp_path, self._index_path)
+
+    def entries(self) -> dict:
+        """
+        Devuelve los wheels del almacen.
+
+        :return: Diccionario {nombre de archivo: {'sha256', 'size', 'last_used'}}.
+        """
+        return self._read_index()
+
+    def size(self) -> int:
+        """
+        Devuelve el tamaño total en bytes de los wheels del almacen.
+        """
+        return sum(entry['size'] for entry in self._read_index().values())
+
+    # Operaciones del almacen -------------------------------------------------------------------
+
+    def add(self, wheel_path:str) -> str:
+        """
+        Agrega un wheel al almacen. Si ya existe un wheel con el mismo nombre, se conserva el existente.
+
+        :param wheel_path: Ruta del archivo .whl.
+        :return: Hash sha256 del wheel guardado.
+        """
+        filename = os.path.basename(wheel_path)
+        sha256 = _file_sha256(wheel_path)
+        object_path = os.path.join(self.objects_dir, sha256[:2], sha256)
+        link_path = os.path.join(self.links_dir, filename)
+
+        with _file_lock(self._lock_path):
+            index = self._read_index()
+            if filename in index and os.path.exists(link_path):
+                return index[filename]['sha256']
+
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                temp_path = f'{object_path}.{os.getpid()}.tmp'
+                shutil.copyfile(wheel_path, temp_path)
+                os.replace(temp_path, object_path)
+
+            os.makedirs(self.links_dir, exist_ok=True)
+            if os.path.exists(link_path):
+                os.remove(link_path)
+            try:
+                os.link(object_path, link_path)
+            except OSError:
+                # Sistemas de archivos sin enlaces duros
+                shutil.copyfile(object_path, link_path)
+
+            index[filename] = {'sha256': sha256, 'size': os.path.getsize(object_path), 'last_used': time.time()}
+            self._write_index(index)
+
+        return sha256
+
+    def hashes_for(self, project_name:str, version:str) -> list[str]:
+        """
+        Devuelve los hashes de los wheels del almacen que corresponden a una version de una libreria.
+
+        :param project_name: Nombre de la libreria.
+        :param version: Version exacta.
+        :return: Lista de hashes con el formato 'sha256:...'.
+        """
+        key = (canonicalize_name(project_name), _canonical_version(version))
+        hashes = []
+        for filename, entry in self._read_index().items():
+            name, wheel_version = filename.split('-')[:2]
+            if (canonicalize_name(name), _canonical_version(wheel_version)) == key:
+                hashes.append(f"sha256:{entry['sha256']}")
+        return hashes
+
+    def touch(self, records:list[InstalledDistribution]):
+        """
+        Marca como usados los wheels que corresponden a las librerias instaladas dadas.
+
+        :param records: Lista de InstalledDistribution instaladas desde el almacen.
+        """
+        installed = {(record.key, _canonical_version(record.version)) for record in records}
+        now = time.time()
+
+        with _file_lock(self._lock_path):
+            index = self._read_index()
+            for filename, entry in index.items():
+                name, version = filename.split('-')[:2]
+                if (canonicalize_name(name), _canonical_version(version)) in installed:
+                    entry['last_used'] = now
+            self._write_index(index)
+
+    def evict(self, max_size:int=None) -> int:
+        """
+        Elimina los wheels usados hace mas tiempo hasta que el almacen no supere el tamaño maximo.
+
+        :param max_size: Tamaño maximo en bytes, por defecto el indicado al crear el almacen.
+        :return: Bytes liberados.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return 0
+
+        freed = 0
+        with _file_lock(self._lock_path):
+            index = self._read_index()
+            total = sum(entry['size'] for entry in index.values())
+
+            for filename, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+                if total <= max_size:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.links_dir, filename))
+                del index[filename]
+                total -= entry['size']
+                freed += entry['size']
+
+                # El objeto solo se elimina si ningun otro nombre de archivo lo usa
+                if not any(other['sha256'] == entry['sha256'] for other in index.values()):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(self.objects_dir, entry['sha256'][:2], entry['sha256']))
+
+            self._write_index(index)
+
+        if freed:
+            print(f"Se liberaron {freed / 1024 / 1024:.1f} MB del almacen de wheels.")
+        return freed
+
+    def install_args(self) -> list[str]:
+        """
+        Devuelve los argumentos de pip para instalar solo desde el almacen.
+        """
+        return ['--no-index', '--find-links', self.links_dir]
+
+    def prefetch(self, python_executable:str, requirements:list[str]=None, requirements_path:str=None, max_workers:int=4) -> int:
+        """
+        Construye o descarga los wheels de las librerias dadas y los agrega al almacen.
+        Las librerias se reparten entre varios procesos de pip que se ejecutan de forma concurrente.
+
+        :param python_executable: Ruta del interprete de Python para el que se construyen los wheels.
+        :param requirements: Lista de librerias (especificaciones de pip) a agregar.
+        :param requirements_path: Ruta de un archivo requirements a agregar.
+        :param max_workers: Numero maximo de procesos de pip simultaneos.
+        :return: Numero de wheels agregados o actualizados en el almacen.
+        """
+        jobs = []
+        if requirements:
+            jobs.extend([requirement] for requirement in requirements)
+        if requirements_path:
+            splittable = _splittable_requirements(requirements_path)
+            if splittable is None:
+                jobs.append(['-r', requirements_path])
+            else:
+                jobs.extend([requirement] for requirement in splittable)
+        if not jobs:
+            return 0
+
+        # Se agrupan las librerias en tantos bloques como procesos
+        workers = max(1, min(max_workers, len(jobs)))
+        chunks = [sum(jobs[i::workers], []) for i in range(workers)]
+
+        os.makedirs(self.links_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix='wheelhouse-') as temp_dir:
+            def build(i:int, chunk:list[str]) -> str:
+                wheel_dir = os.path.join(temp_dir, str(i))
+                run_command([python_executable, '-m', 'pip', 'wheel', '--quiet', '--wheel-dir', wheel_dir, '--find-links', self.links_dir] + chunk)
+                return wheel_dir
+
+            # Cada proceso se lanza con una copia del contexto, para conservar el ejecutor de comandos activo
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(contextvars.copy_context().run, build, i, chunk) for i, chunk in enumerate(chunks)]
+                wheel_dirs = [future.result() for future in futures]
+
+            wheel_paths = {}
+            for wheel_dir in wheel_dirs:
+                for filename in os.listdir(wheel_dir):
+                    if filename.endswith('.whl'):
+                        wheel_paths[filename] = os.path.join(wheel_dir, filename)
+            for wheel_path in wheel_paths.values():
+                self.add(wheel_path)
+
+        self.evict()
+        return len(wheel_paths)
+
+    def collect(self, python_executable:str, pip_args:list[str]) -> int:
+        """
+        Resuelve los argumentos de pip con el indice (y con el almacen, con --find-links) en una sola ejecucion de
+        pip wheel y agrega al almacen los wheels obtenidos, para instalar despues sin consultar el indice.
+
+        :param python_executable: Ruta del interprete de Python para el que se construyen los wheels.
+        :param pip_args: Argumentos de pip (librerias o -r archivo, y opciones como --no-deps).
+        :return: Numero de wheels agregados o actualizados en el almacen.
+        """
+        os.makedirs(self.links_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix='wheelhouse-') as wheel_dir:
+            run_command([python_executable, '-m', 'pip', 'wheel', '--wheel-dir', wheel_dir, '--find-links', self.links_dir] + pip_args)
+            filenames = [filename for filename in os.listdir(wheel_dir) if filename.endswith('.whl')]
+            for filename in filenames:
+                self.add(os.path.join(wheel_dir, filename))
+        self.evict()
+        return len(filenames)
+
+
+# Nombre del archivo, dentro del ambiente virtual, con la huella de la ultima instalacion del archivo requirements
+INSTALL_STAMP_NAME = '.toolbox_install_stamp.json'
+
+
+# Lectura de archivos requirements ---------------------------------------------------------------------------------------
+
+# Librerias que nunca se desinstalan al sincronizar un entorno
+PROTECTED_PACKAGES = {'pip', 'setuptools', 'wheel'}
+
+
+class RequirementLine(NamedTuple):
+    """
+    Requerimiento leido de un archivo requirements.
+    """
+    requirement: Requirement
+    line: str
+    source: str
+    constraint: bool = False
+    editable: bool = False
+    target: str = None
+
+    @property
+    def key(self) -> str:
+        return canonicalize_name(self.requirement.name)
+
+    @property
+    def install_spec(self) -> str:
+        """
+        Requerimiento tal como se pasa a pip. Las lineas -e y las de URL o ruta se pasan con su destino original,
+        ya que el nombre de la libreria puede no estar indicado.
+        """
+        if self.target is None:
+            return str(self.requirement)
+        return f'-e {self.target}' if self.editable else self.target
+
+
+# Funcion para obtener el entorno con el que se evaluan los marcadores (PEP 508) de un interprete
+def marker_environment(python_version:tuple=None) -> dict:
+    """
+    Devuelve el entorno de evaluacion de marcadores, ajustado a la version de Python del entorno.
+
+    :param python_version: Version (mayor, menor, micro) del interprete del entorno, por defecto la del interprete actual.
+    :return: Diccionario con las variables de los marcadores.
+    """
+    environment = default_environment()
+    if python_version:
+        environment['python_version'] = '.'.join(str(part) for part in python_version[:2])
+        if len(python_version) >= 3:
+            environment['python_full_version'] = '.'.join(str(part) for part in python_version[:3])
+    return environment
+
+
+# Funcion para leer los requerimientos de un archivo requirements
+def parse_requirements_file(requirements_path:str, environment:dict=None, _seen:set=None, _constraint:bool=False) -> list[RequirementLine]:
+    """
+    Lee un archivo requirements. Ignora comentarios, lineas vacias y opciones de pip, une las lineas
+    continuadas con '\\', sigue los archivos incluidos con -r/-c y descarta los requerimientos cuyos
+    marcadores no aplican al entorno. Las lineas -e y las de URL o ruta se leen como requerimientos con URL,
+    con un nombre provisional que se reemplaza por el de la libreria instalada desde esa URL.
+
+    :param requirements_path: Ruta del archivo requirements.
+    :param environment: Entorno de evaluacion de marcadores, por defecto el del interprete actual.
+    :return: Lista de RequirementLine. Las restricciones de los archivos -c se marcan con constraint=True.
+    """
+    _seen = set() if _seen is None else _seen
+    real_path = os.path.realpath(requirements_path)
+    if real_path in _seen:
+        return []
+    _seen.add(real_path)
+
+    with open(requirements_path, 'r') as f:
+        content = f.read()
+
+    logical_lines = []
+    buffer, start = '', None
+    for lineno, line in enumerate(content.splitlines(), start=1):
+        line = re.sub(r'(^|\s)#.*$', '', line)
+        if start is None:
+            start = lineno
+        if line.endswith('\\'):
+            buffer += line[:-1] + ' '
+            continue
+        logical_lines.append((start, (buffer + line).strip()))
+        buffer, start = '', None
+    if buffer:
+        logical_lines.append((start, buffer.strip()))
+
+    requirements = []
+    for lineno, line in logical_lines:
+        if not line:
+            continue
+
+        # Archivos incluidos, relativos al archivo que los incluye
+        include = re.match(r'^(-r|--requirement|-c|--constraint)(\s+|=)(\S+)', line)
+        if include:
+            include_path = os.path.join(os.path.dirname(requirements_path), include.group(3))
+            constraint = _constraint or include.group(1) in ('-c', '--constraint')
+            requirements.extend(parse_requirements_file(include_path, environment, _seen, constraint))
+            continue
+        # Instalaciones editables (-e) y lineas con una URL o ruta en lugar de un nombre
+        editable = re.match(r'^(-e|--editable)(\s+|=)(\S+)', line)
+        if editable or re.match(r'^(\.{0,2}/|[a-zA-Z][\w+.-]*://)', line):
+            target = editable.group(3) if editable else line.split()[0]
+            url = _requirement_url(target)
+            requirement = Requirement(f'{_url_requirement_name(target)} @ {url}')
+            requirements.append(RequirementLine(requirement, line, f'{requirements_path}:{lineno}', _constraint, bool(editable), target))
+            continue
+        if line.startswith('-'):
+            continue
+
+        # Se eliminan las opciones por requerimiento, por ejemplo --hash
+        requirement_string = re.split(r'\s+--?[a-zA-Z]', line, maxsplit=1)[0].strip()
+        try:
+            requirement = Requirement(requirement_string)
+        except InvalidRequirement as e:
+            raise ValueError(f"Requerimiento inválido en {requirements_path}:{lineno}: {line}. Detalles: {e}")
+
+        if requirement.marker is not None and not requirement.marker.evaluate(environment):
+            continue
+        requirements.append(RequirementLine(requirement, line, f'{requirements_path}:{lineno}', _constraint))
+
+    return requirements
+
+
+# Funcion para obtener la URL de una linea -e o de URL/ruta de un archivo requirements
+def _requirement_url(target:str) -> str:
+    if re.match(r'^[a-zA-Z][\w+.-]*://', target):
+        return target
+    # Como en pip, las rutas relativas se resuelven desde el directorio de trabajo
+    return 'file://' + urllib.request.pathname2url(os.path.abspath(target.split('#', 1)[0]))
+
+
+# Funcion para obtener un nombre provisional de una linea de URL/ruta: el de #egg= o el ultimo segmento de la ruta.
+# El nombre real se obtiene del direct_url.json de la libreria instalada (ver _resolve_url_names)
+def _url_requirement_name(target:str) -> str:
+    egg = re.search(r'#egg=([\w.-]+)', target)
+    if egg:
+        return egg.group(1)
+    path = urlsplit(_requirement_url(target)).path.rstrip('/')
+    name = re.sub(r'(\.git|\.zip|\.tar\.gz|\.whl)$', '', path.rsplit('/', 1)[-1].split('@', 1)[0]).split('-', 1)[0]
+    return re.sub(r'[^\w.-]', '_', name).strip('._-') or 'unknown'
+
+
+# Funcion para normalizar una URL para compararla con la de direct_url.json (sin el prefijo vcs+, la revision ni el fragmento)
+def _normalized_url(url:str) -> str:
+    scheme, netloc, path, _, _ = urlsplit(url.split('#', 1)[0])
+    scheme = scheme.split('+', 1)[-1]
+    if '@' in path:
+        path = path.rsplit('@', 1)[0]
+    return f'{scheme}://{netloc}{path}'.rstrip('/')
+
+
+# Funcion para asignar a las lineas de URL/ruta el nombre de la libreria instalada desde esa URL
+def _resolve_url_names(requirements:list[RequirementLine], installed:dict) -> list[RequirementLine]:
+    by_url = {_normalized_url(record.direct_url['url']): record for record in installed.values() if (record.direct_url or {}).get('url')}
+    resolved = []
+    for line in requirements:
+        record = by_url.get(_normalized_url(line.requirement.url)) if line.target is not None else None
+        if record is not None and record.key != line.key:
+            line = line._replace(requirement=Requirement(f'{record.name} @ {line.requirement.url}'))
+        resolved.append(line)
+    return resolved
+
+
+# Funcion para revisar si una version instalada cumple un requerimiento
+def _satisfies(record:InstalledDistribution, requirement:Requirement) -> bool:
+    if requirement.url:
+        return _normalized_url((record.direct_url or {}).get('url') or '') == _normalized_url(requirement.url)
+    return not requirement.specifier or requirement.specifier.contains(record.version, prereleases=True)
+
+
+# Funcion para obtener las dependencias de una libreria instalada que aplican al entorno
+def _installed_dependencies(record:InstalledDistribution, environment:dict, extras:set=None) -> list[Requirement]:
+    dependencies = []
+    for requirement_string in record.requires:
+        try:
+            requirement = Requirement(requirement_string)
+        except InvalidRequirement:
+            continue
+        if requirement.marker is not None:
+            # Las dependencias opcionales solo aplican si se pidio el extra correspondiente
+            applies = any(requirement.marker.evaluate({**environment, 'extra': extra}) for extra in (extras or set()) | {''})
+            if not applies:
+                continue
+            # El marcador ya se evaluo, no se pasa a pip
+            requirement.marker = None
+        dependencies.append(requirement)
+    return dependencies
+
+
+# Funcion para obtener el grafo de dependencias entre las librerias instaladas
+def _installed_graph(installed:dict, environment:dict) -> dict[str, set]:
+    """
+    Las dependencias opcionales (extras) se incluyen siempre que esten instaladas, ya que los metadatos
+    no registran con que extras se instalo cada libreria.
+
+    :param installed: Diccionario {nombre normalizado: InstalledDistribution}.
+    :param environment: Entorno de evaluacion de marcadores.
+    :return: Diccionario {nombre normalizado: conjunto de dependencias instaladas}.
+    """
+    graph = {}
+    for key, record in installed.items():
+        extras = set(re.findall(r'extra\s*==\s*[\'"]([^\'"]+)[\'"]', ' '.join(record.requires)))
+        dependencies = {canonicalize_name(requirement.name) for requirement in _installed_dependencies(record, environment, extras)}
+        graph[key] = dependencies & installed.keys()
+    return graph
+
+
+class DependencyGraph:
+    """
+    Indice del grafo de dependencias de las librerias instaladas, construido a partir de los Requires-Dist de sus
+    metadatos, con las aristas en los dos sentidos para responder en tiempo constante por arista quien requiere a una
+    libreria y de quien depende. Los nombres son los normalizados (ver canonicalize_name). Se obtiene con
+    PackageInventory.dependency_graph, que lo guarda en memoria hasta que el site-packages cambia.
+    """
+
+    def __init__(self, installed:dict, environment:dict):
+        """
+        :param installed: Diccionario {nombre normalizado: InstalledDistribution}.
+        :param environment: Entorno de evaluacion de marcadores.
+        """
+        self.installed = installed
+        self.dependencies = _installed_graph(installed, environment)
+        self.dependents = {key: set() for key in installed}
+        for parent, children in self.dependencies.items():
+            for child in children:
+                self.dependents[child].add(parent)
+
+    def requires(self, name:str) -> set[str]:
+        """
+        :param name: Nombre de la libreria.
+        :return: Dependencias directas instaladas de la libreria.
+        """
+        return self.dependencies.get(canonicalize_name(name), set())
+
+    def required_by(self, name:str, recursive:bool=False) -> set[str]:
+        """
+        :param name: Nombre de la libreria.
+        :param recursive: Indicador booleano, si es True incluye tambien las librerias que la requieren indirectamente.
+        :return: Librerias instaladas que requieren a la libreria.
+        """
+        key = canonicalize_name(name)
+        if not recursive:
+            return self.dependents.get(key, set())
+        found, pending = set(), list(self.dependents.get(key, ()))
+        while pending:
+            parent = pending.pop()
+            if parent not in found and parent != key:
+                found.add(parent)
+                pending.extend(self.dependents[parent])
+        return found
+
+    def roots(self) -> set[str]:
+        """
+        :return: Librerias que ninguna otra requiere, es decir, las que se instalaron directamente.
+        """
+        return {key for key, parents in self.dependents.items() if not parents}
+
+    def why(self, name:str, max_paths:int=10) -> list[list[str]]:
+        """
+        Explica por que esta instalada una libreria: cadenas de dependencias desde una libreria instalada directamente
+        (que ninguna otra requiere) hasta ella. Las cadenas mas cortas se devuelven primero.
+
+        :param name: Nombre de la libreria.
+        :param max_paths: Numero maximo de cadenas.
+        :return: Lista de cadenas [raiz, ..., libreria]. [[libreria]] si se instalo directamente y [] si no esta instalada.
+        """
+        key = canonicalize_name(name)
+        if key not in self.installed:
+            return []
+        # Busqueda en anchura hacia arriba por las aristas inversas, sin repetir librerias dentro de una cadena
+        paths, queue = [], collections.deque([[key]])
+        while queue and len(paths) < max_paths:
+            path = queue.popleft()
+            parents = self.dependents[path[0]]
+            if not parents:
+                paths.append(path)
+                continue
+            queue.extend([parent] + path for parent in sorted(parents) if parent not in path)
+        return paths
+
+    def orphans(self, removed:list[str], keep:set=frozenset()) -> list[str]:
+        """
+        Dependencias que quedan sin uso al desinstalar las librerias dadas: las que se alcanzan desde las librerias
+        desinstaladas pero ya no desde ninguna libreria que se conserva (incluidos los ciclos entre dependencias).
+
+        :param removed: Nombres de las librerias que se desinstalan.
+        :param keep: Nombres normalizados de las librerias que se conservan siempre.
+        :return: Lista ordenada de nombres normalizados.
+        """
+        removed = {canonicalize_name(name) for name in removed} & self.installed.keys()
+        candidates, pending = set(), [child for key in removed for child in self.dependencies[key]]
+        while pending:
+            key = pending.pop()
+            if key not in candidates and key not in removed:
+                candidates.add(key)
+                pending.extend(self.dependencies[key])
+
+        # Se conserva todo lo que se alcanza desde las librerias que quedan instaladas y no son candidatas
+        needed, pending = set(), [key for key in self.installed if key not in removed and (key not in candidates or key in keep)]
+        while pending:
+            key = pending.pop()
+            if key not in needed and key not in removed:
+                needed.add(key)
+                pending.extend(self.dependencies[key])
+        return sorted(candidates - needed)
+
+
+class DependencyIssue(NamedTuple):
+    """
+    Dependencia faltante, con una version distinta a la requerida o sobrante.
+    """
+    name: str
+    required: str|None
+    installed: str|None
+    source: str
+
+
+class OrphanedDistribution(NamedTuple):
+    """
+    Libreria instalada que el proyecto no usa. required_by contiene las otras librerias sin uso que dependen de ella.
+    """
+    name: str
+    version: str
+    size: int
+    required_by: tuple = ()
+
+
+class DependencyReport(NamedTuple):
+    """
+    Resultado de la verificacion de las dependencias de un entorno. error contiene el motivo si la verificacion
+    no se pudo completar (por ejemplo un archivo requirements invalido).
+    """
+    missing: list[DependencyIssue]
+    wrong_version: list[DependencyIssue]
+    extra: list[DependencyIssue]
+    keep: set
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        return not (self.error or self.missing or self.wrong_version)
+
+
+# Funcion para comparar los requerimientos con las librerias instaladas
+def check_requirements(requirements:list[RequirementLine], installed:dict, environment:dict, check_transitive:bool=True) -> DependencyReport:
+    """
+    Compara los requerimientos con las librerias instaladas en tiempo lineal, usando un indice por nombre normalizado.
+    Tambien revisa las dependencias de las librerias requeridas (recorriendo sus metadatos Requires-Dist).
+
+    :param requirements: Lista de RequirementLine.
+    :param installed: Diccionario {nombre normalizado: InstalledDistribution}.
+    :param environment: Entorno de evaluacion de marcadores.
+    :param check_transitive: Indicador booleano, por defecto es igual a True con lo cual revisa tambien las dependencias indirectas.
+    :return: Objeto DependencyReport. keep contiene las librerias alcanzadas por los requerimientos.
+    """
+    missing, wrong_version = [], []
+    reported = set()
+
+    requirements = _resolve_url_names(requirements, installed)
+    for line in requirements:
+        record = installed.get(line.key)
+        reported.add((line.key, str(line.requirement)))
+        if record is None:
+            # Las restricciones (-c) solo aplican si la libreria esta instalada
+            if not line.constraint:
+                missing.append(DependencyIssue(line.requirement.name, line.install_spec, None, line.source))
+        elif not _satisfies(record, line.requirement):
+            wrong_version.append(DependencyIssue(record.name, line.install_spec, record.version, line.source))
+
+    # Recorrido de las dependencias, cada arista se visita una sola vez
+    keep = set()
+    pending = [(line.key, frozenset(line.requirement.extras)) for line in requirements if not line.constraint]
+    visited = set()
+    while pending:
+        key, extras = pending.pop()
+        if (key, extras) in visited:
+            continue
+        visited.add((key, extras))
+        keep.add(key)
+
+        record = installed.get(key)
+        if record is None:
+            continue
+        for dependency in _installed_dependencies(record, environment, extras):
+            dependency_key = canonicalize_name(dependency.name)
+            pending.append((dependency_key, frozenset(dependency.extras)))
+            if not check_transitive:
+                continue
+
+            if (dependency_key, str(dependency)) in reported:
+                continue
+            reported.add((dependency_key, str(dependency)))
+
+            dependency_record = installed.get(dependency_key)
+            if dependency_record is None:
+                missing.append(DependencyIssue(dependency.name, str(dependency), None, record.name))
+            elif not _satisfies(dependency_record, dependency):
+                wrong_version.append(DependencyIssue(dependency_record.name, str(dependency), dependency_record.version, record.name))
+
+    extra = [DependencyIssue(record.name, None, record.version, record.location) for key, record in installed.items() if key not in keep and key not in PROTECTED_PACKAGES]
+    return DependencyReport(missing, wrong_version, extra, keep)
+
+
+class SyncPlan(NamedTuple):
+    """
+    Plan de sincronizacion de un entorno con su archivo requirements.
+    """
+    to_install: list[str]
+    to_uninstall: list[str]
+
+
+# Analisis de los imports del proyecto -----------------------------------------------------------------------------------
+
+# Funcion para obtener los imports absolutos de un archivo, se ejecuta en los procesos del ImportScanner
+def _scan_imports(path:str, known_hash:str=None) -> tuple[str, str, list[str]|None, str|None]:
+    """
+    :param path: Ruta del archivo .py.
+    :param known_hash: Hash sha256 guardado en la cache; si el contenido no cambio no se analiza.
+    :return: Tupla (ruta, hash sha256, imports o None si no cambio, error de sintaxis o None).
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    if digest == known_hash:
+        return path, digest, None, None
+
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        return path, digest, [], f'{type(e).__name__}: {e}'
+
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            imports.add(node.module)
+        elif isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            # Imports dinamicos con un nombre literal: importlib.import_module('x') o __import__('x')
+            function = node.func
+            function_name = function.attr if isinstance(function, ast.Attribute) else getattr(function, 'id', None)
+            if function_name in ('import_module', '__import__') and not node.args[0].value.startswith('.'):
+                imports.add(node.args[0].value)
+
+    # Se guardan los dos primeros niveles, suficientes para resolver los paquetes de espacio de nombres
+    return path, digest, sorted({'.'.join(name.split('.')[:2]) for name in imports if name}), None
+
+
+class ImportScanner:
+    """
+    Analiza con ast todos los archivos .py de un directorio y obtiene los modulos que importan.
+    Los archivos se analizan en un pool de procesos y el resultado de cada archivo se guarda en una cache en disco,
+    validada con la fecha de modificacion y el tamaño, y si estos cambiaron, con el hash del contenido.
+    Se omiten los ambientes virtuales (directorios con pyvenv.cfg), los directorios ocultos y los de construccion.
+    """
+
+    EXCLUDED_DIRS = {'__pycache__', 'build', 'dist', 'node_modules', 'site-packages'}
+    CACHE_VERSION = 1
+
+    def __init__(self, directory:str, cache_dir:str=None, max_workers:int=None, parallel_threshold:int=32):
+        """
+        :param directory: Directorio a analizar.
+        :param cache_dir: Directorio de la cache. Por defecto dentro de TOOLBOX_HOME.
+        :param max_workers: Numero maximo de procesos. Por defecto el numero de CPUs.
+        :param parallel_threshold: Numero minimo de archivos a analizar para usar el pool de procesos.
+        """
+        self.directory = os.path.abspath(directory)
+        cache_dir = cache_dir or os.path.join(TOOLBOX_HOME, 'cache', 'imports')
+        self.cache_path = os.path.join(cache_dir, hashlib.sha256(self.directory.encode()).hexdigest()[:16] + '.json')
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self.errors = {}
+
+    def python_files(self) -> list[str]:
+        """
+        :return: Lista de rutas relativas de los archivos .py del directorio.
+        """
+        files = []
+        for root, dirs, names in os.walk(self.directory):
+            dirs[:] = [name for name in dirs
+                       if not name.startswith('.') and name not in self.EXCLUDED_DIRS and not name.endswith('.egg-info')
+                       and not os.path.exists(os.path.join(root, name, 'pyvenv.cfg'))]
+            files.extend(os.path.relpath(os.path.join(root, name), self.directory) for name in names if name.endswith('.py'))
+        return sorted(files)
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+            if cache.get('version') == self.CACHE_VERSION:
+                return cache['files']
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def _write_cache(self, entries:dict):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': self.CACHE_VERSION, 'directory': self.directory, 'files': entries}, f)
+        os.replace(temp_path, self.cache_path)
+
+    def scan(self) -> dict[str, list[str]]:
+        """
+        Analiza los archivos del directorio, usando la cache para los que no cambiaron.
+
+        :return: Diccionario {modulo importado: [archivos que lo importan]}.
+        """
+        cached = self._read_cache()
+        entries, pending = {}, []
+        for relative_path in self.python_files():
+            stat = os.stat(os.path.join(self.directory, relative_path))
+            entry = cached.get(relative_path)
+            if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                entries[relative_path] = entry
+            else:
+                entries[relative_path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+                pending.append((relative_path, entry))
+
+        if pending:
+            paths = [os.path.join(self.directory, relative_path) for relative_path, _ in pending]
+            known_hashes = [entry['sha256'] if entry else None for _, entry in pending]
+            if len(pending) >= self.parallel_threshold:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    results = list(executor.map(_scan_imports, paths, known_hashes, chunksize=max(1, len(paths) // 64)))
+            else:
+                results = [_scan_imports(path, known_hash) for path, known_hash in zip(paths, known_hashes)]
+
+            for (relative_path, previous), (_, digest, imports, error) in zip(pending, results):
+                entry = entries[relative_path]
+                entry['sha256'] = digest
+                # Si el contenido no cambio (solo la fecha), se reutilizan los imports anteriores
+                entry['imports'] = previous['imports'] if imports is None else imports
+                entry['error'] = previous.get('error') if imports is None else error
+            self._write_cache(entries)
+
+        self.errors = {path: entry['error'] for path, entry in entries.items() if entry.get('error')}
+        modules = {}
+        for relative_path, entry in entries.items():
+            for module in entry['imports']:
+                modules.setdefault(module, []).append(relative_path)
+        return modules
+
+    def local_modules(self) -> set[str]:
+        """
+        Nombres que se pueden importar desde el propio proyecto: modulos .py y directorios con archivos .py.
+
+        :return: Conjunto de nombres.
+        """
+        names = set()
+        for relative_path in self.python_files():
+            parts = os.path.normpath(relative_path).split(os.sep)
+            names.update(parts[:-1])
+            names.add(os.path.splitext(parts[-1])[0])
+        return names
+
+
+# Funcion para obtener las librerias instaladas que proveen los modulos importados
+def _resolve_imports(modules:dict, module_map:dict, ignored:set) -> tuple[dict, dict]:
+    """
+    :param modules: Diccionario {modulo importado: [archivos]} de ImportScanner.scan.
+    :param module_map: Diccionario {modulo: [librerias]} de PackageInventory.top_level_modules.
+    :param ignored: Nombres de primer nivel que no corresponden a librerias (biblioteca estandar, modulos locales).
+    :return: Tupla ({libreria: [modulos]}, {modulo sin libreria instalada: [archivos]}).
+    """
+    distributions, unresolved = {}, {}
+    for module, files in modules.items():
+        top = module.split('.')[0]
+        if top in ignored:
+            continue
+        owners = module_map.get(module) or module_map.get(top)
+        if not owners:
+            unresolved.setdefault(top, []).extend(files)
+            continue
+        for owner in owners:
+            distributions.setdefault(owner, []).append(module)
+    return distributions, unresolved
+
+
+# Perfil de tiempo de importacion ----------------------------------------------------------------------------------------
+
+# Funcion para leer la salida de python -X importtime como un arbol de modulos
+def _parse_importtime(output:str) -> list[dict]:
+    """
+    La salida de -X importtime lista cada modulo despues de los modulos que importa, con dos espacios
+    de sangria por nivel, por lo que el arbol se arma con una pila de modulos pendientes por nivel.
+
+    :param output: Salida de errores del interprete.
+    :return: Lista de nodos raiz {'name', 'self_us', 'cumulative_us', 'children'}.
+    """
+    pending = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|', 2)
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            # Encabezado de la salida
+            continue
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        node = {'name': name.strip(), 'self_us': self_us, 'cumulative_us': cumulative_us, 'children': pending.pop(depth + 1, [])}
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+# Funcion para combinar los arboles de varias ejecuciones con la mediana de cada modulo
+def _aggregate_importtime(runs:list[list[dict]], owner) -> dict:
+    """
+    :param runs: Arboles de _parse_importtime, uno por ejecucion.
+    :param owner: Funcion que devuelve la libreria duena de un modulo ('stdlib', 'project', 'unknown' o el nombre normalizado).
+    :return: Diccionario con el arbol, los tiempos por modulo y por libreria, en microsegundos.
+    """
+    samples = {}
+
+    def collect(nodes):
+        for node in nodes:
+            times = samples.setdefault(node['name'], ([], []))
+            times[0].append(node['self_us'])
+            times[1].append(node['cumulative_us'])
+            collect(node['children'])
+
+    for tree in runs:
+        collect(tree)
+
+    modules = {name: {'self_us': int(statistics.median(self_times)), 'cumulative_us': int(statistics.median(cumulative_times)), 'distribution': owner(name)}
+               for name, (self_times, cumulative_times) in samples.items()}
+
+    # El arbol de la primera ejecucion con las medianas, ordenado por tiempo acumulado
+    def build(nodes):
+        return sorted(({'name': node['name'], **{key: modules[node['name']][key] for key in ('self_us', 'cumulative_us')}, 'children': build(node['children'])}
+                       for node in nodes), key=lambda node: -node['cumulative_us'])
+
+    tree = build(runs[0]) if runs else []
+
+    # Tiempo acumulado por libreria: modulos de la libreria sin un ancestro de la misma libreria, para no contarlos dos veces
+    distributions = {}
+
+    def accumulate(nodes, ancestors):
+        for node in nodes:
+            distribution = modules[node['name']]['distribution']
+            entry = distributions.setdefault(distribution, {'self_us': 0, 'cumulative_us': 0, 'modules': 0})
+            entry['self_us'] += node['self_us']
+            entry['modules'] += 1
+            if distribution not in ancestors:
+                entry['cumulative_us'] += node['cumulative_us']
+            accumulate(node['children'], ancestors | {distribution})
+
+    accumulate(tree, frozenset())
+    return {
+        'total_us': sum(node['cumulative_us'] for node in tree),
+        'tree': tree,
+        'modules': modules,
+        'distributions': dict(sorted(distributions.items(), key=lambda item: -item[1]['cumulative_us'])),
+    }
+
+
+# Funcion para mostrar el arbol de importacion hasta cierto tiempo minimo
+def _print_import_tree(nodes:list[dict], min_us:int, depth:int=0):
+    for node in nodes:
+        if node['cumulative_us'] < min_us:
+            continue
+        print(f"{node['cumulative_us'] / 1000:>10.1f} {node['self_us'] / 1000:>9.1f}  {'  ' * depth}{node['name']}")
+        _print_import_tree(node['children'], min_us, depth + 1)
+
+
+# Compilacion de bytecode ------------------------------------------------------------------------------------------------
+
+# Modos de invalidacion de los .pyc (PEP 552)
+PYC_INVALIDATION_MODES = ('timestamp', 'checked-hash', 'unchecked-hash')
+
+
+# Procesos de trabajo precargados ----------------------------------------------------------------------------------------
+
+# Funcion para enviar un mensaje de control al proceso de trabajo
+def _worker_request(socket_path:str, message:dict, timeout:float=5.0) -> dict|None:
+    """
+    :param socket_path: Ruta del socket Unix del proceso de trabajo.
+    :param message: Mensaje ({'type': 'status'} o {'type': 'stop'}).
+    :param timeout: Tiempo maximo de espera en segundos.
+    :return: Respuesta del proceso de trabajo, o None si no esta en ejecucion.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(timeout)
+            connection.connect(socket_path)
+            data = marshal.dumps(message)
+            connection.sendall(len(data).to_bytes(4, 'little') + data)
+            data = b''
+            while len(data) < 4 or len(data) < int.from_bytes(data[:4], 'little') + 4:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    return None
+                data += chunk
+            return marshal.loads(data[4:])
+    except OSError:
+        return None
+
+
+# Archivos lock ----------------------------------------------------------------------------------------------------------
+
+# Version del formato del archivo lock
+LOCK_FORMAT_VERSION = 1
+
+# Variables de los marcadores que deben coincidir para instalar un lock en otro entorno
+LOCK_ENVIRONMENT_KEYS = ('implementation_name', 'python_version', 'sys_platform', 'platform_machine')
+
+
+# Funcion para obtener el grafo de dependencias instaladas a partir de las raices
+def _lock_graph(installed:dict, roots:list[tuple[str, frozenset]], environment:dict) -> tuple[set, list[dict]]:
+    """
+    Recorre las dependencias instaladas (Requires-Dist) desde las raices.
+
+    :param installed: Diccionario {nombre normalizado: InstalledDistribution}.
+    :param roots: Lista de tuplas (nombre normalizado, extras).
+    :param environment: Entorno de evaluacion de marcadores.
+    :return: Tupla (nombres normalizados alcanzados, aristas padre -> hijo).
+    """
+    packages, edges, visited = set(), [], set()
+    pending = list(roots)
+    while pending:
+        key, extras = pending.pop()
+        if (key, extras) in visited or key not in installed:
+            continue
+        visited.add((key, extras))
+        packages.add(key)
+
+        record = installed[key]
+        for requirement_string in record.requires:
+            try:
+                requirement = Requirement(requirement_string)
+            except InvalidRequirement:
+                continue
+            marker = str(requirement.marker) if requirement.marker is not None else None
+            if requirement.marker is not None and not any(requirement.marker.evaluate({**environment, 'extra': extra}) for extra in extras | {''}):
+                continue
+
+            child = canonicalize_name(requirement.name)
+            requirement.marker = None
+            edges.append({'parent': key, 'child': child, 'requirement': str(requirement), 'marker': marker})
+            pending.append((child, frozenset(requirement.extras)))
+
+    # Una misma arista puede aparecer con distintos extras del padre
+    unique_edges = {(edge['parent'], edge['child'], edge['requirement']): edge for edge in edges}
+    return packages, sorted(unique_edges.values(), key=lambda edge: (edge['parent'], edge['child']))
+
+
+# Funcion para convertir un archivo lock en lineas de requirements para pip con hashes
+def _lock_to_requirements(lock:dict) -> dict[str, list[str]]:
+    """
+    :return: Diccionario con las lineas de requirements de cada grupo: 'hashed' (versiones con hashes), 'unhashed'
+        (versiones o URLs sin hashes) y 'editable' (instalaciones editables, con -e).
+    """
+    groups = {'hashed': [], 'unhashed': [], 'editable': []}
+    for package in lock['packages']:
+        if package.get('editable'):
+            groups['editable'].append(f"-e {package['url']}")
+            continue
+        if package.get('url'):
+            line = f"{package['name']} @ {package['url']}"
+        else:
+            line = f"{package['name']}=={package['version']}"
+        if package.get('hashes'):
+            groups['hashed'].append(line + ''.join(f' --hash={hash_value}' for hash_value in package['hashes']))
+        else:
+            groups['unhashed'].append(line)
+    return groups
+
+
+# Decorador de los metodos de Project que son operaciones: activa el proyecto para los eventos de progreso y mide la
+# operacion con el Tracer. Cada operacion acumula las duraciones por fase de pip en su propio diccionario, que se guarda
+# en los atributos de su intervalo y en el historial del proyecto, de modo que operaciones simultaneas no se mezclan.
+# Los metodos de consulta (get_inventory, get_helper, ...) no se decoran, por lo que no generan intervalos
+def _project_operation(method):
+    @functools.wraps(method)
+    def operation(self, *args, **kwargs):
+        # Cada operacion, tambien las internas, es un paso donde se puede detener una operacion cancelada
+        _check_cancelled()
+        # Las llamadas internas entre metodos forman parte de la misma operacion
+        if _active_project.get() is self:
+            return method(self, *args, **kwargs)
+        timings = {}
+        with self.tracer.span(f'Project.{method.__name__}', 'operation', directory=self.directory, phase_timings=timings):
+            project_token = _active_project.set(self)
+            timings_token = _operation_timings.set(timings)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                _active_project.reset(project_token)
+                _operation_timings.reset(timings_token)
+                with self._timings_lock:
+                    self.phase_timings = timings
+                    self.phase_history.append((method.__name__, timings))
+    return operation
+
 
 # Creacion de la clase Project -------------------------------------------------------------------------------------------
 
 class Project:
-    def __init__(self, directory:str=None, venv_name:str='venv', requirements_name:str='requirements.txt'):
+    def __init__(self, directory:str=None, venv_name:str='venv', requirements_name:str='requirements.txt', index_url:str=None, wheelhouse:Wheelhouse=None, venv_template_packages:list[str]=None, change_dir:bool=True, progress_callbacks:list=None, tracer:Tracer=None, prune_allowlist:list[str]=None, precompile:bool=False, snapshot_retention:int=3):
         self.directory = directory
         self.venv_name = venv_name
         self.venv_path = self.venv_name if self.directory is None else os.path.join(self.directory, self.venv_name)
         self.requirements_path = requirements_name if self.directory is None else os.path.join(self.directory, requirements_name)
+        self.lock_path = os.path.splitext(self.requirements_path)[0] + '.lock.json'
+        self.index_url = index_url
+
+        # Almacen local de wheels compartido entre proyectos
+        self.wheelhouse = wheelhouse if wheelhouse is not None else Wheelhouse()
+
+        # Plantillas de ambientes virtuales. Si se indican librerias base, los ambientes se crean clonando la plantilla
+        self.venv_templates = VenvTemplateStore(os.path.join(TOOLBOX_HOME, 'venv_templates'), run_command=run_command)
+        self.venv_template_packages = venv_template_packages
+
+        # Inventarios de librerias instaladas, reutilizados entre llamadas
+        self._inventories = {}
+
+        # Funciones que reciben los eventos de progreso de pip, duracion de cada fase por libreria de la ultima operacion
+        # terminada e historial (nombre de la operacion, duraciones) de las ultimas operaciones
+        self.progress_callbacks = list(progress_callbacks or [])
+        self.phase_timings = {}
+        self.phase_history = collections.deque(maxlen=100)
+        self._timings_lock = threading.Lock()
+
+        # Registro de intervalos de tiempo de las operaciones y comandos (ver Tracer)
+        self.tracer = tracer if tracer is not None else default_tracer
+
+        # Librerias que prune conserva aunque el proyecto no las importe (por ejemplo plugins)
+        self.prune_allowlist = list(prune_allowlist or [])
+
+        # Compilar el bytecode despues de cada instalacion (ver precompile_bytecode)
+        self.precompile = precompile
+
+        # Instantaneas del ambiente virtual antes de las actualizaciones y numero de instantaneas que se conservan
+        self.snapshots = VenvSnapshotStore(self.venv_path)
+        self.snapshot_retention = snapshot_retention
 
         # Establece el directorio de trabajo de donde se encuentra el script
-        sys.path.append(self.directory)
-        os.chdir(self.directory)
+        # Con change_dir=False no se modifica el estado global del proceso, lo cual permite usar varios proyectos a la vez
+        if change_dir and self.directory is not None:
+            sys.path.append(self.directory)
+            os.chdir(self.directory)
+
+    # Funcion para obtener el inventario de librerias instaladas
+    def get_inventory(self, on_venv:bool=True) -> PackageInventory:
+        """
+        Devuelve el inventario de librerias instaladas, leido de los metadatos sin iniciar pip.
+        El inventario se reutiliza entre llamadas y se actualiza solo cuando el site-packages cambia.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa el entorno virtual.
+        :return: Objeto PackageInventory.
+        """
+        if on_venv:
+            venv = self.venv
+            if not venv.exists:
+                raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
+            # Se crea un inventario nuevo si el ambiente se volvio a crear con otros directorios site-packages
+            key = venv.path
+            if key not in self._inventories or self._inventories[key].site_packages != venv.site_packages:
+                self._inventories[key] = PackageInventory.from_venv(self.venv_path)
+        else:
+            key = sys.executable
+            if key not in self._inventories:
+                self._inventories[key] = PackageInventory(sys.executable)
+
+        return self._inventories[key]
+
+    @property
+    def venv(self) -> VenvInfo:
+        """
+        Informacion del ambiente virtual del proyecto (interprete, version, site-packages), compartida entre metodos.
+        """
+        return VenvInfo.get(self.venv_path)
+
+    # Funcion para obtener el interprete de Python del ambiente virtual o del sistema
+    def _python_executable(self, on_venv:bool=True, create:bool=False) -> str:
+        """
+        :param on_venv: Indicador booleano, si es True usa el ambiente virtual, en otro caso el interprete actual.
+        :param create: Indicador booleano, si es True crea el ambiente virtual cuando no existe, en otro caso lanza FileNotFoundError.
+        :return: Ruta del interprete de Python.
+        """
+        if not on_venv:
+            return sys.executable
+        if not self.venv.exists:
+            if not create:
+                raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
+            self.create_virtual_environment()
+        return self.venv.python_executable
+
+    # Funcion para obtener el proceso auxiliar del ambiente
+    def get_helper(self, on_venv:bool=True) -> VenvHelper:
+        """
+        Devuelve el proceso auxiliar que responde las consultas que necesitan el interprete del ambiente (entorno de
+        marcadores, sys.path, metadatos) sin iniciar un proceso por consulta. Se comparte entre los objetos Project.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa el entorno virtual.
+        :return: Objeto VenvHelper.
+        """
+        return VenvHelper.get(self._python_executable(on_venv))
+
+    # Funcion para obtener el entorno de evaluacion de marcadores del interprete
+    def _marker_environment(self, on_venv:bool, inventory:PackageInventory=None) -> dict:
+        if on_venv:
+            # Los valores reales del interprete del ambiente; si no responde se ajusta el del interprete actual
+            try:
+                return self.get_helper(on_venv).environment()
+            except HelperError:
+                pass
+        return marker_environment(inventory.python_version if on_venv and inventory is not None else None)
 
     # Funcion para crear un archivo de .gitignore con los patrones de archivos mas comunes
     def create_default_gitignore(self):
@@ -46,6 +2759,7 @@ __pycache__/
 # Virtual environment
 venv/
 *.venv
+.*_snapshots/
 
 # Operating system files
 .DS_Store
@@ -84,21 +2798,36 @@ Project_toolbox.py
             print(f"Error al crear el archivo .gitignore en {gitignore_path}: {e}")
 
     # Funcion para crear un ambiente virtual
-    def create_virtual_environment(self):
+    @_project_operation
+    def create_virtual_environment(self, template:bool=None, base_packages:list[str]=None):
         """
         Crea un entorno virtual en el directorio especificado.
+        En el modo plantilla el entorno se clona de un entorno base guardado por el toolbox (con enlaces duros o reflinks),
+        el cual se crea la primera vez para el intérprete y las librerías base dadas.
         
+        :param template: Indicador booleano, indica si se clona el entorno desde una plantilla. Por defecto se usa la plantilla si el proyecto tiene venv_template_packages.
+        :param base_packages: Lista de librerías base de la plantilla. Por defecto venv_template_packages.
         """
+        if template is None:
+            template = self.venv_template_packages is not None
+        if base_packages is None:
+            base_packages = self.venv_template_packages or []
         
-        if os.path.exists(self.venv_path):
+        if self.venv.exists:
             print(f"El entorno virtual '{self.venv_name}' ya existe.")
         else:
             try:
                 print(f"Creando el entorno virtual '{self.venv_name}' en {self.venv_path}...")
-                subprocess.check_call([sys.executable, '-m', 'venv', self.venv_path])
+                if template:
+                    template_path = self.venv_templates.get_or_create(sys.executable, base_packages, wheelhouse=self.wheelhouse)
+                    self.venv_templates.clone(template_path, self.venv_path)
+                else:
+                    run_command([sys.executable, '-m', 'venv', self.venv_path])
                 print(f"El entorno virtual '{self.venv_name}' ha sido creado exitosamente.")
             except subprocess.CalledProcessError as e:
                 print(f"Ha ocurrido un error al crear el entorno virtual. Detalles del error: {e}")
+                if _raise_command_errors.get():
+                    raise
 
 
     # Funcion para activar el entorno virtual
@@ -123,6 +2852,7 @@ Project_toolbox.py
             print("El script de activación no existe. ¿Está seguro de que el entorno virtual está creado?")
 
     # Funcion para crear el archivo requirements con las librarias instaladas en el directorio
+    @_project_operation
     def create_requirements_file(self, from_venv:bool=True):
         """
         Crea un archivo de requirements con las librerias usadas en el proyecto.
@@ -130,35 +2860,74 @@ Project_toolbox.py
         :param from_venv: Indicador booleano, por defecto es igual a True, con lo cual, toma las librerias instaladas en el ambiente virtual especificado.
         """
         
-        # Determinar la ruta del ejecutable de Python
+        # Ubicar el directorio del ambiente virtual
         if from_venv:
-
-            # Ubicar el directorio del ambiente virtual
-            if os.path.exists(self.venv_path):
-                # Ruta dentro del ambiente virtual
-                python_executable = os.path.join(self.venv_path, 'bin', 'python') if os.name != 'nt' else os.path.join(self.venv_path, 'Scripts', 'python.exe')
+            if self.venv.exists:
                 print('Ambiente virtual encontrado.')
             else:
                 raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
 
-        else:
-            # Usar el Python del sistema
-            python_executable = sys.executable
-        
         try:
+            # Obtener las lineas equivalentes a pip freeze desde el inventario
+            freeze_lines = self.get_inventory(on_venv=from_venv).freeze()
+
             # Abrir el archivo en el modo de escritura
             with open(self.requirements_path, 'w') as f:
-                # Llamar a pip freeze y dirigir la salida al archivo
-                subprocess.check_call([python_executable, '-m', 'pip', 'freeze'], stdout=f)
+                f.writelines(line + '\n' for line in freeze_lines)
             print(f'Archivo requirements.txt creado en {self.requirements_path}')
         except subprocess.CalledProcessError as e:
             print(f"Error al ejecutar pip freeze: {e}")
+            if _raise_command_errors.get():
+                raise
         except Exception as ex:
             print(f"Error al crear el archivo requirements.txt en {self.requirements_path}: {ex}")
+            if _raise_command_errors.get():
+                raise
+
+
+    # Funcion para crear el archivo requirements solo con las librerias que importa el proyecto
+    @_project_operation
+    def create_minimal_requirements_file(self, from_venv:bool=True, requirements_path:str=None, max_workers:int=None) -> list[str]:
+        """
+        Crea un archivo de requirements solo con las librerias que importa el codigo del proyecto y sus dependencias
+        transitivas, con las versiones instaladas. Las librerias instaladas que no se importan (herramientas de desarrollo,
+        pruebas, etc.) no se incluyen. Los imports se obtienen analizando los archivos .py del directorio con ImportScanner.
+
+        :param from_venv: Indicador booleano, por defecto es igual a True, con lo cual, toma las librerias instaladas en el ambiente virtual especificado.
+        :param requirements_path: Ruta del archivo a crear. Por defecto el archivo requirements del proyecto.
+        :param max_workers: Numero maximo de procesos para analizar los archivos.
+        :return: Lista de lineas escritas.
+        """
+        requirements_path = requirements_path or self.requirements_path
+        inventory = self.get_inventory(on_venv=from_venv)
+
+        scanner = ImportScanner(self.directory or os.getcwd(), max_workers=max_workers)
+        imports = scanner.scan()
+        for path, error in scanner.errors.items():
+            print(f"No se pudo analizar {path}: {error}")
+
+        # Se ignoran la biblioteca estandar y los modulos del propio proyecto
+        ignored = set(sys.stdlib_module_names) | {'__future__', '__main__'} | scanner.local_modules()
+        imported, unresolved = _resolve_imports(imports, inventory.top_level_modules(), ignored)
+        if unresolved:
+            print(f"Imports sin librería instalada: {', '.join(sorted(unresolved))}")
+
+        installed = inventory.by_key()
+        environment = self._marker_environment(from_venv, inventory)
+        packages, _ = _lock_graph(installed, [(name, frozenset()) for name in imported], environment)
+
+        # pip solo se incluye si el proyecto lo importa directamente
+        lines = [_freeze_line(installed[key]) for key in sorted(packages, key=lambda key: installed[key].name.lower())
+                 if key not in FREEZE_EXCLUDED or key in imported]
+        with open(requirements_path, 'w') as f:
+            f.writelines(line + '\n' for line in lines)
+        print(f"Archivo requirements con {len(imported)} librerías importadas y {len(lines) - len(imported)} dependencias creado en {requirements_path}")
+        return lines
 
 
     # Funcion para instalar la libreria dada
-    def install_library(self,library_name:str|list, on_venv:bool=True, update_requirements:bool=True):
+    @_project_operation
+    def install_library(self,library_name:str|list, on_venv:bool=True, update_requirements:bool=True, use_wheelhouse:bool=True):
         """
         Instala la librería especificada usando pip. 
         Por defecto se instala en un entorno virtual y se actualiza el archivo requirements.
@@ -166,6 +2935,7 @@ Project_toolbox.py
         :param library_name: String o lista de nombre(s) de la librería(s) a instalar
         :param on_venv: Indicador booleano, por defecto es igual a True con lo cual instala la libreria en el entorno virtual.
         :param update_requirements: Indicador booleano, por defecto es igual a True con lo cual actualiza el archivo requirements.
+        :param use_wheelhouse: Indicador booleano, por defecto es igual a True con lo cual instala desde el almacen local de wheels las versiones fijadas con == y agrega al almacen las demás.
         """
 
         if isinstance(library_name, str):
@@ -174,51 +2944,145 @@ Project_toolbox.py
             raise ValueError("El parámetro 'libraries' debe ser un string o lista de nombre(s) de librería(s).")
 
         try:
-            if on_venv:
-                if not os.path.exists(self.venv_path):
-                    self.create_virtual_environment()
-                python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
-            else:
-                python_executable = sys.executable
+            python_executable = self._python_executable(on_venv, create=True)
             
-            subprocess.check_call([python_executable, "-m", "pip", "install"] + library_name)
+            self._install_with_wheelhouse(python_executable, library_name, use_wheelhouse=use_wheelhouse, on_venv=on_venv)
             print(f"{library_name} instalado correctamente en {python_executable}.")
+            self._after_install(on_venv)
 
             if update_requirements:
                 self.create_requirements_file(from_venv=on_venv)
 
         except subprocess.CalledProcessError as e:
             print(f"Error al instalar {library_name}. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
 
-    def check_outdated_libraries(self, on_venv=True):
+    @_project_operation
+    def check_outdated_libraries(self, on_venv=True, use_pip:bool=False, ttl:float=3600, max_connections:int=10) -> list[OutdatedPackage]:
         """
-        Chequea las librerías desactualizadas usando pip list --outdated.
+        Chequea las librerías desactualizadas consultando el índice de paquetes de forma concurrente.
+        Las respuestas del índice se guardan en una cache en disco, por lo que las revisiones seguidas casi no usan la red.
         
         :param on_venv: Indicador booleano, por defecto True con lo cual revisa en el entorno virtual.
+        :param use_pip: Indicador booleano, por defecto False. Si es True usa pip list --outdated en lugar del revisor concurrente.
+        :param ttl: Segundos durante los cuales se reutiliza la respuesta guardada del índice sin volver a consultarlo.
+        :param max_connections: Número máximo de consultas simultáneas al índice.
+        :return: Lista de las librerías desactualizadas.
         """
         try:
-            if on_venv:
-                if not os.path.exists(self.venv_path):
-                    raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
-                python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
-            else:
-                python_executable = sys.executable
-            
-            output = subprocess.check_output([python_executable, "-m", "pip", "list", "--outdated"], text=True)
-            print("Librerías desactualizadas:\n", output)
+            python_executable = self._python_executable(on_venv)
+            outdated_packages = self._find_outdated_packages(python_executable, on_venv, use_pip=use_pip, ttl=ttl, max_connections=max_connections)
+
+            # Mismo formato de columnas que pip list --outdated
+            widths = [max([len(str(package[i])) for package in outdated_packages] + [len(title)]) for i, title in enumerate(('Package', 'Version', 'Latest'))]
+            lines = [f"{'Package':<{widths[0]}} {'Version':<{widths[1]}} {'Latest':<{widths[2]}}", ' '.join('-' * width for width in widths)]
+            lines += [f"{package.name:<{widths[0]}} {package.version:<{widths[1]}} {package.latest_version:<{widths[2]}}" for package in outdated_packages]
+            print("Librerías desactualizadas:\n", '\n'.join(lines))
+
+            return outdated_packages
 
         except subprocess.CalledProcessError as e:
             print(f"Error al chequear librerías desactualizadas. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+
+    # Funcion para obtener las librerias desactualizadas consultando el indice, con pip como respaldo
+    def _find_outdated_packages(self, python_executable:str, on_venv:bool=True, use_pip:bool=False, ttl:float=3600, max_connections:int=10) -> list[OutdatedPackage]:
+        """
+        Se consulta el índice con el inventario en memoria; pip list --outdated solo se usa como respaldo o si use_pip es True.
+
+        :param python_executable: Ruta del intérprete de Python donde se revisan las librerías.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual revisa el entorno virtual.
+        :param use_pip: Indicador booleano, si es True usa directamente pip list --outdated.
+        :param ttl: Segundos durante los cuales se reutiliza la respuesta guardada del índice sin volver a consultarlo.
+        :param max_connections: Número máximo de consultas simultáneas al índice.
+        :return: Lista de OutdatedPackage.
+        """
+        if not use_pip:
+            try:
+                inventory = self.get_inventory(on_venv=on_venv)
+                checker = OutdatedChecker(index_url=self.index_url, ttl=ttl, max_connections=max_connections)
+                return checker.check(inventory.records(), python_version=inventory.python_version)
+            except Exception as e:
+                print(f"No fue posible consultar el índice directamente, se usará pip. Detalles: {e}")
+
+        output = run_command([python_executable, "-m", "pip", "list", "--outdated", "--format=json"], capture_output=True)
+        return [OutdatedPackage(package['name'], package['version'], package['latest_version']) for package in json.loads(output)]
+
+    # Funcion para obtener los nombres de las librerias desactualizadas
+    def _get_outdated_packages(self, python_executable:str, on_venv:bool=True, ttl:float=3600, max_connections:int=10) -> list[str]:
+        """
+        Obtiene los nombres de las librerías desactualizadas y muestra sus versiones.
+
+        :param python_executable: Ruta del intérprete de Python donde se revisan las librerías.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual revisa el entorno virtual.
+        :param ttl: Segundos durante los cuales se reutiliza la respuesta guardada del índice sin volver a consultarlo.
+        :param max_connections: Número máximo de consultas simultáneas al índice.
+        :return: Lista de nombres de las librerías desactualizadas.
+        """
+        outdated_packages = self._find_outdated_packages(python_executable, on_venv, ttl=ttl, max_connections=max_connections)
+        if outdated_packages:
+            print("Librerías desactualizadas:")
+            for package in outdated_packages:
+                print(f"  - {package.name} {package.version} -> {package.latest_version}")
+        else:
+            print("Todas las librerías están actualizadas.")
+
+        return [package.name for package in outdated_packages]
+
+    # Funcion para actualizar un conjunto de librerias
+    def _upgrade_packages(self, python_executable:str, package_names:list[str], batch:bool=True, chunk_size:int=None) -> list[str]:
+        """
+        Actualiza las librerías dadas. En el modo batch se resuelven todas juntas en una sola ejecución de pip
+        (o una por bloque si se indica chunk_size); si un bloque falla, sus librerías se actualizan una por una.
+
+        :param python_executable: Ruta del intérprete de Python donde se actualizan las librerías.
+        :param package_names: Lista de nombres de las librerías a actualizar.
+        :param batch: Indicador booleano, por defecto es igual a True con lo cual actualiza las librerías en bloque.
+        :param chunk_size: Número máximo de librerías por bloque. Por defecto todas en un solo bloque.
+        :return: Lista de las librerías que no se pudieron actualizar.
+        """
+        if not package_names:
+            return []
+
+        if batch:
+            size = chunk_size if chunk_size else len(package_names)
+            chunks = [package_names[i:i + size] for i in range(0, len(package_names), size)]
+        else:
+            chunks = [[package_name] for package_name in package_names]
+
+        failed_packages = []
+        for chunk in chunks:
+            try:
+                run_command([python_executable, "-m", "pip", "install", "--upgrade"] + chunk)
+                print(f"{', '.join(chunk)} actualizado(s) correctamente.")
+            except subprocess.CalledProcessError as e:
+                if len(chunk) == 1:
+                    print(f"Error al actualizar {chunk[0]}. Detalles: {e}")
+                    failed_packages.extend(chunk)
+                    continue
+
+                # Respaldo: se actualiza una por una cada libreria del bloque que fallo
+                print(f"Error al actualizar el bloque {chunk}, se actualizarán una por una. Detalles: {e}")
+                failed_packages.extend(self._upgrade_packages(python_executable, chunk, batch=False))
+
+        return failed_packages
 
     # Funcion para actualizar la libreria especificada
-    def upgrade_library(self,library_name:str|list, on_venv:bool=True, update_requirements:bool=True):
+    @_project_operation
+    def upgrade_library(self,library_name:str|list, on_venv:bool=True, update_requirements:bool=True, batch:bool=True, chunk_size:int=None, snapshot:bool=True, rollback_on_failure:bool=False):
         """
         Actualiza la librería especificada usando pip.
         Por defecto se actualiza en un entorno virtual.
 
-        :param library_name: Nombre de la librería a actualizar.
+        :param library_name: Nombre de la librería a actualizar, o 'all' para actualizar todas las librerías desactualizadas.
         :param on_venv: Indicador booleano, por defecto es igual a True con lo cual instala la libreria en el entorno virtual.
         :param update_requirements: Indicador booleano, por defecto es igual a True con lo cual actualiza el archivo requirements.
+        :param batch: Indicador booleano, por defecto es igual a True con lo cual, con 'all', actualiza todas las librerías en una sola ejecución de pip.
+        :param chunk_size: Número máximo de librerías por ejecución de pip en el modo batch. Por defecto todas en una sola ejecución.
+        :param snapshot: Indicador booleano, por defecto es igual a True con lo cual, con 'all', crea una instantánea del ambiente antes de actualizar.
+        :param rollback_on_failure: Indicador booleano, si es True restaura la instantánea cuando alguna librería no se pudo actualizar.
         """
         if library_name=='all':
             pass
@@ -227,43 +3091,56 @@ Project_toolbox.py
         elif not isinstance(library_name, list):
             raise ValueError("El parámetro 'libraries' debe ser un string o lista de nombre(s) de librería(s).")
 
+        before = None
         try:
-            if on_venv:
-                if not os.path.exists(self.venv_path):
-                    raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
-                else:
-                    python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
-            else:
-                python_executable = sys.executable
+            python_executable = self._python_executable(on_venv)
             
             if library_name=='all':
-                subprocess.check_call([python_executable, "-m", "pip", "install", "--upgrade", "pip"])
-                subprocess.check_call([python_executable, "-m", "pip", "list", "--outdated"], text=True)
-                outdated_packages = subprocess.check_output([python_executable, "-m", "pip", "list", "--outdated"], text=True).splitlines()[2:]
-                for package in outdated_packages:
-                    package_name = package.split(' ')[0]
-                    subprocess.check_call([python_executable, "-m", "pip", "install", "--upgrade", package_name])
-                    print(f"{package_name} actualizado correctamente.")
+                outdated_packages = self._get_outdated_packages(python_executable, on_venv)
+                if snapshot and on_venv and outdated_packages:
+                    before = self.create_snapshot('upgrade all')
+                # pip se actualiza primero, y solo si esta desactualizado
+                if 'pip' in map(canonicalize_name, outdated_packages):
+                    run_command([python_executable, "-m", "pip", "install", "--upgrade", "pip"])
+                    outdated_packages = [name for name in outdated_packages if canonicalize_name(name) != 'pip']
+                failed_packages = self._upgrade_packages(python_executable, outdated_packages, batch=batch, chunk_size=chunk_size)
+                if failed_packages:
+                    self._handle_failed_upgrade(before, rollback_on_failure)
+                    if _raise_command_errors.get():
+                        raise RuntimeError(f"No se pudieron actualizar: {', '.join(failed_packages)}.")
+                    if rollback_on_failure and before is not None:
+                        return
             else:
-                subprocess.check_call([python_executable, "-m", "pip", "install", "--upgrade"] + library_name)
+                run_command([python_executable, "-m", "pip", "install", "--upgrade"] + library_name)
                 print(f"{library_name} actualizado correctamente en {python_executable}.")
+            self._after_install(on_venv)
 
             if update_requirements:
                 self.create_requirements_file(from_venv=on_venv)
 
         except subprocess.CalledProcessError as e:
             print(f"Error al actualizar {library_name}. Detalles: {e}")
+            self._handle_failed_upgrade(before, rollback_on_failure)
+            if _raise_command_errors.get():
+                raise
 
 
     # Funcion para desintalar la libreria dada
-    def uninstall_library(self,library_name:str|list, from_venv:bool=True, update_requirements:bool=True):
+    @_project_operation
+    def uninstall_library(self,library_name:str|list, from_venv:bool=True, update_requirements:bool=True, cascade:bool=False, dry_run:bool=False) -> list[str]:
         """
         Desinstala la librería especificada usando pip.
         Por defecto se desintala en un entorno virtual.
+        Con cascade=True se desinstalan en la misma ejecución de pip las dependencias que quedan sin uso, es decir, las que
+        ninguna otra librería instalada requiere. pip, setuptools, wheel, prune_allowlist y las librerías del archivo
+        requirements se conservan siempre (salvo si el archivo es la salida de freeze del ambiente, que las lista todas).
         
         :param library_name: Nombre de la librería a desinstalar.
         :param from_venv: Indicador booleano, por defecto es igual a True con lo cual desinstala la libreria del entorno virtual.
         :param update_requirements: Indicador booleano, por defecto es igual a True con lo cual actualiza el archivo requirements.
+        :param cascade: Indicador booleano, si es True desinstala tambien las dependencias que quedan sin uso.
+        :param dry_run: Indicador booleano, si es True solo muestra las librerías que se desinstalarían.
+        :return: Lista de las librerías desinstaladas (o que se desinstalarían con dry_run).
         """
 
         if isinstance(library_name, str):
@@ -272,124 +3149,657 @@ Project_toolbox.py
             raise ValueError("El parámetro 'libraries' debe ser un string o lista de nombre(s) de librería(s).")
 
         try:
-            if from_venv:
-                if not os.path.exists(self.venv_path):
-                    raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
-                else:
-                    python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
-            else:
-                python_executable = sys.executable
+            python_executable = self._python_executable(from_venv)
+
+            to_uninstall = list(library_name)
+            if cascade or dry_run:
+                graph = self.get_dependency_graph(on_venv=from_venv)
+                patterns = [canonicalize_name(pattern) for pattern in self.prune_allowlist]
+                keep = PROTECTED_PACKAGES | {key for key in graph.installed if any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns)}
+                # Las librerias del archivo requirements se conservan aunque solo se hayan instalado como dependencia.
+                # Un archivo igual a la salida de freeze del ambiente (el que escribe create_requirements_file) lista
+                # todas las librerias instaladas y no indica cuales se pidieron, por lo que no se usa
+                if os.path.exists(self.requirements_path):
+                    inventory = self.get_inventory(on_venv=from_venv)
+                    requirements = [line for line in parse_requirements_file(self.requirements_path, self._marker_environment(from_venv, inventory)) if not line.constraint]
+                    if {line.line for line in requirements} != set(inventory.freeze()):
+                        keep |= {line.key for line in _resolve_url_names(requirements, graph.installed)}
+                orphans = graph.orphans(library_name, keep=keep) if cascade else []
+                to_uninstall += [graph.installed[key].name for key in orphans]
+
+                removed = {canonicalize_name(name) for name in to_uninstall}
+                for name in library_name:
+                    broken = graph.required_by(name) - removed
+                    if broken:
+                        print(f"Atención: {name} es requerida por {', '.join(sorted(graph.installed[key].name for key in broken))}.")
+                if orphans:
+                    print(f"Dependencias sin uso que se desinstalarán: {', '.join(graph.installed[key].name for key in orphans)}")
+                if dry_run:
+                    print(f"Se desinstalarían: {', '.join(to_uninstall)}")
+                    return to_uninstall
+
+            run_command([python_executable, "-m", "pip", "uninstall", "-y"] + to_uninstall)
+            print(f"{to_uninstall} desinstalado correctamente en {python_executable}.")
+
+            if update_requirements:
+                self.create_requirements_file(from_venv=from_venv)
+            return to_uninstall
+
+        except subprocess.CalledProcessError as e:
+            print(f"Error al desinstalar {library_name}. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+            return []
+
+
+    # Funcion para obtener el indice del grafo de dependencias de las librerias instaladas
+    def get_dependency_graph(self, on_venv:bool=True) -> DependencyGraph:
+        """
+        Devuelve el indice del grafo de dependencias de las librerias instaladas, evaluado con el entorno de marcadores
+        del ambiente. Se reutiliza entre llamadas hasta que el site-packages cambia.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa el entorno virtual.
+        :return: Objeto DependencyGraph.
+        """
+        inventory = self.get_inventory(on_venv=on_venv)
+        return inventory.dependency_graph(self._marker_environment(on_venv, inventory))
+
+    # Funcion para explicar por que esta instalada una libreria
+    def why_installed(self, library_name:str, on_venv:bool=True, max_paths:int=10) -> list[list[str]]:
+        """
+        Muestra las cadenas de dependencias por las que esta instalada la libreria, desde las librerias instaladas
+        directamente (las que ninguna otra requiere).
+
+        :param library_name: Nombre de la librería.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa el entorno virtual.
+        :param max_paths: Numero maximo de cadenas a mostrar.
+        :return: Lista de cadenas de nombres, ver DependencyGraph.why.
+        """
+        graph = self.get_dependency_graph(on_venv=on_venv)
+        paths = graph.why(library_name, max_paths=max_paths)
+        if not paths:
+            print(f"{library_name} no está instalada.")
+        elif paths == [[canonicalize_name(library_name)]]:
+            print(f"{graph.installed[paths[0][0]].name} se instaló directamente, ninguna librería la requiere.")
+        else:
+            print(f"{graph.installed[paths[0][-1]].name} está instalada porque:")
+            for path in paths:
+                print('  ' + ' -> '.join(graph.installed[key].name for key in path))
+        return paths
+
+    # Funcion para obtener las librerias que requieren a una libreria
+    def reverse_dependencies(self, library_name:str, on_venv:bool=True, recursive:bool=False) -> list[str]:
+        """
+        Muestra las librerías instaladas que requieren a la librería dada.
+
+        :param library_name: Nombre de la librería.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa el entorno virtual.
+        :param recursive: Indicador booleano, si es True incluye las que la requieren indirectamente.
+        :return: Lista ordenada de nombres de las librerías.
+        """
+        graph = self.get_dependency_graph(on_venv=on_venv)
+        names = sorted(graph.installed[key].name for key in graph.required_by(library_name, recursive=recursive))
+        print(f"{library_name} es requerida por: {', '.join(names) if names else 'ninguna librería'}")
+        return names
+
+
+    # Funcion para desinstalar las librerias que el proyecto no usa
+    @_project_operation
+    def prune(self, on_venv:bool=True, allowlist:list[str]=None, dry_run:bool=False, update_requirements:bool=True, max_workers:int=None) -> list[OrphanedDistribution]:
+        """
+        Busca las librerias instaladas que el proyecto no usa y las desinstala en una sola ejecucion de pip.
+        Una libreria se usa si el codigo del proyecto la importa (ver ImportScanner), si esta en la lista de permitidas
+        o si es dependencia, directa o transitiva, de una libreria usada. pip, setuptools y wheel nunca se desinstalan.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual revisa el entorno virtual.
+        :param allowlist: Nombres o patrones (por ejemplo 'pytest-*') de librerias que se conservan aunque no se importen,
+                          como plugins que se cargan en tiempo de ejecucion. Se suman a prune_allowlist del proyecto.
+        :param dry_run: Indicador booleano, si es True solo muestra las librerias sin desinstalarlas.
+        :param update_requirements: Indicador booleano, por defecto es igual a True con lo cual actualiza el archivo requirements.
+        :param max_workers: Numero maximo de procesos para analizar los archivos.
+        :return: Lista de OrphanedDistribution con las librerias sin uso.
+        """
+        inventory = self.get_inventory(on_venv=on_venv)
+        scanner = ImportScanner(self.directory or os.getcwd(), max_workers=max_workers)
+        imports = scanner.scan()
+        if scanner.errors:
+            # Sin los imports de todos los archivos no se puede saber que librerias se usan
+            for path, error in scanner.errors.items():
+                print(f"No se pudo analizar {path}: {error}")
+            print("No se desinstaló ninguna librería.")
+            return []
+
+        ignored = set(sys.stdlib_module_names) | {'__future__', '__main__'} | scanner.local_modules()
+        imported, _ = _resolve_imports(imports, inventory.top_level_modules(), ignored)
+
+        installed = inventory.by_key()
+        patterns = [canonicalize_name(pattern) for pattern in list(self.prune_allowlist) + list(allowlist or [])]
+        roots = set(imported) | PROTECTED_PACKAGES | {key for key in installed if any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns)}
+
+        graph = inventory.dependency_graph(self._marker_environment(on_venv, inventory))
+        used, pending = set(), [key for key in roots if key in installed]
+        while pending:
+            key = pending.pop()
+            if key not in used:
+                used.add(key)
+                pending.extend(graph.dependencies[key])
+
+        orphans = [OrphanedDistribution(installed[key].name, installed[key].version, inventory.disk_size(key), tuple(sorted(graph.dependents[key])))
+                   for key in sorted(installed.keys() - used)]
+        if not orphans:
+            print("No hay librerías sin uso.")
+            return []
+
+        print("Librerías sin uso:")
+        print(f"{'Package':<30} {'Version':<15} {'Tamaño':>10}")
+        for orphan in orphans:
+            print(f"{orphan.name:<30} {orphan.version:<15} {orphan.size / 1024 ** 2:>8.2f} MB")
+        print(f"Total: {sum(orphan.size for orphan in orphans) / 1024 ** 2:.2f} MB")
+
+        if not dry_run:
+            self.uninstall_library([orphan.name for orphan in orphans], from_venv=on_venv, update_requirements=update_requirements)
+        return orphans
+
+
+    # Funcion para revisar e instalar la libreria dada
+    @_project_operation
+    def check_installation(self, on_venv: bool = True) -> list[str]:
+        """
+        Verifica las librerias instaladas.
+        Por defecto se verifica la instalación en un entorno virtual.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual revisa la libreria del entorno virtual.
+        :return: Lista de las librerías instaladas.
+        """
+
+        try:
+            records = self.get_inventory(on_venv=on_venv).records()
+
+            # Mismo formato de columnas que pip list
+            width = max([len(record.name) for record in records] + [len('Package')])
+            installed_libraries = [f"{record.name:<{width}} {record.version}" for record in sorted(records, key=lambda record: record.name.lower())]
+
+            print("\nLibrerías instaladas:")
+            for lib in installed_libraries:
+                print(lib)
+            print("\n")
+            return installed_libraries
+
+        except (ImportError, subprocess.CalledProcessError):
+            return []
+
+    @_project_operation
+    def verify_dependencies(self, on_venv:bool=True, check_transitive:bool=True) -> DependencyReport:
+        """
+        Verifica si todas las dependencias en requirements.txt están instaladas con una versión que cumple
+        el requerimiento. Respeta los nombres normalizados, extras, marcadores, comentarios y archivos incluidos
+        con -r/-c, y revisa también las dependencias de las librerías requeridas.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual verifica el entorno virtual.
+        :param check_transitive: Indicador booleano, por defecto es igual a True con lo cual revisa también las dependencias indirectas.
+        :return: Objeto DependencyReport con las dependencias faltantes (missing), con otra versión (wrong_version) y sobrantes (extra).
+            Si la verificación no se pudo completar, el reporte está vacío y error contiene el motivo.
+        """
+        if not os.path.exists(self.requirements_path):
+            raise FileNotFoundError(f"No se encontró el archivo {self.requirements_path}.")
+
+        try:
+            inventory = self.get_inventory(on_venv=on_venv)
+            environment = self._marker_environment(on_venv, inventory)
+            installed = inventory.by_key()
+            requirements = parse_requirements_file(self.requirements_path, environment)
+
+            report = check_requirements(requirements, installed, environment, check_transitive=check_transitive)
+
+            if report.missing:
+                print("Las siguientes dependencias no están instaladas:")
+                for issue in report.missing:
+                    print(f"  - {issue.required} (requerida por {issue.source})")
+            if report.wrong_version:
+                print("Las siguientes dependencias tienen una versión distinta a la requerida:")
+                for issue in report.wrong_version:
+                    print(f"  - {issue.required}, instalada {issue.installed} (requerida por {issue.source})")
+            if report.extra:
+                print("Las siguientes librerías están instaladas pero no son requeridas:")
+                for issue in report.extra:
+                    print(f"  - {issue.name}=={issue.installed}")
+            if report.ok:
+                print("Todas las dependencias están instaladas.")
+
+            return report
+
+        except Exception as e:
+            print(f"Error al verificar dependencias. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+            return DependencyReport([], [], [], set(), error=f'{type(e).__name__}: {e}')
+
+    @_project_operation
+    def update_all_libraries(self, on_venv=True, update_requirements=True, batch:bool=True, chunk_size:int=None, snapshot:bool=True, rollback_on_failure:bool=False):
+        """
+        Actualiza todas las librerías instaladas a sus versiones más recientes.
+        
+        :param on_venv: Booleano que indica si se deben actualizar en el entorno virtual.
+        :param update_requirements: Booleano que indica si se debe actualizar el archivo requirements.
+        :param batch: Booleano, por defecto True, que indica si se actualizan todas las librerías en una sola ejecución de pip.
+        :param chunk_size: Número máximo de librerías por ejecución de pip en el modo batch. Por defecto todas en una sola ejecución.
+        :param snapshot: Booleano, por defecto True, que indica si se crea una instantánea del ambiente antes de actualizar.
+        :param rollback_on_failure: Booleano que indica si se restaura la instantánea cuando alguna librería no se pudo actualizar.
+        """
+        before = None
+        try:
+            python_executable = self._python_executable(on_venv)
+            
+            outdated_packages = self._get_outdated_packages(python_executable, on_venv)
+            if snapshot and on_venv and outdated_packages:
+                before = self.create_snapshot('update all')
+            failed_packages = self._upgrade_packages(python_executable, outdated_packages, batch=batch, chunk_size=chunk_size)
+            if failed_packages:
+                self._handle_failed_upgrade(before, rollback_on_failure)
+                if _raise_command_errors.get():
+                    raise RuntimeError(f"No se pudieron actualizar: {', '.join(failed_packages)}.")
+                if rollback_on_failure and before is not None:
+                    return
+            self._after_install(on_venv)
+
+            if update_requirements:
+                self.create_requirements_file(from_venv=on_venv)
+
+        except subprocess.CalledProcessError as e:
+            print(f"Error al actualizar las librerías. Detalles: {e}")
+            self._handle_failed_upgrade(before, rollback_on_failure)
+            if _raise_command_errors.get():
+                raise
+
+
+    # Funcion para obtener los requerimientos de los argumentos de pip install
+    @staticmethod
+    def _requested_requirements(install_args:list[str]) -> tuple[list[Requirement], dict]|None:
+        """
+        :param install_args: Argumentos de pip install (librerías o -r archivo).
+        :return: Tupla (requerimientos, {nombre normalizado: version fijada por un archivo -c}) o None si no se pueden leer
+            o incluyen instalaciones editables.
+        """
+        try:
+            if install_args[0] != '-r':
+                return [Requirement(argument) for argument in install_args], {}
+            lines = parse_requirements_file(install_args[1])
+        except (ValueError, OSError):
+            return None
+        # Las editables se construyen en su lugar, no pasan por el almacen
+        if any(line.editable for line in lines):
+            return None
+        constraints = {line.key: _pinned_version(line.requirement) for line in lines if line.constraint}
+        return [line.requirement for line in lines if not line.constraint], constraints
+
+    # Funcion para instalar con pip usando el almacen local de wheels
+    def _install_with_wheelhouse(self, python_executable:str, install_args:list[str], use_wheelhouse:bool=True, on_venv:bool=True, pip_options:list[str]=None):
+        """
+        Instala con pip usando el almacen local de wheels. Si todas las librerías están fijadas con == (archivo lock o
+        requirements congelado) se instala sin consultar el índice (--no-index), agregando antes al almacen los wheels
+        que falten. Si alguna no está fijada, se resuelve con el índice para instalar la última versión en una sola
+        ejecución de pip wheel que agrega los wheels al almacen, y se instala desde el almacen.
+
+        :param python_executable: Ruta del intérprete de Python donde se instala.
+        :param install_args: Argumentos de pip install (librerías o -r archivo).
+        :param use_wheelhouse: Indicador booleano, por defecto es igual a True con lo cual usa el almacen local de wheels.
+        :param on_venv: Indicador booleano, indica si se instala en el entorno virtual, para registrar los wheels usados.
+        :param pip_options: Opciones adicionales de pip install, por ejemplo --no-deps o --require-hashes.
+        """
+        install_command = [python_executable, '-m', 'pip', 'install'] + (pip_options or [])
+        if not use_wheelhouse:
+            run_command(install_command + install_args)
+            return
+
+        requested = self._requested_requirements(install_args)
+        if requested is None:
+            run_command(install_command + install_args)
+            return
+
+        pinned = all(_pinned_version(requirement) or requested[1].get(canonicalize_name(requirement.name)) for requirement in requested[0])
+        if not pinned:
+            # Con versiones sin fijar el almacen podria tener una version antigua: se resuelve con el indice en una sola
+            # ejecucion de pip wheel, que deja los wheels en el almacen, y se instala desde el almacen
+            try:
+                print(f"Resolviendo con el índice y agregando los wheels al almacen local en {self.wheelhouse.root}...")
+                self.wheelhouse.collect(python_executable, (pip_options or []) + install_args)
+                run_command(install_command + self.wheelhouse.install_args() + install_args)
+            except subprocess.CalledProcessError as e:
+                # Respaldo: por ejemplo una libreria sin wheel que no se puede construir
+                print(f"No fue posible instalar desde el almacen local, se consultará el índice. Detalles: {e}")
+                run_command(install_command + install_args)
+            return
+
+        requirements, constraints = requested
+        missing = [requirement.name for requirement in requirements
+                   if not self.wheelhouse.hashes_for(requirement.name, _pinned_version(requirement) or constraints[canonicalize_name(requirement.name)])]
+        try:
+            if missing:
+                print(f"Agregando los wheels faltantes ({', '.join(missing)}) al almacen local en {self.wheelhouse.root}...")
+                self._prefetch_install_args(python_executable, install_args)
+                run_command(install_command + self.wheelhouse.install_args() + install_args)
+            else:
+                try:
+                    run_command(install_command + self.wheelhouse.install_args() + install_args, quiet_stderr=True)
+                except subprocess.CalledProcessError:
+                    # Las librerias fijadas estan en el almacen pero falta alguna de sus dependencias
+                    print(f"Agregando las dependencias faltantes al almacen local en {self.wheelhouse.root}...")
+                    self._prefetch_install_args(python_executable, install_args)
+                    run_command(install_command + self.wheelhouse.install_args() + install_args)
+            print("Instalación realizada desde el almacen local de wheels.")
+        except subprocess.CalledProcessError as e:
+            # Respaldo: instalacion consultando el indice
+            print(f"No fue posible instalar desde el almacen local, se consultará el índice. Detalles: {e}")
+            run_command(install_command + install_args)
+            return
+
+        with contextlib.suppress(Exception):
+            self.wheelhouse.touch(self.get_inventory(on_venv=on_venv).records())
+
+    def _prefetch_install_args(self, python_executable:str, install_args:list[str]):
+        if install_args[0] == '-r':
+            self.wheelhouse.prefetch(python_executable, requirements_path=install_args[1])
+        else:
+            self.wheelhouse.prefetch(python_executable, requirements=install_args)
+
+    # Funcion para compilar el bytecode del ambiente y del proyecto
+    @_project_operation
+    def precompile_bytecode(self, on_venv:bool=True, optimize:int|list=0, invalidation_mode:str='checked-hash', include_project:bool=True, max_workers:int=None) -> dict:
+        """
+        Compila a .pyc los archivos del site-packages y del proyecto con el interprete del ambiente, en paralelo
+        con todos los nucleos, para que la primera ejecucion (o cada ejecucion, si el despliegue es de solo lectura)
+        no tenga que compilarlos. Los archivos cuyo .pyc ya esta actualizado se omiten.
+        Con 'checked-hash' el .pyc se valida con el hash del fuente y no con la fecha, por lo que sigue siendo valido
+        al copiar el proyecto o en sistemas de archivos que no conservan las fechas.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual compila el entorno virtual.
+        :param optimize: Nivel de optimizacion (0, 1 o 2) o lista de niveles, como python -O / -OO.
+        :param invalidation_mode: Modo de invalidacion: 'timestamp', 'checked-hash' o 'unchecked-hash'.
+        :param include_project: Indicador booleano, por defecto es igual a True con lo cual compila tambien los .py del proyecto.
+        :param max_workers: Numero maximo de procesos. Por defecto el numero de CPUs.
+        :return: Diccionario con el numero de archivos, compilados, actualizados y con error, y los tiempos en segundos.
+        """
+        if invalidation_mode not in PYC_INVALIDATION_MODES:
+            raise ValueError(f"El parámetro 'invalidation_mode' debe ser uno de {PYC_INVALIDATION_MODES}.")
+        levels = sorted(set([optimize] if isinstance(optimize, int) else optimize))
+        if any(level not in (0, 1, 2) for level in levels):
+            raise ValueError("El parámetro 'optimize' debe ser 0, 1, 2 o una lista de esos niveles.")
+
+        python_executable = self._python_executable(on_venv)
+        directories = self.venv.site_packages if on_venv else sorted({sysconfig.get_paths()['purelib'], sysconfig.get_paths()['platlib']})
+        files = []
+        if include_project:
+            scanner = ImportScanner(self.directory or os.getcwd())
+            files = [os.path.join(scanner.directory, path) for path in scanner.python_files()]
+
+        options = {'files': files, 'dirs': directories, 'optimize': levels, 'mode': invalidation_mode, 'workers': max_workers}
+        with tempfile.TemporaryDirectory(prefix='precompile-') as temp_dir:
+            script_path = os.path.join(temp_dir, 'precompile.py')
+            with open(script_path, 'w') as f:
+                f.write(_read_script('precompile.py'))
+            # Las opciones se pasan en un archivo: la lista de archivos del proyecto puede superar el limite de un argumento
+            options_path = os.path.join(temp_dir, 'options.json')
+            with open(options_path, 'w') as f:
+                json.dump(options, f)
+            try:
+                result = json.loads(run_command([python_executable, script_path, options_path], capture_output=True))
+            except subprocess.CalledProcessError as e:
+                print(f"Error al compilar el bytecode. Detalles: {e}")
+                if _raise_command_errors.get():
+                    raise
+                return {}
+
+        print(f"Bytecode: {result['compiled']} archivos compilados y {result['current']} ya actualizados "
+              f"en {result['wall']:.2f} s con {result['workers']} procesos ({invalidation_mode}, optimización {levels}).")
+        if result['errors']:
+            print(f"{result['errors']} archivos no se pudieron compilar (por ejemplo, archivos de prueba con errores de sintaxis).")
+        # La compilacion que se hizo aqui es la que pagaria el arranque en frio de los modulos que se importen
+        print(f"Tiempo de compilación ahorrado en el arranque en frío: hasta {result['compile_cpu']:.2f} s.")
+        return result
+
+    # Funcion que se ejecuta despues de instalar o actualizar librerias
+    def _after_install(self, on_venv:bool=True):
+        if self.precompile:
+            self.precompile_bytecode(on_venv=on_venv)
+
+    # Funcion para crear una instantanea del ambiente virtual
+    @_project_operation
+    def create_snapshot(self, label:str=None) -> VenvSnapshot|None:
+        """
+        Crea una instantanea del ambiente virtual con enlaces a sus archivos (ver VenvSnapshotStore), para poder volver
+        a este estado con rollback. Despues se aplica la politica de retencion (snapshot_retention).
+
+        :param label: Descripcion de la instantanea.
+        :return: Objeto VenvSnapshot, o None si no se pudo crear.
+        """
+        start = time.perf_counter()
+        try:
+            snapshot = self.snapshots.create(label, packages=self.get_inventory(on_venv=True).freeze())
+        except OSError as e:
+            print(f"Error al crear la instantánea del ambiente virtual. Detalles: {e}")
+            return None
+        print(f"Instantánea {snapshot.id} creada en {time.perf_counter() - start:.2f} s ({snapshot.files} archivos).")
+        if self.snapshot_retention is not None:
+            self.prune_snapshots(keep=self.snapshot_retention)
+        return snapshot
 
-            subprocess.check_call([python_executable, "-m", "pip", "uninstall", "-y"] + library_name)
-            print(f"{library_name} desinstalado correctamente en {python_executable}.")
+    # Funcion para listar las instantaneas del ambiente virtual
+    def list_snapshots(self) -> list[VenvSnapshot]:
+        """
+        Muestra las instantaneas del ambiente virtual.
 
-            if update_requirements:
-                self.create_requirements_file(from_venv=from_venv)
+        :return: Lista de instantaneas, de la mas reciente a la mas antigua.
+        """
+        snapshots = self.snapshots.snapshots()
+        if not snapshots:
+            print("No hay instantáneas del ambiente virtual.")
+        for snapshot in snapshots:
+            created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.created_at))
+            print(f"{snapshot.id:<50} {created_at}  {len(snapshot.packages):>4} librerías  {snapshot.label}")
+        return snapshots
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error al desinstalar {library_name}. Detalles: {e}")
+    # Funcion para volver el ambiente virtual al estado de una instantanea
+    @_project_operation
+    def rollback(self, snapshot_id:str=None, keep_current:bool=True) -> VenvSnapshot|None:
+        """
+        Restaura el ambiente virtual desde una instantanea con un intercambio atomico de directorios, lo cual toma
+        segundos en lugar de reconstruir el ambiente desde el archivo requirements.
 
+        :param snapshot_id: Identificador de la instantanea (ver list_snapshots). Por defecto la mas reciente.
+        :param keep_current: Indicador booleano, si es True el ambiente reemplazado se guarda como una instantanea nueva.
+        :return: Instantanea restaurada, o None si no se pudo restaurar.
+        """
+        start = time.perf_counter()
+        python_executable = self.venv.python_executable
+        current_packages = None
+        if keep_current:
+            with contextlib.suppress(Exception):
+                current_packages = self.get_inventory(on_venv=True).freeze()
+        try:
+            snapshot = self.snapshots.restore(snapshot_id, keep_current=keep_current, current_packages=current_packages)
+        except OSError as e:
+            print(f"Error al restaurar la instantánea. Detalles: {e}")
+            return None
 
-    # Funcion para revisar e instalar la libreria dada
-    def check_installation(self, on_venv: bool = True) -> list[str]:
+        # El ambiente cambio por completo: se descarta la informacion guardada en memoria
+        VenvHelper.get(python_executable).close()
+        self.venv.invalidate()
+        self._inventories.pop(self.venv.path, None)
+        print(f"Ambiente virtual restaurado a la instantánea {snapshot.id} en {time.perf_counter() - start:.2f} s.")
+        if keep_current and self.snapshot_retention is not None:
+            self.prune_snapshots()
+        return snapshot
+
+    # Funcion para eliminar las instantaneas antiguas
+    @_project_operation
+    def prune_snapshots(self, keep:int=None, max_age_days:float=None) -> list[VenvSnapshot]:
         """
-        Verifica las librerias instaladas.
-        Por defecto se verifica la instalación en un entorno virtual.
+        Elimina las instantaneas antiguas del ambiente virtual.
 
-        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual revisa la libreria del entorno virtual.
-        :return: Lista de las librerías instaladas.
+        :param keep: Numero de instantaneas a conservar. Por defecto snapshot_retention.
+        :param max_age_days: Antiguedad maxima en dias. Por defecto sin limite.
+        :return: Lista de instantaneas eliminadas.
         """
+        removed = self.snapshots.prune(keep=self.snapshot_retention if keep is None else keep, max_age_days=max_age_days)
+        for snapshot in removed:
+            print(f"Instantánea {snapshot.id} eliminada.")
+        return removed
 
-        try:
-            if on_venv:
-                if not os.path.exists(self.venv_path):
-                    raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
-                else:
-                    python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
-            else:
-                python_executable = sys.executable
-            
-            installed_libraries = subprocess.check_output([python_executable, "-m", "pip", "list"], text=True).splitlines()[2:]
+    # Funcion que se ejecuta cuando falla una actualizacion hecha despues de una instantanea
+    def _handle_failed_upgrade(self, snapshot:VenvSnapshot|None, rollback_on_failure:bool):
+        if snapshot is None:
+            return
+        if rollback_on_failure:
+            self.rollback(snapshot.id, keep_current=False)
+        else:
+            print(f"Para volver al estado anterior: project.rollback('{snapshot.id}')")
 
-            print("\nLibrerías instaladas:")
-            for lib in installed_libraries:
-                print(lib)
-            print("\n")
-            return installed_libraries
+    # Funcion para compartir los archivos del ambiente virtual identicos a los de otros ambientes
+    @_project_operation
+    def deduplicate_venv(self, store_root:str=None, dry_run:bool=False, max_workers:int=None) -> DedupReport:
+        """
+        Reemplaza los archivos del ambiente virtual que son identicos a otros del mismo ambiente o a los que ya estan
+        en el almacen compartido por enlaces duros al almacen (ver VenvDedupStore). Para deduplicar varios proyectos
+        a la vez se usa ProjectFleet.deduplicate o la linea de comandos (python Project_toolbox.py dedup proyectos/*).
 
-        except (ImportError, subprocess.CalledProcessError):
-            return []
+        :param store_root: Directorio del almacen compartido. Por defecto dentro de TOOLBOX_HOME.
+        :param dry_run: Indicador booleano, si es True solo muestra el espacio que se recuperaria.
+        :param max_workers: Numero maximo de hilos para calcular los hashes.
+        :return: Objeto DedupReport.
+        """
+        if not self.venv.exists:
+            raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
+        store = VenvDedupStore(store_root or os.path.join(TOOLBOX_HOME, 'dedup'), max_workers=max_workers)
+        report = store.deduplicate([self.venv_path], dry_run=dry_run)
+        print_dedup_report(report)
+        return report
 
-    def verify_dependencies(self):
+    # Funcion para agregar al almacen local los wheels del archivo requirements
+    @_project_operation
+    def populate_wheelhouse(self, on_venv:bool=True, max_workers:int=4) -> int:
         """
-        Verifica si todas las dependencias en requirements.txt están instaladas.
+        Construye o descarga los wheels de todas las librerías del archivo requirements y los agrega al almacen local,
+        de forma concurrente. Después de esto install_requirements no necesita consultar el índice.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual construye los wheels para el intérprete del entorno virtual.
+        :param max_workers: Número máximo de procesos de pip simultáneos.
+        :return: Número de wheels agregados o actualizados en el almacen.
         """
         if not os.path.exists(self.requirements_path):
             raise FileNotFoundError(f"No se encontró el archivo {self.requirements_path}.")
 
-        try:
-            with open(self.requirements_path, 'r') as req_file:
-                required_packages = req_file.read().splitlines()
-
-            installed_packages = subprocess.check_output([sys.executable, '-m', 'pip', 'freeze'], text=True).splitlines()
-            installed_packages = [pkg.split('==')[0] for pkg in installed_packages]
+        python_executable = self._python_executable(on_venv)
 
-            missing_packages = [pkg for pkg in required_packages if pkg.split('==')[0] not in installed_packages]
-
-            if missing_packages:
-                print("Las siguientes dependencias no están instaladas:")
-                for pkg in missing_packages:
-                    print(f"  - {pkg}")
-                
-                return missing_packages
-            
-            else:
-                print("Todas las dependencias están instaladas.")
-        except Exception as e:
-            print(f"Error al verificar dependencias. Detalles: {e}")
+        try:
+            count = self.wheelhouse.prefetch(python_executable, requirements_path=self.requirements_path, max_workers=max_workers)
+            print(f"{count} wheels disponibles en el almacen local {self.wheelhouse.root}.")
+            return count
+        except subprocess.CalledProcessError as e:
+            print(f"Error al agregar los wheels al almacen local. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+            return 0
 
-    def update_all_libraries(self, on_venv=True, update_requirements=True):
+    # Funciones para la marca de la ultima instalacion del archivo requirements
+    def _install_fingerprint(self, source_path:str=None) -> dict|None:
         """
-        Actualiza todas las librerías instaladas a sus versiones más recientes.
-        
-        :param on_venv: Booleano que indica si se deben actualizar en el entorno virtual.
-        :param update_requirements: Booleano que indica si se debe actualizar el archivo requirements.
+        Calcula la huella de la instalación: hash del archivo requirements (o lock) y de los archivos que incluye
+        con -r/-c, fechas de modificación de las fuentes locales (-e ., rutas y archivos), identidad del intérprete
+        del entorno virtual y resumen de las librerías instaladas.
+
+        :return: Diccionario con la huella o None si no se puede calcular, por ejemplo si se instala un directorio local
+            sin -e, cuyos cambios no se detectan sin recorrerlo; en ese caso siempre se ejecuta pip.
         """
+        source_path = source_path or self.requirements_path
         try:
-            if on_venv:
-                if not os.path.exists(self.venv_path):
-                    raise FileNotFoundError(f'Ambiente virtual no encontrado en {self.venv_path}.')
-                python_executable = os.path.join(self.venv_path, 'Scripts', 'python.exe') if os.name == 'nt' else os.path.join(self.venv_path, 'bin', 'python')
+            if source_path == self.lock_path:
+                files = [source_path]
+                with open(source_path, 'r') as f:
+                    sources = [(package['url'], package.get('editable', False)) for package in json.load(f).get('packages', []) if package.get('url')]
             else:
-                python_executable = sys.executable
-            
-            subprocess.check_call([python_executable, "-m", "pip", "list", "--outdated", "--format=freeze"], text=True)
-            outdated_packages = subprocess.check_output([python_executable, "-m", "pip", "list", "--outdated", "--format=freeze"], text=True).splitlines()
-            for package in outdated_packages:
-                package_name = package.split('==')[0]
-                subprocess.check_call([python_executable, "-m", "pip", "install", "--upgrade", package_name])
-                print(f"{package_name} actualizado correctamente.")
+                # Los archivos incluidos se recorren igual que al leer los requerimientos
+                files = set()
+                lines = parse_requirements_file(source_path, _seen=files)
+                sources = [(line.requirement.url, line.editable) for line in lines if line.target is not None]
 
-            if update_requirements:
-                self.create_requirements_file(from_venv=on_venv)
+            digest = hashlib.sha256()
+            for path in sorted(files):
+                with open(path, 'rb') as f:
+                    digest.update(path.encode() + b'\0' + f.read() + b'\0')
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error al actualizar las librerías. Detalles: {e}")
+            for url, editable in sources:
+                if not url.startswith('file:'):
+                    continue
+                path = urllib.request.url2pathname(urlsplit(url).path)
+                if os.path.isdir(path):
+                    if not editable:
+                        return None
+                    # En las editables el codigo se usa en su lugar, solo cambian las dependencias declaradas
+                    paths = [os.path.join(path, name) for name in ('pyproject.toml', 'setup.py', 'setup.cfg')]
+                else:
+                    paths = [path]
+                for path in paths:
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = os.stat(path)
+                        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}\0'.encode())
+        except (OSError, ValueError):
+            return None
+
+        interpreter = os.path.realpath(self.venv.python_executable)
+        stat = os.stat(interpreter)
+
+        return {
+            'requirements': digest.hexdigest(),
+            'interpreter': f'{interpreter}:{stat.st_size}:{stat.st_mtime_ns}',
+            'installed': self.get_inventory(on_venv=True).digest(),
+        }
 
+    def _install_is_current(self, source_path:str=None) -> bool:
+        fingerprint = self._install_fingerprint(source_path)
+        return fingerprint is not None and self._read_install_stamp() == fingerprint
+
+    def _read_install_stamp(self) -> dict|None:
+        try:
+            with open(os.path.join(self.venv_path, INSTALL_STAMP_NAME), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_install_stamp(self, source_path:str=None):
+        try:
+            # Se escribe un archivo nuevo y se reemplaza, para no modificar el archivo enlazado en las instantaneas
+            stamp_path = os.path.join(self.venv_path, INSTALL_STAMP_NAME)
+            fingerprint = self._install_fingerprint(source_path)
+            if fingerprint is None:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(stamp_path)
+                return
+            with open(stamp_path + '.tmp', 'w') as f:
+                json.dump(fingerprint, f)
+            os.replace(stamp_path + '.tmp', stamp_path)
+        except OSError as e:
+            print(f"No fue posible guardar la marca de instalación. Detalles: {e}")
 
     # Funcion para instalar las librarias especificadas en el archivo requirements
-    def install_requirements(self, on_venv:bool=True):
+    @_project_operation
+    def install_requirements(self, on_venv:bool=True, use_wheelhouse:bool=True, force:bool=False, from_lock:bool=False):
         """
         Instala las librerias especificadas en el archivo requirements que se encuentre en el directorio especificado.
-        Por defecto se instalan en el entorno virtual del mismo directorio.
+        Por defecto se instalan en el entorno virtual del mismo directorio, desde el almacen local de wheels.
+        Si el archivo requirements, el intérprete y las librerías instaladas no cambiaron desde la última instalación,
+        no se ejecuta pip.
         
         :param on_venv: Indicador booleano, por defecto es igual a True con lo cual instala las librerias en el entorno virtual.
+        :param use_wheelhouse: Indicador booleano, por defecto es igual a True con lo cual instala sin consultar el índice las versiones fijadas con ==, usando el almacen local de wheels.
+        :param force: Indicador booleano, por defecto es igual a False. Si es True instala aunque no haya cambios.
+        :param from_lock: Indicador booleano, por defecto es igual a False. Si es True instala las versiones exactas del archivo lock,
+            verificando los hashes y sin resolver dependencias.
         """
 
         # Determinar la ruta del ejecutable de Python
         if on_venv:
             # Evalua la existencia del ambiente virtual o lo crea
-            if not os.path.exists(self.venv_path):
+            if not self.venv.exists:
                 # Creacion de un ambiente virtual
                 self.create_virtual_environment()
                 print('Ambiente virtual no encontrado. Se ha creado un ambiente virtual.')
@@ -398,35 +3808,227 @@ Project_toolbox.py
                 print('Ambiente virtual encontrado.')
             
             # Ruta dentro del ambiente virtual
-            python_executable = os.path.join(self.venv_path, 'bin', 'python') if os.name != 'nt' else os.path.join(self.venv_path, 'Scripts', 'python.exe')
+            python_executable = self.venv.python_executable
             
         else:
             # Usar el Python del sistema
             python_executable = sys.executable
             print("Las dependencias se instalarán en el intérprete de Python del sistema.")
 
-        if os.path.exists(self.requirements_path):
+        if from_lock:
+            self._install_lock(python_executable, on_venv=on_venv, use_wheelhouse=use_wheelhouse, force=force)
+        elif os.path.exists(self.requirements_path):
+            if on_venv and not force and self._install_is_current():
+                print("Las dependencias ya están instaladas, no hubo cambios desde la última instalación.")
+                return
+
             try:
-                subprocess.check_call([python_executable, '-m', 'pip', 'install', '-r', self.requirements_path])
+                self._install_with_wheelhouse(python_executable, ['-r', self.requirements_path], use_wheelhouse=use_wheelhouse, on_venv=on_venv)
+                if on_venv:
+                    self._write_install_stamp()
                 print("Las dependencias se han instalado correctamente.")
+                self._after_install(on_venv)
             except subprocess.CalledProcessError as e:
                 print("Ha ocurrido un error al instalar las dependencias. Detalles del error:", e)
+                if _raise_command_errors.get():
+                    raise
         else:
             print("El archivo requirements.txt no se encuentra en el directorio especificado.")
 
+    # Funcion para crear el archivo lock con las versiones exactas, hashes y grafo de dependencias
+    @_project_operation
+    def create_lock_file(self, on_venv:bool=True) -> dict:
+        """
+        Crea un archivo lock a partir de las librerías instaladas. Contiene las versiones exactas, los hashes de
+        los archivos de cada versión (del índice y del almacen local de wheels), el entorno para el que se resolvió
+        (variables de los marcadores) y las aristas padre -> hijo del grafo de dependencias.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual usa las librerías del entorno virtual.
+        :return: Diccionario con el contenido del archivo lock.
+        """
+        inventory = self.get_inventory(on_venv=on_venv)
+        environment = self._marker_environment(on_venv, inventory)
+        installed = inventory.by_key()
+
+        # Raices: los requerimientos del archivo requirements o, si no existe, las librerías que nadie requiere
+        if os.path.exists(self.requirements_path):
+            requirements = _resolve_url_names([line for line in parse_requirements_file(self.requirements_path, environment) if not line.constraint], installed)
+            roots = [(line.key, frozenset(line.requirement.extras)) for line in requirements]
+        else:
+            _, all_edges = _lock_graph(installed, [(key, frozenset()) for key in installed], environment)
+            children = {edge['child'] for edge in all_edges}
+            roots = [(key, frozenset()) for key in installed if key not in children and key not in PROTECTED_PACKAGES]
+
+        packages, edges = _lock_graph(installed, roots, environment)
+
+        # Hashes publicados en el índice, consultados de forma concurrente, y hashes del almacen local
+        try:
+            index_files = OutdatedChecker(index_url=self.index_url).files(sorted(packages))
+        except Exception as e:
+            print(f"No fue posible consultar los hashes en el índice. Detalles: {e}")
+            index_files = {}
+
+        lock_packages = []
+        for key in sorted(packages):
+            record = installed[key]
+            url = None
+            editable = bool((record.direct_url or {}).get('dir_info', {}).get('editable'))
+            if editable:
+                # Las editables solo existen como directorio local, se instalan con -e desde su ubicacion
+                url = record.direct_url['url']
+            elif record.direct_url:
+                url = _freeze_line(record).split(' @ ', 1)[-1]
+            hashes = [] if url else sorted(set(OutdatedChecker.artifact_hashes(index_files.get(key, []), key, record.version) + self.wheelhouse.hashes_for(key, record.version)))
+            lock_packages.append({
+                'name': record.name,
+                'version': record.version,
+                'url': url,
+                'editable': editable,
+                'hashes': hashes,
+                'dependencies': sorted({edge['child'] for edge in edges if edge['parent'] == key}),
+            })
+
+        lock = {
+            'lock_version': LOCK_FORMAT_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'environment': environment,
+            'roots': sorted({key for key, _ in roots}),
+            'packages': lock_packages,
+            'edges': edges,
+        }
+
+        with open(self.lock_path, 'w') as f:
+            json.dump(lock, f, indent=2)
+        print(f'Archivo lock creado en {self.lock_path}')
+
+        missing_hashes = [package['name'] for package in lock_packages if not package['hashes'] and not package['url']]
+        if missing_hashes:
+            print(f"No se encontraron hashes para: {', '.join(missing_hashes)}. Ejecute populate_wheelhouse para agregarlos al almacen local.")
+        return lock
+
+    # Funcion para instalar las versiones exactas del archivo lock
+    def _install_lock(self, python_executable:str, on_venv:bool=True, use_wheelhouse:bool=True, force:bool=False):
+        if not os.path.exists(self.lock_path):
+            print(f"El archivo lock no se encuentra en {self.lock_path}.")
+            return
+
+        if on_venv and not force and self._install_is_current(self.lock_path):
+            print("Las dependencias del archivo lock ya están instaladas, no hubo cambios desde la última instalación.")
+            return
+
+        with open(self.lock_path, 'r') as f:
+            lock = json.load(f)
+
+        # El lock solo es valido para un entorno equivalente al que se uso para crearlo
+        environment = self._marker_environment(on_venv, self.get_inventory(on_venv=on_venv))
+        differences = [key for key in LOCK_ENVIRONMENT_KEYS if lock.get('environment', {}).get(key) != environment.get(key)]
+        if differences:
+            print(f"Advertencia: el archivo lock se creó para un entorno distinto ({', '.join(differences)}).")
+
+        # Cada grupo se instala en una ejecucion de pip distinta, para que las librerias con hashes
+        # siempre se verifiquen con --require-hashes aunque otras no los tengan
+        groups = _lock_to_requirements(lock)
+        if groups['unhashed']:
+            print(f"Advertencia: {len(groups['unhashed'])} librerías del archivo lock no tienen hashes y se instalarán sin verificarlos: "
+                  f"{', '.join(line.split(' ')[0].split('==')[0] for line in groups['unhashed'])}.")
+
+        with tempfile.TemporaryDirectory(prefix='lock-') as temp_dir:
+            try:
+                for group, pip_options in (('hashed', ['--no-deps', '--require-hashes']), ('unhashed', ['--no-deps']), ('editable', ['--no-deps'])):
+                    if not groups[group]:
+                        continue
+                    temp_requirements = os.path.join(temp_dir, f'{group}.txt')
+                    with open(temp_requirements, 'w') as f:
+                        f.writelines(line + '\n' for line in groups[group])
+                    self._install_with_wheelhouse(python_executable, ['-r', temp_requirements], use_wheelhouse=use_wheelhouse and group != 'editable', on_venv=on_venv, pip_options=pip_options)
+                if on_venv:
+                    self._write_install_stamp(self.lock_path)
+                print("Las dependencias del archivo lock se han instalado correctamente.")
+                self._after_install(on_venv)
+            except subprocess.CalledProcessError as e:
+                print("Ha ocurrido un error al instalar las dependencias del archivo lock. Detalles del error:", e)
+                if _raise_command_errors.get():
+                    raise
+
+    # Funcion para sincronizar el entorno con el archivo requirements
+    @_project_operation
+    def sync(self, on_venv:bool=True, dry_run:bool=False, use_wheelhouse:bool=True) -> SyncPlan:
+        """
+        Sincroniza las librerías instaladas con el archivo requirements: instala solo las librerías faltantes
+        o con una versión distinta, y desinstala solo las que ya no se requieren (ni directa ni indirectamente),
+        después de instalar. Las instalaciones editables (-e) nunca se desinstalan.
+        Cada grupo se procesa en una sola ejecución de pip y el plan se muestra antes de aplicarlo.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual sincroniza el entorno virtual.
+        :param dry_run: Indicador booleano, por defecto es igual a False. Si es True solo muestra el plan sin aplicarlo.
+        :param use_wheelhouse: Indicador booleano, por defecto es igual a True con lo cual instala desde el almacen local de wheels las versiones fijadas con == y agrega al almacen las demás.
+        :return: Objeto SyncPlan con las librerías a instalar y a desinstalar.
+        """
+        if not os.path.exists(self.requirements_path):
+            raise FileNotFoundError(f"No se encontró el archivo {self.requirements_path}.")
+
+        python_executable = self._python_executable(on_venv, create=True)
+
+        inventory = self.get_inventory(on_venv=on_venv)
+        environment = self._marker_environment(on_venv, inventory)
+        installed = inventory.by_key()
+        requirements = parse_requirements_file(self.requirements_path, environment)
+
+        # Requerimientos faltantes o con una version distinta, y dependencias faltantes (por ejemplo las de un extra)
+        report = check_requirements(requirements, installed, environment)
+        to_install = [issue.required for issue in report.missing + report.wrong_version]
+
+        # Se desinstalan las librerias que no alcanzan los requerimientos ni sus dependencias,
+        # salvo las instalaciones editables, que son proyectos locales del usuario
+        to_uninstall = [issue.name for issue in report.extra
+                        if not (installed[canonicalize_name(issue.name)].direct_url or {}).get('dir_info', {}).get('editable')]
+        plan = SyncPlan(to_install, to_uninstall)
+
+        print("Plan de sincronización:")
+        print(f"  Por instalar: {', '.join(to_install) if to_install else 'ninguna'}")
+        print(f"  Por desinstalar: {', '.join(to_uninstall) if to_uninstall else 'ninguna'}")
+        if dry_run or not (to_install or to_uninstall):
+            if not dry_run:
+                print("El entorno ya está sincronizado con el archivo requirements.")
+            return plan
+
+        try:
+            # Se desinstala solo despues de instalar, para no dejar el entorno incompleto si la instalacion falla
+            if to_install:
+                install_args = [argument for spec in to_install for argument in (spec.split(' ', 1) if spec.startswith('-e ') else [spec])]
+                self._install_with_wheelhouse(python_executable, install_args, use_wheelhouse=use_wheelhouse, on_venv=on_venv)
+            if to_uninstall:
+                run_command([python_executable, "-m", "pip", "uninstall", "-y"] + to_uninstall)
+            if on_venv:
+                self._write_install_stamp()
+            print("El entorno se ha sincronizado correctamente.")
+            if to_install:
+                self._after_install(on_venv)
+        except subprocess.CalledProcessError as e:
+            print(f"Error al sincronizar el entorno. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+
+        return plan
+
     # Funcion para crear archivo .bat que ejecute el script, este puede ayudar a automatizar su ejecucion usando el programador de tareas de windows
     def create_bat_file(self, script_name:str=None, bat_file_name:str=None, on_venv:bool=True):
         """
         Crea un archivo .bat que asiste en la ejecucion del script.
         Por defecto se usa el entorno virtual para la ejecucion del script.
+
+        Nota: el archivo .bat se crea en el directorio del proyecto, igual que el script. Antes se creaba en el
+        directorio de trabajo actual, que coincidia con el del proyecto solo porque Project cambiaba de directorio al
+        crearse; con change_dir=False eso ya no ocurre. Antes tambien se exigian los atributos self.script_name y
+        self.bat_file_name, que Project nunca define, por lo que el metodo siempre fallaba; ahora se usan los argumentos.
         
         :param script_name: Nombre del script que se quiere ejecutar
         :param bat_file_name: Nombre que se asigna al archivo .bat
         :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
         """
 
-        if not self.script_name or not self.bat_file_name:
-            raise ValueError("Cuando 'bat_file=True', es necesario especificar 'script_name' y 'bat_file_name'.")
+        if not script_name:
+            raise ValueError("Es necesario especificar 'script_name'.")
 
         # Ruta completa al script
         script_path = script_name if self.directory is None else os.path.join(self.directory, script_name)
@@ -437,10 +4039,10 @@ Project_toolbox.py
         
         # Verificar si el entorno virtual existe
         if on_venv:
-            if not os.path.exists(self.venv_path):
+            if not self.venv.exists:
                 self.create_virtual_environment()
 
-            python_executable = os.path.join(self.venv_path, 'bin', 'python') if os.name != 'nt' else os.path.join(self.venv_path, 'Scripts', 'python.exe')
+            python_executable = self.venv.python_executable
             print('Se usará el ambiente virtual.')
 
         else:
@@ -452,41 +4054,822 @@ Project_toolbox.py
         linea_comando = f'"{os.path.abspath(python_executable)}" "{os.path.abspath(script_path)}"'
 
         # Crear el archivo .bat
+        bat_file_name = bat_file_name if self.directory is None else os.path.join(self.directory, bat_file_name)
         with open(bat_file_name, 'w') as archivo_bat:
             archivo_bat.write(linea_comando)
         
         print(f'Archivo {bat_file_name} creado con éxito.')
 
 
+    # Funcion para crear un lanzador de Linux (sh) y opcionalmente las unidades de systemd para ejecutar el script
+    def create_launcher(self, script_name:str=None, launcher_name:str=None, on_venv:bool=True, optimized:bool=False,
+                        systemd:bool=False, schedule:str=None, description:str=None, worker:bool=False,
+                        output_dir:str=None) -> list[str]:
+        """
+        Crea un script .sh que ejecuta el script del proyecto, el equivalente en Linux de create_bat_file, para usarlo
+        desde cron o systemd. Con systemd=True crea tambien la unidad .service y, si se indica schedule, la unidad .timer.
+
+        En el modo optimizado el interprete se inicia con -I -S (modo aislado y sin el modulo site) y con un sys.path
+        calculado al crear el lanzador, lo cual reduce el tiempo de arranque de cada ejecucion. En este modo no se usan
+        PYTHONPATH ni las demas variables PYTHON*, ni se ejecutan los .pth ni sitecustomize; si el site-packages cambia
+        el lanzador vuelve al arranque normal hasta que se cree de nuevo.
+
+        Con worker=True el script se ejecuta en un fork del proceso de trabajo precargado (ver start_worker), para
+        scripts que se ejecutan con mucha frecuencia y pasan la mayor parte del tiempo importando librerias.
+
+        :param script_name: Nombre del script que se quiere ejecutar.
+        :param launcher_name: Nombre base de los archivos a crear. Por defecto el nombre del script.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :param optimized: Indicador booleano, si es True usa el arranque optimizado.
+        :param systemd: Indicador booleano, si es True crea las unidades de systemd.
+        :param schedule: Calendario de ejecucion de la unidad .timer con el formato OnCalendar de systemd, por ejemplo 'daily' o '*-*-* 06:00:00'.
+        :param description: Descripcion de las unidades de systemd.
+        :param worker: Indicador booleano, si es True ejecuta el script a traves del proceso de trabajo precargado.
+        :param output_dir: Directorio donde se crean los archivos. Por defecto el directorio del proyecto. El script se
+            sigue ejecutando desde el directorio del proyecto.
+        :return: Lista de archivos creados.
+        """
+        if not script_name:
+            raise ValueError("Es necesario especificar 'script_name'.")
+        if optimized and worker:
+            raise ValueError("Los parámetros 'optimized' y 'worker' no se pueden usar a la vez.")
+
+        script_path = os.path.abspath(script_name if self.directory is None else os.path.join(self.directory, script_name))
+        directory = os.path.dirname(script_path) if self.directory is None else os.path.abspath(self.directory)
+        output_dir = os.path.abspath(output_dir) if output_dir else directory
+        os.makedirs(output_dir, exist_ok=True)
+        launcher_name = os.path.splitext(os.path.basename(launcher_name or script_path))[0]
+        python_executable = os.path.abspath(self._python_executable(on_venv, create=True))
+        created = []
+
+        command = [python_executable, script_path]
+        if optimized:
+            # sys.path de un arranque normal del script (sin variables de entorno), calculado una sola vez
+            sys_path = [os.path.dirname(script_path)] + self.get_helper(on_venv).sys_path()
+            site_packages = self.venv.site_packages if on_venv else [path for path in sys_path if path.endswith('site-packages')]
+            site_mtimes = {path: os.stat(path).st_mtime_ns for path in site_packages}
+
+            # El arranque se importa como modulo para que su bytecode quede en __pycache__ y no se compile en cada ejecucion
+            bootstrap_module = re.sub(r'\W', '_', f'{launcher_name}_launcher')
+            bootstrap_path = os.path.join(output_dir, f'{bootstrap_module}.py')
+            with open(bootstrap_path, 'w') as f:
+                f.write(_read_script('launcher_bootstrap.py.tmpl').format(script_path=script_path, python_executable=python_executable, sys_path=sys_path, site_mtimes=site_mtimes))
+            created.append(bootstrap_path)
+            command = [python_executable, '-I', '-S', '-c', f'import sys; sys.path.insert(0, {output_dir!r}); import {bootstrap_module}']
+        elif worker:
+            paths = self._worker_paths(on_venv)
+            if not os.path.exists(paths['client']):
+                self._write_worker_files(paths, on_venv)
+            command = self._worker_command(paths, script_path)
+
+        # Script sh: se ejecuta desde el directorio del proyecto y reemplaza al shell (exec) para recibir las señales
+        sh_path = os.path.join(output_dir, f'{launcher_name}.sh')
+        with open(sh_path, 'w', newline='\n') as f:
+            f.write('#!/bin/sh\n')
+            f.write(f'cd {shlex.quote(directory)} || exit 1\n')
+            f.write(f'exec {shlex.join(command)} "$@"\n')
+        os.chmod(sh_path, 0o755)
+        created.append(sh_path)
+
+        if systemd:
+            description = description or f'{os.path.basename(script_path)} ({directory})'
+            service_path = os.path.join(output_dir, f'{launcher_name}.service')
+            with open(service_path, 'w', newline='\n') as f:
+                f.write('[Unit]\n')
+                f.write(f'Description={description}\n\n')
+                f.write('[Service]\n')
+                f.write('Type=oneshot\n')
+                f.write(f'WorkingDirectory={directory}\n')
+                f.write(f'ExecStart="{sh_path}"\n')
+                if not schedule:
+                    f.write('\n[Install]\nWantedBy=default.target\n')
+            created.append(service_path)
+
+            if schedule:
+                timer_path = os.path.join(output_dir, f'{launcher_name}.timer')
+                with open(timer_path, 'w', newline='\n') as f:
+                    f.write('[Unit]\n')
+                    f.write(f'Description=Programación de {description}\n\n')
+                    f.write('[Timer]\n')
+                    f.write(f'OnCalendar={schedule}\n')
+                    f.write('Persistent=true\n\n')
+                    f.write('[Install]\n')
+                    f.write('WantedBy=timers.target\n')
+                created.append(timer_path)
+
+        for path in created:
+            print(f'Archivo {path} creado con éxito.')
+        if systemd:
+            unit = f'{launcher_name}.timer' if schedule else f'{launcher_name}.service'
+            print(f'Para activarlo: systemctl --user link {" ".join(shlex.quote(path) for path in created if path.endswith((".service", ".timer")))} '
+                  f'&& systemctl --user enable --now {unit}')
+        else:
+            print(f'Para usarlo con cron, por ejemplo: 0 6 * * * {shlex.quote(sh_path)}')
+        return created
+
+
+    # Funcion para obtener las rutas de los archivos del proceso de trabajo del proyecto
+    def _worker_paths(self, on_venv:bool=True) -> dict:
+        if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+            raise OSError("El proceso de trabajo precargado requiere fork y sockets Unix (Linux o macOS).")
+        python_executable = os.path.abspath(self._python_executable(on_venv, create=True))
+        directory = os.path.abspath(self.directory or os.getcwd())
+        key = hashlib.sha256(f'{directory}\0{python_executable}'.encode()).hexdigest()[:16]
+        worker_dir = os.path.join(TOOLBOX_HOME, 'workers', key)
+        socket_path = os.path.join(worker_dir, 'worker.sock')
+        # La ruta de un socket Unix tiene un limite de ~100 caracteres
+        if len(socket_path.encode()) > 100:
+            socket_path = os.path.join(tempfile.gettempdir(), f'project-toolbox-{key}.sock')
+        return {'dir': worker_dir, 'socket': socket_path, 'python': python_executable, 'directory': directory,
+                'server': os.path.join(worker_dir, 'worker_server.py'), 'client': os.path.join(worker_dir, 'worker_client.py'),
+                'options': os.path.join(worker_dir, 'options.json'), 'starting': os.path.join(worker_dir, 'starting'),
+                'log': os.path.join(worker_dir, 'worker.log')}
+
+    # Funcion para escribir el servidor, el cliente y la configuracion del proceso de trabajo
+    def _write_worker_files(self, paths:dict, on_venv:bool=True, preload:list[str]=None, max_memory_mb:int=None,
+                            job_memory_mb:int=None, idle_timeout:float=None):
+        os.makedirs(paths['dir'], exist_ok=True)
+        if preload is None:
+            if os.path.exists(paths['options']):
+                with open(paths['options']) as f:
+                    options = json.load(f)
+                preload, max_memory_mb, job_memory_mb, idle_timeout = (options['preload'], options['max_memory_kb'] // 1024 or None,
+                                                                       options['job_memory_kb'] // 1024 or None, options['idle_timeout'])
+            else:
+                # Por defecto se precargan los modulos que importa el codigo del proyecto
+                scanner = ImportScanner(paths['directory'])
+                ignored = scanner.local_modules() | {'__future__', '__main__'}
+                preload = sorted(module for module in scanner.scan() if module.split('.')[0] not in ignored)
+
+        # El servidor se reinicia si cambia el site-packages, el pyvenv.cfg o el archivo requirements
+        watch = list(self.venv.site_packages) + [os.path.join(self.venv.path, 'pyvenv.cfg')] if on_venv else []
+        watch.append(os.path.abspath(self.requirements_path))
+        options = {'directory': paths['directory'], 'socket': paths['socket'], 'starting': paths['starting'], 'preload': preload,
+                   'watch': watch, 'max_memory_kb': (max_memory_mb or 0) * 1024, 'job_memory_kb': (job_memory_mb or 0) * 1024,
+                   'idle_timeout': idle_timeout}
+        with open(paths['options'], 'w') as f:
+            json.dump(options, f, indent=2)
+        with open(paths['server'], 'w') as f:
+            f.write(_read_script('worker_server.py'))
+        with open(paths['client'], 'w') as f:
+            f.write(_read_script('worker_client.py.tmpl').format(socket_path=paths['socket'], starting_path=paths['starting'], python_executable=paths['python'],
+                                          server_path=paths['server'], options_path=paths['options'], log_path=paths['log']))
+        return options
+
+    # Funcion para obtener el comando que ejecuta un script a traves del proceso de trabajo
+    def _worker_command(self, paths:dict, script_path:str) -> list[str]:
+        return [paths['python'], '-I', '-S', '-c', f"import sys; sys.path.insert(0, {paths['dir']!r}); import worker_client", script_path]
+
+    # Funcion para iniciar el proceso de trabajo con los modulos del proyecto precargados
+    @_project_operation
+    def start_worker(self, preload:list[str]=None, on_venv:bool=True, max_memory_mb:int=None, job_memory_mb:int=None,
+                     idle_timeout:float=None, timeout:float=120) -> dict|None:
+        """
+        Inicia un proceso de trabajo que mantiene el interprete del ambiente con los modulos pesados del proyecto ya
+        importados (pandas, numpy, etc.). Cada ejecucion con run_in_worker o con un lanzador creado con
+        create_launcher(worker=True) se hace en un fork de ese proceso, por lo que no paga el arranque ni los imports.
+        El trabajo recibe la terminal, el directorio, las variables de entorno y los argumentos de quien lo lanza.
+
+        El proceso se comunica por un socket Unix y se reinicia solo: si cambia el ambiente o el archivo requirements,
+        o si supera max_memory_mb, el siguiente trabajo se ejecuta de forma normal y arranca un proceso nuevo.
+        Solo esta disponible en sistemas con fork (Linux, macOS).
+
+        :param preload: Lista de modulos a precargar. Por defecto los modulos que importa el codigo del proyecto.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :param max_memory_mb: Memoria maxima (RSS) del proceso de trabajo en MB antes de reiniciarlo. Por defecto sin limite.
+        :param job_memory_mb: Memoria maxima (RSS) de cada trabajo en MB; el trabajo que la supera se termina. Por defecto sin limite.
+        :param idle_timeout: Segundos sin trabajos tras los cuales el proceso se detiene. Por defecto no se detiene.
+        :param timeout: Tiempo maximo de espera en segundos para que el proceso termine de precargar los modulos.
+        :return: Estado del proceso de trabajo (ver worker_status), o None si no se pudo iniciar.
+        """
+        paths = self._worker_paths(on_venv)
+        status = _worker_request(paths['socket'], {'type': 'status'})
+        if status is not None and not status['stale'] and preload is None:
+            print(f"El proceso de trabajo ya está en ejecución (PID {status['pid']}).")
+            return status
+        if status is not None:
+            self.stop_worker(on_venv=on_venv)
+
+        self._write_worker_files(paths, on_venv, preload, max_memory_mb, job_memory_mb, idle_timeout)
+        with open(paths['starting'], 'w'):
+            pass
+        # El proceso de trabajo sobrevive a esta llamada, por eso se inicia con Popen y no con run_command
+        with open(paths['log'], 'ab') as log:
+            process = subprocess.Popen([paths['python'], paths['server'], paths['options']], cwd=paths['directory'],
+                                       stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+        deadline = time.monotonic() + timeout
+        while status is None or status['pid'] != process.pid:
+            if process.poll() is not None or time.monotonic() > deadline:
+                if process.poll() is None:
+                    process.terminate()
+                if os.path.exists(paths['starting']):
+                    os.remove(paths['starting'])
+                print(f"Error al iniciar el proceso de trabajo. Detalles en {paths['log']}")
+                return None
+            time.sleep(0.1)
+            status = _worker_request(paths['socket'], {'type': 'status'})
+
+        print(f"Proceso de trabajo iniciado (PID {status['pid']}): {len(status['preloaded'])} módulos precargados "
+              f"en {status['preload_time']:.2f} s, {status['rss_kb'] / 1024:.0f} MB.")
+        for name, error in status['failed'].items():
+            print(f"  No se pudo precargar {name}: {error}")
+        return status
+
+    # Funcion para detener el proceso de trabajo
+    @_project_operation
+    def stop_worker(self, on_venv:bool=True, timeout:float=30) -> bool:
+        """
+        Detiene el proceso de trabajo. Los trabajos en ejecucion terminan antes de que el proceso se detenga.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :param timeout: Tiempo maximo de espera en segundos.
+        :return: True si el proceso estaba en ejecucion y se detuvo.
+        """
+        paths = self._worker_paths(on_venv)
+        status = _worker_request(paths['socket'], {'type': 'status'})
+        if status is None or _worker_request(paths['socket'], {'type': 'stop'}) is None:
+            print("El proceso de trabajo no está en ejecución.")
+            return False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                os.kill(status['pid'], 0)
+            except ProcessLookupError:
+                print(f"Proceso de trabajo detenido (PID {status['pid']}, {status['jobs_total']} trabajos).")
+                return True
+            time.sleep(0.1)
+        print(f"El proceso de trabajo {status['pid']} no se detuvo en {timeout} s (hay {status['jobs_running']} trabajos en ejecución).")
+        return False
+
+    # Funcion para consultar el estado del proceso de trabajo
+    def worker_status(self, on_venv:bool=True) -> dict|None:
+        """
+        Muestra el estado del proceso de trabajo.
+
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :return: Diccionario con pid, uptime, rss_kb, preloaded, failed, preload_time, jobs_running, jobs_total y stale,
+            o None si el proceso no esta en ejecucion.
+        """
+        status = _worker_request(self._worker_paths(on_venv)['socket'], {'type': 'status'})
+        if status is None:
+            print("El proceso de trabajo no está en ejecución.")
+            return None
+        print(f"Proceso de trabajo PID {status['pid']}: activo hace {status['uptime']:.0f} s, {status['rss_kb'] / 1024:.0f} MB, "
+              f"{len(status['preloaded'])} módulos precargados, {status['jobs_running']} trabajos en ejecución, "
+              f"{status['jobs_total']} trabajos en total.")
+        if status['stale']:
+            print("El ambiente o el archivo requirements cambió: el proceso se reiniciará con el siguiente trabajo.")
+        return status
+
+    # Funcion para ejecutar un script del proyecto a traves del proceso de trabajo
+    @_project_operation
+    def run_in_worker(self, script_name:str, args:list[str]=None, on_venv:bool=True) -> int:
+        """
+        Ejecuta el script en un fork del proceso de trabajo. Si el proceso no esta en ejecucion, el script se ejecuta
+        de la forma normal y el proceso se inicia en segundo plano para las siguientes ejecuciones.
+
+        :param script_name: Nombre del script que se quiere ejecutar.
+        :param args: Argumentos del script.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :return: Codigo de salida del script.
+        """
+        paths = self._worker_paths(on_venv)
+        if not os.path.exists(paths['client']):
+            self._write_worker_files(paths, on_venv)
+        script_path = os.path.abspath(script_name if self.directory is None else os.path.join(self.directory, script_name))
+        try:
+            run_command(self._worker_command(paths, script_path) + list(args or []))
+        except subprocess.CalledProcessError as e:
+            print(f"Error al ejecutar {script_name} en el proceso de trabajo. Detalles: {e}")
+            if _raise_command_errors.get():
+                raise
+            return e.returncode
+        return 0
+
+
+    # Funcion para medir el tiempo de importacion de los modulos de un script
+    @_project_operation
+    def profile_startup(self, script_name:str, runs:int=1, on_venv:bool=True, save:bool=True, min_time:float=0.005) -> dict:
+        """
+        Ejecuta el script con python -X importtime y muestra el arbol de importaciones ordenado por tiempo acumulado,
+        y el tiempo por libreria. El script se ejecuta completo en cada corrida, con su salida estandar descartada.
+        Con varias corridas se usa la mediana de cada modulo. El resultado se guarda en TOOLBOX_HOME/profiles
+        y se compara con el ultimo guardado del mismo script.
+
+        :param script_name: Nombre del script a ejecutar, relativo al directorio del proyecto.
+        :param runs: Numero de ejecuciones.
+        :param on_venv: Indicador booleano, por defecto es igual a True con lo cual utiliza el interprete del entorno virtual.
+        :param save: Indicador booleano, por defecto es igual a True con lo cual guarda el resultado.
+        :param min_time: Tiempo acumulado minimo, en segundos, de los modulos que se muestran en el arbol.
+        :return: Diccionario con el arbol, los tiempos por modulo y por libreria (en microsegundos).
+        """
+        script_path = os.path.abspath(script_name if self.directory is None else os.path.join(self.directory, script_name))
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"No se encontró el script {script_path}.")
+        python_executable = self._python_executable(on_venv)
+
+        trees = []
+        for _ in range(runs):
+            try:
+                trees.append(_parse_importtime(run_command([python_executable, '-X', 'importtime', script_path], capture_stderr=True)))
+            except subprocess.CalledProcessError as e:
+                # El script fallo, pero los imports hasta el error se miden igual
+                print(f"Error al ejecutar {script_path}. Detalles: {e}")
+                trees.append(_parse_importtime(e.output or ''))
+
+        inventory = self.get_inventory(on_venv=on_venv)
+        module_map = inventory.top_level_modules()
+        local_modules = ImportScanner(self.directory or os.path.dirname(script_path)).local_modules()
+        stdlib = set(sys.stdlib_module_names) | set(sys.builtin_module_names)
+
+        def owner(module:str) -> str:
+            top = module.split('.')[0]
+            owners = module_map.get('.'.join(module.split('.')[:2])) or module_map.get(top)
+            if owners:
+                return owners[0]
+            if top in stdlib or top.startswith('_frozen_importlib') or top == 'encodings':
+                return 'stdlib'
+            return 'project' if top in local_modules else 'unknown'
+
+        profile = _aggregate_importtime(trees, owner)
+        profile.update({'script': script_path, 'python': python_executable, 'runs': runs, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+        print(f"Tiempo de importación de {script_path}: {profile['total_us'] / 1000:.1f} ms (mediana de {runs} ejecución(es))")
+        print(f"{'Acum. ms':>10} {'Propio ms':>9}  Módulo")
+        _print_import_tree(profile['tree'], int(min_time * 1e6))
+        print(f"\n{'Librería':<30} {'Acum. ms':>10} {'Propio ms':>10} {'Módulos':>8}")
+        for distribution, entry in profile['distributions'].items():
+            print(f"{distribution:<30} {entry['cumulative_us'] / 1000:>10.1f} {entry['self_us'] / 1000:>10.1f} {entry['modules']:>8}")
+
+        # Comparacion con el ultimo perfil guardado del mismo script
+        profiles_dir = os.path.join(TOOLBOX_HOME, 'profiles', hashlib.sha256(script_path.encode()).hexdigest()[:16])
+        previous_paths = sorted(glob.glob(os.path.join(profiles_dir, '*.json')))
+        if previous_paths:
+            with open(previous_paths[-1], 'r') as f:
+                previous = json.load(f)
+            print(f"\nComparación con el perfil del {previous['created_at']}: {previous['total_us'] / 1000:.1f} ms -> {profile['total_us'] / 1000:.1f} ms")
+            for distribution in sorted(set(profile['distributions']) | set(previous['distributions'])):
+                before = previous['distributions'].get(distribution, {}).get('cumulative_us', 0)
+                after = profile['distributions'].get(distribution, {}).get('cumulative_us', 0)
+                if abs(after - before) >= min_time * 1e6:
+                    print(f"{distribution:<30} {before / 1000:>10.1f} -> {after / 1000:>10.1f} ms")
+
+        if save:
+            os.makedirs(profiles_dir, exist_ok=True)
+            profile_path = os.path.join(profiles_dir, time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}.json')
+            with open(profile_path, 'w') as f:
+                json.dump(profile, f)
+            print(f"Perfil guardado en {profile_path}")
+        return profile
+
+
+
+# Operacion de varios proyectos en paralelo ------------------------------------------------------------------------------
+
+class FleetResult(NamedTuple):
+    """
+    Resultado de una operacion de Project en un directorio.
+    """
+    directory: str
+    operation: str
+    ok: bool
+    elapsed: float
+    result: object = None
+    error: str = None
+    output: str = ''
+
+
+# Funcion que ejecuta una operacion de Project en un proceso del pool
+def _run_fleet_operation(directory:str, project_kwargs:dict, operation:str, args:tuple, kwargs:dict) -> FleetResult:
+    # La salida de pip va directo a los descriptores del proceso, se redirige a un archivo temporal por proyecto
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    with tempfile.TemporaryFile(mode='w+') as output_file:
+        os.dup2(output_file.fileno(), 1)
+        os.dup2(output_file.fileno(), 2)
+        start = time.perf_counter()
+        # Los errores que las operaciones solo muestran se propagan, para que el estado del proyecto los refleje
+        token = _raise_command_errors.set(True)
+        try:
+            project = Project(directory=directory, change_dir=False, **project_kwargs)
+            result = getattr(project, operation)(*args, **kwargs)
+            ok, error = True, None
+            if isinstance(result, DependencyReport) and not result.ok:
+                ok, error = False, result.error or f'{len(result.missing)} dependencias faltantes y {len(result.wrong_version)} con una versión distinta.'
+        except BaseException as e:
+            result, ok, error = None, False, f'{type(e).__name__}: {e}'
+        finally:
+            _raise_command_errors.reset(token)
+            elapsed = time.perf_counter() - start
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+        output_file.seek(0)
+        output = output_file.read()
+
+    # El resultado debe poder enviarse al proceso principal
+    try:
+        pickle.dumps(result)
+    except Exception:
+        result = repr(result)
+
+    return FleetResult(directory, operation, ok, elapsed, result, error, output)
+
+
+class ProjectFleet:
+    """
+    Ejecuta operaciones de Project sobre muchos directorios de proyecto en paralelo, con un numero
+    limitado de procesos. Cada proyecto se crea con change_dir=False, por lo que nunca se cambia el
+    directorio de trabajo del proceso, y la salida de cada proyecto se guarda por separado.
+    Una operacion falla si lanza una excepcion, si falla alguno de sus comandos aunque Project solo muestre el error,
+    o si devuelve un DependencyReport con dependencias faltantes o con una version distinta.
+    """
+
+    def __init__(self, directories:list[str], max_workers:int=None, **project_kwargs):
+        """
+        :param directories: Lista de directorios de proyecto.
+        :param max_workers: Numero maximo de procesos simultaneos. Por defecto el numero de CPUs.
+        :param project_kwargs: Argumentos adicionales para crear cada Project (venv_name, requirements_name, ...).
+        """
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.project_kwargs = project_kwargs
+
+    @classmethod
+    def from_glob(cls, pattern:str, max_workers:int=None, **project_kwargs) -> 'ProjectFleet':
+        """
+        Crea la flota con los directorios que coinciden con un patron, por ejemplo 'C:/proyectos/*'.
+        """
+        directories = sorted(path for path in glob.glob(pattern) if os.path.isdir(path))
+        return cls(directories, max_workers=max_workers, **project_kwargs)
+
+    def run(self, operation:str, *args, **kwargs) -> list[FleetResult]:
+        """
+        Ejecuta la operacion en todos los proyectos.
+
+        :param operation: Nombre del metodo de Project, por ejemplo 'install_requirements'.
+        :param args: Argumentos posicionales del metodo.
+        :param kwargs: Argumentos con nombre del metodo.
+        :return: Lista de FleetResult en el mismo orden que los directorios.
+        """
+        if operation.startswith('_') or not callable(getattr(Project, operation, None)):
+            raise ValueError(f"'{operation}' no es una operación de Project.")
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, max(1, len(self.directories)))) as executor:
+            futures = [executor.submit(_run_fleet_operation, directory, self.project_kwargs, operation, args, kwargs) for directory in self.directories]
+            return [future.result() for future in futures]
+
+    def deduplicate(self, store_root:str=None, dry_run:bool=False, gc:bool=True) -> DedupReport:
+        """
+        Comparte los archivos identicos de los ambientes virtuales de todos los proyectos con enlaces duros a un
+        almacen direccionado por contenido (ver VenvDedupStore). Los hashes se calculan en paralelo.
+
+        :param store_root: Directorio del almacen compartido. Por defecto dentro de TOOLBOX_HOME.
+        :param dry_run: Indicador booleano, si es True solo muestra el espacio que se recuperaria.
+        :param gc: Indicador booleano, por defecto es igual a True con lo cual elimina los objetos que ya no usa ningun ambiente.
+        :return: Objeto DedupReport.
+        """
+        store = VenvDedupStore(store_root or os.path.join(TOOLBOX_HOME, 'dedup'), max_workers=2 * self.max_workers)
+        venv_paths = [os.path.join(directory, self.project_kwargs.get('venv_name', 'venv')) for directory in self.directories]
+        report = store.deduplicate(venv_paths, dry_run=dry_run)
+        print_dedup_report(report)
+        if gc and not dry_run:
+            removed, freed = store.collect_garbage(venv_paths)
+            if removed:
+                print(f"{removed} objetos sin uso eliminados del almacén ({freed / 1024 ** 2:.2f} MB).")
+        return report
+
+    @staticmethod
+    def print_table(results:list[FleetResult]):
+        """
+        Muestra la tabla de resultados por proyecto con sus tiempos.
+        """
+        width = max([len(result.directory) for result in results] + [len('Proyecto')])
+        print(f"{'Proyecto':<{width}} {'Operación':<28} {'Estado':<6} {'Tiempo (s)':>10}")
+        print(f"{'-' * width} {'-' * 28} {'-' * 6} {'-' * 10}")
+        for result in results:
+            status = 'OK' if result.ok else 'ERROR'
+            print(f"{result.directory:<{width}} {result.operation:<28} {status:<6} {result.elapsed:>10.2f}")
+            if result.error:
+                print(f"    {result.error}")
+        total = sum(result.elapsed for result in results)
+        print(f"{len(results)} proyectos, {sum(not result.ok for result in results)} con error, {total:.2f} s de tiempo acumulado.")
+
+
+# Version asincrona de Project -------------------------------------------------------------------------------------------
+
+class _AsyncCommandRunner(CommandRunner):
+    """
+    Ejecutor de comandos que lanza los procesos con asyncio.create_subprocess_exec en el ciclo de eventos,
+    lee stdout y stderr linea por linea y permite cancelar el proceso en curso.
+    Se usa desde el hilo donde corre el metodo de Project, que espera el resultado sin bloquear el ciclo de eventos.
+    """
+
+    def __init__(self, loop:asyncio.AbstractEventLoop, on_output=None, semaphore:asyncio.Semaphore=None):
+        self.loop = loop
+        self.on_output = on_output
+        self.semaphore = semaphore
+        self.cancelled = False
+        self._current = None
+
+    def run(self, command:list[str], capture_output:bool=False, quiet_stderr:bool=False, capture_stderr:bool=False) -> str|None:
+        if self.cancelled:
+            raise OperationCancelled(f"Operación cancelada antes de ejecutar {command}.")
+        # El seguimiento de progreso se crea en el hilo de la operacion, donde el proyecto activo esta en el contexto
+        tracker = None if capture_output or capture_stderr else ProgressTracker.for_command(command)
+        # El uso de recursos del proceso no esta disponible aqui porque asyncio recoge el proceso hijo
+        with _active_tracer().span(_command_name(command), 'command', command=command) as attributes:
+            self._current = asyncio.run_coroutine_threadsafe(self._run_async(command, capture_output, quiet_stderr, tracker, capture_stderr), self.loop)
+            if self.cancelled:
+                self._current.cancel()
+            try:
+                output = self._current.result()
+            except concurrent.futures.CancelledError:
+                raise OperationCancelled(f"Operación cancelada durante {command}.")
+            except subprocess.CalledProcessError as e:
+                attributes['exit_code'] = e.returncode
+                raise
+            finally:
+                self._current = None
+            attributes['exit_code'] = 0
+            return output
+
+    def cancel(self):
+        """
+        Cancela el comando en curso y los siguientes. Se llama desde el ciclo de eventos.
+        """
+        self.cancelled = True
+        if self._current is not None:
+            self._current.cancel()
+
+    async def _stream(self, stream:asyncio.StreamReader, name:str, collected:list|None, tracker:ProgressTracker=None):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            text = line.decode(errors='replace').rstrip('\n')
+            if tracker is not None:
+                tracker.feed(text)
+            if collected is not None:
+                collected.append(text)
+            elif self.on_output is not None:
+                self.on_output(name, text)
+
+    async def _run_async(self, command:list[str], capture_output:bool, quiet_stderr:bool, tracker:ProgressTracker=None, capture_stderr:bool=False) -> str|None:
+        async with (self.semaphore if self.semaphore is not None else contextlib.nullcontext()):
+            env = dict(os.environ, PYTHONUNBUFFERED='1')
+            process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env)
+            collected = [] if capture_output or capture_stderr else None
+            try:
+                await asyncio.gather(
+                    self._stream(process.stdout, 'stdout', [] if capture_stderr else collected, tracker),
+                    self._stream(process.stderr, 'stderr', collected if capture_stderr else ([] if quiet_stderr else None), tracker),
+                )
+                returncode = await process.wait()
+                if tracker is not None:
+                    tracker.finish(returncode)
+            except asyncio.CancelledError:
+                # Cancelacion o tiempo limite: se termina el proceso antes de propagar
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+        output = '\n'.join(collected) + '\n' if collected else ('' if capture_output or capture_stderr else None)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, output)
+        return output
+
+
+# Funcion para mostrar la salida de los comandos de AsyncProject
+def _print_output(stream:str, line:str):
+    print(line, file=sys.stderr if stream == 'stderr' else sys.stdout, flush=True)
+
+
+class AsyncProject:
+    """
+    Version asincrona de Project: cada metodo publico de Project es una corrutina.
+    Los metodos de Project corren en un grupo de hilos propio del proyecto, de max_concurrency hilos, y sus comandos
+    externos se ejecutan con asyncio.create_subprocess_exec; la salida se entrega linea por linea a on_output.
+    Al cancelar una operacion o superar su timeout se termina el comando en curso y la operacion se detiene en el
+    siguiente paso (comando u operacion interna) con OperationCancelled, liberando su hilo.
+    El proyecto no cambia el directorio de trabajo, por lo que se pueden ejecutar muchas operaciones a la vez en el
+    mismo ciclo de eventos, por ejemplo:
+
+        async with AsyncProject(directory) as project:
+            report = await project.verify_dependencies()
+    """
+
+    def __init__(self, *args, on_output=_print_output, max_processes:int=None, timeout:float=None, max_concurrency:int=4, **kwargs):
+        """
+        :param args: Argumentos de Project.
+        :param on_output: Funcion (stream, linea) que recibe cada linea de salida de los comandos. None para descartarla.
+        :param max_processes: Numero maximo de comandos simultaneos de este proyecto.
+        :param timeout: Tiempo limite por defecto, en segundos, de cada operacion.
+        :param max_concurrency: Numero maximo de operaciones simultaneas de este proyecto (hilos de su grupo de hilos).
+        :param kwargs: Argumentos con nombre de Project. change_dir es False por defecto.
+        """
+        kwargs.setdefault('change_dir', False)
+        self.project = Project(*args, **kwargs)
+        self.on_output = on_output
+        self.max_processes = max_processes
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='AsyncProject')
+        self._semaphore = None
+
+    def close(self):
+        """
+        Libera el grupo de hilos del proyecto. Las operaciones en curso terminan antes de liberarlo.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def __getattr__(self, name:str):
+        # Los atributos que no son metodos (venv_path, requirements_path, ...) se leen del Project
+        if name == 'project':
+            raise AttributeError(name)
+        return getattr(self.project, name)
+
+    async def _call(self, operation:str, args:tuple, kwargs:dict, timeout:float=None):
+        loop = asyncio.get_running_loop()
+        if self.max_processes and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+        runner = _AsyncCommandRunner(loop, self.on_output, self._semaphore)
+
+        def target():
+            token = _command_runner.set(runner)
+            try:
+                return getattr(self.project, operation)(*args, **kwargs)
+            finally:
+                _command_runner.reset(token)
+
+        future = loop.run_in_executor(self._executor, contextvars.copy_context().run, target)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Se cancela el comando en curso y se espera a que el metodo se detenga en su hilo en el siguiente paso
+            runner.cancel()
+            with contextlib.suppress(Exception, OperationCancelled):
+                await future
+            raise
+
+
+# Funcion para crear la corrutina equivalente a un metodo de Project
+def _make_async_method(operation:str):
+    method = getattr(Project, operation)
+
+    async def async_method(self, *args, timeout:float=None, **kwargs):
+        return await self._call(operation, args, kwargs, timeout)
+
+    async_method.__name__ = operation
+    async_method.__qualname__ = f'AsyncProject.{operation}'
+    async_method.__doc__ = (method.__doc__ or '') + '\n        :param timeout: Tiempo limite en segundos de la operacion (version asincrona).\n'
+    return async_method
+
+
+for _operation in [name for name in vars(Project) if not name.startswith('_') and callable(getattr(Project, name))]:
+    setattr(AsyncProject, _operation, _make_async_method(_operation))
+
+
+# Linea de comandos ------------------------------------------------------------------------------------------------------
+
+# Funcion para convertir los argumentos clave=valor de la linea de comandos
+def _parse_cli_value(value:str):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def main(argv:list[str]=None) -> int:
+    """
+    Punto de entrada de la linea de comandos.
+
+    Ejemplo:
+        python Project_toolbox.py fleet verify_dependencies C:/proyectos/* --workers 8
+        python Project_toolbox.py fleet update_all_libraries proyecto1 proyecto2 --arg chunk_size=20
+        python Project_toolbox.py dedup C:/proyectos/* --dry-run
+    """
+    parser = argparse.ArgumentParser(prog='Project_toolbox', description='Herramientas para administrar proyectos de Python.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fleet_parser = subparsers.add_parser('fleet', help='Ejecuta una operación de Project en varios proyectos en paralelo.')
+    fleet_parser.add_argument('operation', help='Nombre del método de Project, por ejemplo install_requirements.')
+    fleet_parser.add_argument('directories', nargs='+', help='Directorios de proyecto (se aceptan patrones como proyectos/*).')
+    fleet_parser.add_argument('--workers', type=int, default=None, help='Número máximo de procesos simultáneos.')
+    fleet_parser.add_argument('--venv-name', default='venv', help='Nombre del ambiente virtual de cada proyecto.')
+    fleet_parser.add_argument('--requirements-name', default='requirements.txt', help='Nombre del archivo requirements de cada proyecto.')
+    fleet_parser.add_argument('--arg', action='append', default=[], metavar='CLAVE=VALOR', help='Argumento para la operación, el valor se interpreta como JSON si es posible.')
+    fleet_parser.add_argument('--json', action='store_true', help='Muestra los resultados en formato JSON.')
+    fleet_parser.add_argument('--show-output', action='store_true', help='Muestra la salida de cada proyecto.')
+
+    dedup_parser = subparsers.add_parser('dedup', help='Comparte los archivos idénticos de los ambientes virtuales de varios proyectos.')
+    dedup_parser.add_argument('directories', nargs='+', help='Directorios de proyecto (se aceptan patrones como proyectos/*).')
+    dedup_parser.add_argument('--venv-name', default='venv', help='Nombre del ambiente virtual de cada proyecto.')
+    dedup_parser.add_argument('--store', default=None, help='Directorio del almacén compartido, en el mismo sistema de archivos que los ambientes.')
+    dedup_parser.add_argument('--workers', type=int, default=None, help='Número máximo de procesos (se usan el doble de hilos para los hashes).')
+    dedup_parser.add_argument('--dry-run', action='store_true', help='Solo muestra el espacio que se recuperaría.')
+
+    args = parser.parse_args(argv)
+
+    directories = []
+    for pattern in args.directories:
+        matches = sorted(path for path in glob.glob(pattern) if os.path.isdir(path))
+        directories.extend(matches if matches else [pattern])
+
+    if args.command == 'dedup':
+        fleet = ProjectFleet(directories, max_workers=args.workers, venv_name=args.venv_name)
+        fleet.deduplicate(store_root=args.store, dry_run=args.dry_run)
+        return 0
+
+    kwargs = {}
+    for item in args.arg:
+        key, _, value = item.partition('=')
+        kwargs[key] = _parse_cli_value(value)
+
+    fleet = ProjectFleet(directories, max_workers=args.workers, venv_name=args.venv_name, requirements_name=args.requirements_name)
+    results = fleet.run(args.operation, **kwargs)
+
+    if args.json:
+        print(json.dumps([{**result._asdict(), 'result': repr(result.result)} for result in results], indent=2))
+    else:
+        if args.show_output:
+            for result in results:
+                print(f"===== {result.directory} =====")
+                print(result.output)
+        ProjectFleet.print_table(results)
+
+    return 0 if all(result.ok for result in results) else 1
+
 
 #---------------------------------------------------------------------------------------
 
 
-# Obtener la ruta del directorio del archivo de script actual
-script_dir = os.path.dirname(os.path.abspath(__file__))
+if __name__ == '__main__':
+    # Con argumentos se usa la linea de comandos, por ejemplo: python Project_toolbox.py fleet verify_dependencies proyectos/*
+    if len(sys.argv) > 1:
+        sys.exit(main())
+
+    # Obtener la ruta del directorio del archivo de script actual
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Uso del objeto Project
+    project = Project(directory=script_dir, venv_name="venv", requirements_name='requirements.txt')
 
-# Uso del objeto Project
-project = Project(directory=script_dir, venv_name="venv", requirements_name='requirements.txt')
+    # Llama a las funciones según sea necesario
 
-# Llama a las funciones según sea necesario
+    # NUEVO PROYECTO
+    #project.create_default_gitignore()
+    #project.create_virtual_environment()
+    #project.activate_virtual_environment()
+    #project.install_library(['pandas','numpy'], on_venv=True, update_requirements=True)
+    #project.uninstall_library('pandas', from_venv=True, update_requirements=True)
+    #project.uninstall_library('pandas', from_venv=True, cascade=True, dry_run=True)
 
-# NUEVO PROYECTO
-#project.create_default_gitignore()
-#project.create_virtual_environment()
-#project.activate_virtual_environment()
-#project.install_library(['pandas','numpy'], on_venv=True, update_requirements=True)
-#project.uninstall_library('pandas', from_venv=True, update_requirements=True)
+    # MANTENIMIENTO DE PROYECTO
+    #project.check_outdated_libraries(on_venv=True)
+    #project.populate_wheelhouse(on_venv=True)
+    #project.precompile_bytecode(on_venv=True, optimize=0, invalidation_mode='checked-hash')
+    #project.check_installation(on_venv=True)
+    #project.progress_callbacks.append(print_progress); project.install_requirements(on_venv=True); print(project.phase_timings)
+    #project.tracer.export_chrome_trace('trace.json')
+    #project.upgrade_library('all', on_venv=True, update_requirements=True)
+    #project.update_all_libraries(on_venv=True, update_requirements=True)
+    #project.list_snapshots(); project.rollback()
+    #project.verify_dependencies()
+    #project.why_installed('numpy'); project.reverse_dependencies('numpy', recursive=True)
+    #helper = project.get_helper(); print(helper.graph()); print(helper.metadata('pandas')['fields']['Requires-Python'])
+    #project.sync(on_venv=True, dry_run=True)
+    #project.prune(on_venv=True, allowlist=['pytest-*'], dry_run=True)
 
-# MANTENIMIENTO DE PROYECTO
-#project.check_outdated_libraries(on_venv=True)
-#project.check_installation(on_venv=True)
-#project.upgrade_library('all', on_venv=True, update_requirements=True)
-#project.update_all_libraries(on_venv=True, update_requirements=True)
-#project.verify_dependencies()
+    # PROYECTO TERMINADO
+    #project.create_requirements_file(from_venv=True)
+    #project.create_minimal_requirements_file(from_venv=True)
+    #project.create_lock_file(on_venv=True)
+    #project.create_bat_file(script_name='script.py', bat_file_name='script.bat', on_venv=True)
+    #project.create_launcher(script_name='script.py', optimized=True, systemd=True, schedule='*-*-* 06:00:00')
+    #project.profile_startup('script.py', runs=5)
+    #project.start_worker(max_memory_mb=2048); project.create_launcher(script_name='script.py', worker=True)
+    #project.worker_status(); project.stop_worker()
 
-# PROYECTO TERMINADO
-#project.create_requirements_file(from_venv=True)
-#project.create_bat_file(script_name='script.py', bat_file_name='script.bat', on_venv=True)
+    # CLONAR PROYECTO
+    #project.install_requirements(on_venv=True)
+    #project.install_requirements(on_venv=True, from_lock=True)
 
-# CLONAR PROYECTO
-#project.install_requirements(on_venv=True)
\ No newline at end of file
+    # VARIOS PROYECTOS
+    #fleet = ProjectFleet.from_glob(os.path.join(os.path.dirname(script_dir), '*'), max_workers=8)
+    #ProjectFleet.print_table(fleet.run('verify_dependencies'))
+    #fleet.deduplicate(dry_run=True)
\ No newline at end of file
@@ -0,0 +1,417 @@
+"""
+Benchmarks de Project_toolbox.
+
+Genera wheels sinteticas y un indice simple local (file://) con conjuntos de dependencias pequeño, mediano y grande,
+y mide en frio y en caliente las operaciones principales de Project. No usa la red: pip y el toolbox solo
+consultan el indice local. Los resultados se guardan en JSON para compararlos entre versiones, por ejemplo:
+
+    python Project_toolbox_benchmarks.py --sizes small medium --repeat 3 --output resultados.json
+    python Project_toolbox_benchmarks.py --output nuevos.json --compare resultados.json
+
+En frio se borran antes de cada medicion la cache de pip, el almacen de wheels, las plantillas de ambientes y la cache
+del indice, y se usa un objeto Project nuevo. En caliente se conservan las caches y el objeto Project.
+Cada operacion se mide con los dos modos de creacion de ambientes (ver VENV_MODES), que se guardan por separado.
+
+Las variables de entorno de pip y del toolbox solo se cambian mientras corren los benchmarks y luego se restauran.
+"""
+# Librerias necesarias ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import io
+import json
+import time
+import base64
+import random
+import shutil
+import hashlib
+import zipfile
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import statistics
+import urllib.request
+
+# Conjuntos de dependencias: (librerias directas del proyecto, total de librerias del grafo)
+DEPENDENCY_SETS = {
+    'small': (3, 8),
+    'medium': (10, 40),
+    'large': (30, 150),
+}
+
+# Operaciones medidas, en el orden de ejecucion (update_all_libraries deja el ambiente actualizado, por eso va al final)
+OPERATIONS = [
+    'create_virtual_environment',
+    'install_requirements',
+    'create_requirements_file',
+    'verify_dependencies',
+    'update_all_libraries',
+]
+
+# Modos de creacion de los ambientes: nombre -> venv_template_packages de Project. 'template' clona el ambiente desde
+# una plantilla sin librerias base, 'venv' lo crea con python -m venv
+VENV_MODES = {
+    'template': [],
+    'venv': None,
+}
+
+# Versiones publicadas de cada libreria: el proyecto fija la primera y update_all_libraries instala la ultima
+VERSIONS = ['1.0.0', '1.1.0']
+
+# Fecha fija de los archivos de las wheels, para que sean identicas entre ejecuciones
+ZIP_DATE_TIME = (2020, 1, 1, 0, 0, 0)
+
+# Generacion de wheels e indice local ------------------------------------------------------------------------------------
+
+# Funcion para calcular el hash de un archivo en el formato de RECORD
+def _record_hash(data:bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=').decode()
+    return f'sha256={digest}'
+
+
+# Funcion para crear una wheel pura de Python con los metadatos minimos
+def build_wheel(directory:str, name:str, version:str, requires:list[str], modules:int=3) -> str:
+    """
+    Crea una wheel sintetica py3-none-any.
+
+    :param directory: Directorio donde se guarda la wheel.
+    :param name: Nombre de la libreria.
+    :param version: Version de la libreria.
+    :param requires: Lista de requisitos (Requires-Dist).
+    :param modules: Numero de modulos del paquete.
+    :return: Ruta de la wheel.
+    """
+    package = name.replace('-', '_')
+    dist_info = f'{package}-{version}.dist-info'
+
+    files = {f'{package}/__init__.py': f'__version__ = {version!r}\n'}
+    for index in range(modules):
+        body = ''.join(f'def function_{index}_{n}(value):\n    return value * {n}\n\n' for n in range(20))
+        files[f'{package}/module_{index}.py'] = body
+    files[f'{dist_info}/METADATA'] = (
+        f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n'
+        + ''.join(f'Requires-Dist: {requirement}\n' for requirement in requires)
+    )
+    files[f'{dist_info}/WHEEL'] = 'Wheel-Version: 1.0\nGenerator: Project_toolbox_benchmarks\nRoot-Is-Purelib: true\nTag: py3-none-any\n'
+    files[f'{dist_info}/top_level.txt'] = f'{package}\n'
+
+    record = []
+    for path, content in files.items():
+        data = content.encode()
+        record.append(f'{path},{_record_hash(data)},{len(data)}')
+    record.append(f'{dist_info}/RECORD,,')
+    files[f'{dist_info}/RECORD'] = '\n'.join(record) + '\n'
+
+    os.makedirs(directory, exist_ok=True)
+    wheel_path = os.path.join(directory, f'{package}-{version}-py3-none-any.whl')
+    with zipfile.ZipFile(wheel_path, 'w', zipfile.ZIP_DEFLATED) as wheel:
+        for path, content in files.items():
+            wheel.writestr(zipfile.ZipInfo(path, ZIP_DATE_TIME), content)
+    return wheel_path
+
+
+# Funcion para generar el grafo de dependencias de un conjunto
+def dependency_graph(size:str, seed:int=0) -> tuple[list[str], dict[str, list[str]]]:
+    """
+    Genera un grafo aciclico de librerias: cada libreria depende de librerias con indice mayor,
+    y todas son alcanzables desde las librerias directas.
+
+    :param size: Nombre del conjunto (small, medium, large).
+    :param seed: Semilla del generador, el mismo valor produce el mismo grafo.
+    :return: Tupla (librerias directas, diccionario libreria -> dependencias).
+    """
+    roots, total = DEPENDENCY_SETS[size]
+    rng = random.Random(f'{size}-{seed}')
+    names = [f'bench-{size}-{index:03d}' for index in range(total)]
+    dependencies = {name: set() for name in names}
+    for index in range(roots, total):
+        dependencies[names[rng.randrange(0, index)]].add(names[index])
+    for index in range(total - 1):
+        if rng.random() < 0.3:
+            dependencies[names[index]].add(names[rng.randrange(index + 1, total)])
+    return names[:roots], {name: sorted(requires) for name, requires in dependencies.items()}
+
+
+# Funcion para crear el indice simple local con las wheels de todos los conjuntos
+def build_index(root:str, sizes:list[str], seed:int=0) -> dict[str, tuple[list[str], dict]]:
+    """
+    Crea root/wheels con las wheels y root/simple con un indice PEP 503.
+
+    :param root: Directorio base.
+    :param sizes: Conjuntos a generar.
+    :param seed: Semilla de los grafos.
+    :return: Diccionario conjunto -> (librerias directas, grafo).
+    """
+    wheels_dir = os.path.join(root, 'wheels')
+    simple_dir = os.path.join(root, 'simple')
+    graphs = {}
+    project_names = []
+    for size in sizes:
+        roots, graph = dependency_graph(size, seed)
+        graphs[size] = (roots, graph)
+        for name, requires in graph.items():
+            links = []
+            for version in VERSIONS:
+                wheel_path = build_wheel(wheels_dir, name, version, [f'{requirement}>=1.0' for requirement in requires])
+                with open(wheel_path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                filename = os.path.basename(wheel_path)
+                links.append(f'<a href="../../wheels/{filename}#sha256={digest}">{filename}</a><br/>')
+            os.makedirs(os.path.join(simple_dir, name), exist_ok=True)
+            with open(os.path.join(simple_dir, name, 'index.html'), 'w') as f:
+                f.write('<!DOCTYPE html>\n<html><body>\n' + '\n'.join(links) + '\n</body></html>\n')
+            project_names.append(name)
+
+    # Paginas vacias para las librerias base de los ambientes, para que pip list --outdated no muestre advertencias
+    for name in ('pip', 'setuptools', 'wheel'):
+        os.makedirs(os.path.join(simple_dir, name), exist_ok=True)
+        with open(os.path.join(simple_dir, name, 'index.html'), 'w') as f:
+            f.write('<!DOCTYPE html>\n<html><body>\n</body></html>\n')
+
+    with open(os.path.join(simple_dir, 'index.html'), 'w') as f:
+        f.write('<!DOCTYPE html>\n<html><body>\n' + '\n'.join(f'<a href="{name}/">{name}</a><br/>' for name in project_names) + '\n</body></html>\n')
+    return graphs
+
+
+# Ejecucion de los benchmarks --------------------------------------------------------------------------------------------
+
+class BenchmarkSuite:
+    """
+    Ejecuta las operaciones de Project sobre los conjuntos de dependencias en un directorio de trabajo aislado.
+    El indice local, las caches y TOOLBOX_HOME se configuran solo durante run (ver _environment).
+    """
+
+    def __init__(self, workdir:str, sizes:list[str], repeat:int=3, seed:int=0, verbose:bool=False, venv_modes:list[str]=None):
+        self.workdir = os.path.abspath(workdir)
+        self.sizes = sizes
+        self.venv_modes = venv_modes or list(VENV_MODES)
+        self.repeat = repeat
+        self.seed = seed
+        self.verbose = verbose
+        self.home = os.path.join(self.workdir, 'toolbox_home')
+        self.pip_cache = os.path.join(self.workdir, 'pip_cache')
+        self.index_url = 'file://' + urllib.request.pathname2url(os.path.join(self.workdir, 'simple'))
+
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import Project_toolbox
+        self.toolbox = Project_toolbox
+
+    @contextlib.contextmanager
+    def _environment(self):
+        """
+        Configura pip y el toolbox para usar solo el indice local y las caches del directorio de trabajo, y restaura
+        las variables de entorno y TOOLBOX_HOME al terminar. Los comandos del toolbox heredan os.environ.
+        """
+        saved_environ = dict(os.environ)
+        saved_home = self.toolbox.TOOLBOX_HOME
+        # Solo se usa el indice local: se eliminan los indices y configuraciones de pip del usuario
+        for variable in ('PIP_EXTRA_INDEX_URL', 'PIP_FIND_LINKS', 'PIP_NO_INDEX', 'PIP_REQUIRE_VIRTUALENV'):
+            os.environ.pop(variable, None)
+        os.environ.update({
+            'PROJECT_TOOLBOX_HOME': self.home,
+            'PIP_INDEX_URL': self.index_url,
+            'PIP_CACHE_DIR': self.pip_cache,
+            'PIP_CONFIG_FILE': os.devnull,
+            'PIP_DISABLE_PIP_VERSION_CHECK': '1',
+            'PIP_NO_INPUT': '1',
+        })
+        self.toolbox.TOOLBOX_HOME = self.home
+        try:
+            yield
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            self.toolbox.TOOLBOX_HOME = saved_home
+
+    def _quiet(self):
+        return contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    def _clear_caches(self):
+        for path in (self.home, self.pip_cache):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _project(self, size:str, venv_mode:str):
+        return self.toolbox.Project(os.path.join(self.workdir, 'projects', size), change_dir=False, index_url=self.index_url,
+                                    venv_template_packages=VENV_MODES[venv_mode], tracer=self.toolbox.Tracer(enabled=False))
+
+    def _write_requirements(self, size:str, graph:dict):
+        directory = os.path.join(self.workdir, 'projects', size)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'requirements.txt'), 'w') as f:
+            f.write(''.join(f'{name}=={VERSIONS[0]}\n' for name in sorted(graph)))
+
+    # Preparacion (no medida) y operacion medida de cada benchmark
+
+    def _prepare(self, operation:str, project, mode:str):
+        if operation in ('create_virtual_environment', 'install_requirements'):
+            shutil.rmtree(project.venv_path, ignore_errors=True)
+            if mode == 'cold':
+                self._clear_caches()
+        if operation == 'install_requirements':
+            project.create_virtual_environment()
+        if operation in ('create_requirements_file', 'verify_dependencies', 'update_all_libraries'):
+            if not os.path.exists(project.venv_path):
+                project.create_virtual_environment()
+            project.install_requirements(force=operation == 'update_all_libraries')
+            if mode == 'cold':
+                self._clear_caches()
+
+    def _operation(self, operation:str, project):
+        if operation == 'create_virtual_environment':
+            project.create_virtual_environment()
+        elif operation == 'install_requirements':
+            project.install_requirements()
+        elif operation == 'create_requirements_file':
+            project.create_requirements_file()
+        elif operation == 'verify_dependencies':
+            report = project.verify_dependencies()
+            if not report.ok:
+                raise RuntimeError(f'El ambiente del benchmark no cumple los requisitos: {report}')
+        elif operation == 'update_all_libraries':
+            project.update_all_libraries(update_requirements=False)
+
+    def measure(self, size:str, operation:str, mode:str, venv_mode:str='template') -> list[float]:
+        """
+        Mide una operacion varias veces.
+
+        :param size: Conjunto de dependencias.
+        :param operation: Nombre de la operacion.
+        :param mode: 'cold' o 'warm'.
+        :param venv_mode: Modo de creacion de los ambientes, una clave de VENV_MODES.
+        :return: Lista de tiempos en segundos.
+        """
+        timings = []
+        project = self._project(size, venv_mode)
+        # En caliente se ejecuta una vez sin medir para llenar las caches
+        runs = self.repeat if mode == 'cold' else self.repeat + 1
+        for run in range(runs):
+            if mode == 'cold':
+                project = self._project(size, venv_mode)
+            with self._quiet():
+                self._prepare(operation, project, mode)
+                start = time.perf_counter()
+                self._operation(operation, project)
+                elapsed = time.perf_counter() - start
+            if mode == 'cold' or run > 0:
+                timings.append(elapsed)
+        return timings
+
+    def run(self) -> dict:
+        """
+        Genera el indice y ejecuta todos los benchmarks.
+
+        :return: Diccionario con los metadatos y los resultados, por conjunto, modo de creacion de ambientes, operacion
+            y modo frio o caliente.
+        """
+        with self._environment():
+            return self._run()
+
+    def _run(self) -> dict:
+        start = time.perf_counter()
+        graphs = build_index(self.workdir, self.sizes, self.seed)
+        print(f'Indice local creado en {self.index_url} ({time.perf_counter() - start:.1f} s).')
+
+        results = {}
+        for size in self.sizes:
+            roots, graph = graphs[size]
+            self._write_requirements(size, graph)
+            results[size] = {}
+            for venv_mode in self.venv_modes:
+                results[size][venv_mode] = {}
+                for operation in OPERATIONS:
+                    results[size][venv_mode][operation] = {}
+                    for mode in ('cold', 'warm'):
+                        timings = self.measure(size, operation, mode, venv_mode)
+                        results[size][venv_mode][operation][mode] = {
+                            'runs': timings,
+                            'median': statistics.median(timings),
+                            'min': min(timings),
+                        }
+                        print(f'{size:<7} {venv_mode:<8} {operation:<28} {mode:<5} mediana {statistics.median(timings):8.3f} s')
+
+        return {
+            'metadata': {
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'toolbox_revision': _toolbox_revision(),
+                'repeat': self.repeat,
+                'seed': self.seed,
+                'venv_modes': self.venv_modes,
+                'dependency_sets': {size: {'direct': DEPENDENCY_SETS[size][0], 'total': DEPENDENCY_SETS[size][1]} for size in self.sizes},
+            },
+            'results': results,
+        }
+
+
+# Funcion para obtener el commit de git del toolbox, si esta disponible
+def _toolbox_revision() -> str|None:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Funcion para comparar dos resultados
+def compare(current:dict, baseline:dict):
+    """
+    Muestra la mediana de cada benchmark en ambos resultados y la razon entre ellas.
+
+    :param current: Resultados nuevos.
+    :param baseline: Resultados de referencia.
+    """
+    print(f"\n{'Conjunto':<8} {'Ambiente':<8} {'Operacion':<28} {'Modo':<5} {'Referencia':>11} {'Actual':>9} {'Razon':>7}")
+    for size, venv_modes in current['results'].items():
+        for venv_mode, operations in venv_modes.items():
+            for operation, modes in operations.items():
+                for mode, result in modes.items():
+                    reference = baseline.get('results', {}).get(size, {}).get(venv_mode, {}).get(operation, {}).get(mode)
+                    if reference is None:
+                        continue
+                    ratio = result['median'] / reference['median'] if reference['median'] else float('inf')
+                    print(f"{size:<8} {venv_mode:<8} {operation:<28} {mode:<5} {reference['median']:10.3f}s {result['median']:8.3f}s {ratio:6.2f}x")
+
+
+# Linea de comandos ------------------------------------------------------------------------------------------------------
+
+def main(argv:list[str]=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks sin conexion de Project_toolbox.')
+    parser.add_argument('--sizes', nargs='+', choices=list(DEPENDENCY_SETS), default=list(DEPENDENCY_SETS), help='Conjuntos de dependencias a medir.')
+    parser.add_argument('--venv-modes', nargs='+', choices=list(VENV_MODES), default=list(VENV_MODES), help='Modos de creacion de los ambientes a medir.')
+    parser.add_argument('--repeat', type=int, default=3, help='Numero de mediciones por benchmark.')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de los grafos de dependencias.')
+    parser.add_argument('--workdir', help='Directorio de trabajo. Por defecto uno temporal que se borra al terminar.')
+    parser.add_argument('--output', help='Archivo JSON donde se guardan los resultados.')
+    parser.add_argument('--compare', help='Archivo JSON de resultados anteriores para comparar.')
+    parser.add_argument('--verbose', action='store_true', help='Muestra la salida de las operaciones.')
+    args = parser.parse_args(argv)
+
+    if not sys.platform.startswith('linux'):
+        print('Los benchmarks solo estan soportados en Linux.')
+        return 1
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='toolbox_benchmarks_')
+    try:
+        results = BenchmarkSuite(workdir, args.sizes, repeat=args.repeat, seed=args.seed, verbose=args.verbose,
+                                 venv_modes=args.venv_modes).run()
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Resultados guardados en {args.output}')
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+#------------------------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# Programa que se ejecuta con el interprete del ambiente para compilar los .py en paralelo.
+# Se ejecuta desde un archivo (y no con -c) para que el pool de procesos funcione tambien con el metodo spawn
+
+import os
+import sys
+import json
+import time
+import py_compile
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+
+def is_current(source_path, pyc_path, mode):
+    # Compara la cabecera del .pyc (PEP 552) con el archivo fuente
+    try:
+        with open(pyc_path, 'rb') as f:
+            header = f.read(16)
+    except OSError:
+        return False
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    flags = int.from_bytes(header[4:8], 'little')
+    if mode == 'timestamp':
+        stat = os.stat(source_path)
+        return flags == 0 and header[8:12] == (int(stat.st_mtime) & 0xFFFFFFFF).to_bytes(4, 'little') \
+            and header[12:16] == (stat.st_size & 0xFFFFFFFF).to_bytes(4, 'little')
+    if not flags & 0b01 or bool(flags & 0b10) != (mode == 'checked-hash'):
+        return False
+    with open(source_path, 'rb') as f:
+        return header[8:16] == importlib.util.source_hash(f.read())
+
+
+def compile_file(task):
+    source_path, optimize, mode = task
+    start = time.process_time()
+    try:
+        py_compile.compile(source_path, optimize=optimize, doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode[mode.upper().replace('-', '_')])
+    except Exception as e:
+        return 0.0, f'{type(e).__name__}: {e}'
+    return time.process_time() - start, None
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        options = json.load(f)
+    sources = list(options['files'])
+    for directory in options['dirs']:
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = [name for name in dirs if name != '__pycache__']
+            sources.extend(os.path.join(root, name) for name in names if name.endswith('.py'))
+
+    tasks, current = [], 0
+    for source_path in sources:
+        for optimize in options['optimize']:
+            pyc_path = importlib.util.cache_from_source(source_path, optimization=optimize if optimize else '')
+            if is_current(source_path, pyc_path, options['mode']):
+                current += 1
+            else:
+                tasks.append((source_path, optimize, options['mode']))
+
+    start = time.perf_counter()
+    workers = options['workers'] or os.cpu_count() or 1
+    if len(tasks) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compile_file, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    else:
+        workers = 1
+        results = [compile_file(task) for task in tasks]
+
+    print(json.dumps({
+        'files': len(sources),
+        'current': current,
+        'compiled': sum(1 for _, error in results if error is None),
+        'errors': sum(1 for _, error in results if error is not None),
+        'compile_cpu': sum(cpu for cpu, _ in results),
+        'wall': time.perf_counter() - start,
+        'workers': workers,
+    }))
+
+
+if __name__ == '__main__':
+    main()
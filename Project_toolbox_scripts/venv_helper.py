@@ -0,0 +1,104 @@
+# Programa del proceso auxiliar. Se ejecuta con el interprete del ambiente y responde consultas por stdin/stdout con
+# mensajes marshal (version 4, compatible entre versiones de Python 3) precedidos de 4 bytes con la longitud.
+# Cada consulta es una tupla (operacion, argumento) y cada respuesta una tupla (ok, valor)
+
+import os
+import re
+import sys
+import json
+import site
+import select
+import marshal
+import platform
+import importlib.metadata
+
+IDLE_TIMEOUT = float(sys.argv[1])
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+cache = {}
+
+
+def read_exact(size):
+    data = b''
+    while len(data) < size:
+        chunk = stdin.read1(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def site_key():
+    paths = [path for path in site.getsitepackages() if os.path.isdir(path)]
+    return tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+
+
+def environment(_):
+    # Igual que packaging.markers.default_environment, calculado en el interprete del ambiente
+    info = sys.implementation.version
+    version = f'{info.major}.{info.minor}.{info.micro}'
+    if info.releaselevel != 'final':
+        version += info.releaselevel[0] + str(info.serial)
+    return {
+        'implementation_name': sys.implementation.name,
+        'implementation_version': version,
+        'os_name': os.name,
+        'platform_machine': platform.machine(),
+        'platform_release': platform.release(),
+        'platform_system': platform.system(),
+        'platform_version': platform.version(),
+        'python_full_version': platform.python_version(),
+        'platform_python_implementation': platform.python_implementation(),
+        'python_version': '.'.join(platform.python_version_tuple()[:2]),
+        'sys_platform': sys.platform,
+    }
+
+
+def inventory(known_key):
+    # Si el site-packages no cambio desde la consulta anterior del cliente, solo se confirma la clave
+    key = site_key()
+    if key == known_key:
+        return key, None
+    if cache.get('inventory_key') != key:
+        found = {}
+        for dist in importlib.metadata.distributions(path=[path for path, _ in key]):
+            name = dist.metadata['Name']
+            if not name or re.sub(r'[-_.]+', '-', name).lower() in found:
+                continue
+            found[re.sub(r'[-_.]+', '-', name).lower()] = (name, dist.version, tuple(dist.requires or ()), str(dist.locate_file('')),
+                                   dist.read_text('direct_url.json'))
+        cache['inventory'], cache['inventory_key'] = list(found.values()), key
+    return key, cache['inventory']
+
+
+def metadata(name):
+    dist = importlib.metadata.distribution(name)
+    fields = {}
+    for field, value in dist.metadata.items():
+        fields.setdefault(field, []).append(value)
+    return {'fields': fields, 'location': str(dist.locate_file('')), 'files': len(dist.files or ())}
+
+
+OPERATIONS = {
+    'ping': lambda _: os.getpid(),
+    'environment': environment,
+    'sys_path': lambda _: sys.path,
+    'inventory': inventory,
+    'metadata': metadata,
+}
+
+
+while True:
+    # Sin consultas durante IDLE_TIMEOUT segundos el proceso termina; el cliente lo vuelve a iniciar si hace falta
+    if not select.select([stdin], [], [], IDLE_TIMEOUT)[0]:
+        break
+    try:
+        operation, argument = marshal.loads(read_exact(int.from_bytes(read_exact(4), 'little')))
+    except EOFError:
+        break
+    try:
+        reply = (True, OPERATIONS[operation](argument))
+    except Exception as e:
+        reply = (False, f'{type(e).__name__}: {e}')
+    data = marshal.dumps(reply, 4)
+    stdout.write(len(data).to_bytes(4, 'little') + data)
+    stdout.flush()
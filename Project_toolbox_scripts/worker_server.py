@@ -0,0 +1,272 @@
+# Servidor del proceso de trabajo: importa los modulos pesados una vez y ejecuta cada trabajo en un fork de si mismo.
+# Los mensajes son marshal con un prefijo de 4 bytes con la longitud (el servidor y el cliente usan el mismo interprete)
+
+import os
+import sys
+import time
+import json
+import marshal
+import signal
+import socket
+import selectors
+import types
+import importlib
+import traceback
+
+# Intervalo de revision de la memoria de los trabajos, y del socket y la inactividad cuando no hay trabajos
+POLL_INTERVAL = 0.1
+IDLE_INTERVAL = 1.0
+
+
+def send(connection, message):
+    data = marshal.dumps(message)
+    connection.sendall(len(data).to_bytes(4, 'little') + data)
+
+
+def receive(connection, max_fds=0):
+    # Lee un mensaje y los descriptores de archivo que lo acompañen (SCM_RIGHTS)
+    fds, chunks, size = [], b'', None
+    while size is None or len(chunks) < size + 4:
+        data, ancillary, _, _ = connection.recvmsg(65536, socket.CMSG_SPACE(max_fds * 4) if max_fds else 0)
+        for level, kind, payload in ancillary:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.extend(int.from_bytes(payload[i:i + 4], sys.byteorder) for i in range(0, len(payload) - len(payload) % 4, 4))
+        if not data:
+            raise EOFError
+        chunks += data
+        if size is None and len(chunks) >= 4:
+            size = int.from_bytes(chunks[:4], 'little')
+    return marshal.loads(chunks[4:size + 4]), fds
+
+
+def fingerprint(paths):
+    # Fecha de modificacion de los directorios y archivos que invalidan los modulos precargados
+    result = {}
+    for path in paths:
+        try:
+            result[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            result[path] = None
+    return result
+
+
+def rss_kb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def run_job(request, fds):
+    # Proceso hijo: toma la terminal, el directorio, las variables de entorno y los argumentos del cliente
+    for target, fd in enumerate(fds[:3]):
+        os.dup2(fd, target)
+    for fd in fds:
+        os.close(fd)
+    sys.stdin = sys.__stdin__ = open(0, 'r', closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, 'w', buffering=1, closefd=False)
+    os.environ.clear()
+    os.environb.update(request['env'])
+    os.chdir(request['cwd'])
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if 'random' in sys.modules:
+        sys.modules['random'].seed()
+
+    path = request['argv'][0]
+    sys.argv = list(request['argv'])
+    sys.path[0] = os.path.dirname(os.path.abspath(path))
+    code = 0
+    try:
+        with open(path, 'rb') as f:
+            program = compile(f.read(), path, 'exec')
+        # Modulo __main__ nuevo: el del servidor conserva sus globales para terminar el trabajo
+        main_module = types.ModuleType('__main__')
+        main_module.__file__ = path
+        sys.modules['__main__'] = main_module
+        exec(program, main_module.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        import atexit
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code & 0xFF)
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        options = json.load(f)
+    sys.path.insert(0, options['directory'])
+    os.chdir(options['directory'])
+
+    start = time.perf_counter()
+    preloaded, failed = [], {}
+    for name in options['preload']:
+        try:
+            importlib.import_module(name)
+            preloaded.append(name)
+        except BaseException as e:
+            failed[name] = f'{type(e).__name__}: {e}'
+    preload_time = time.perf_counter() - start
+    initial = fingerprint(options['watch'])
+
+    if os.path.exists(options['socket']):
+        os.unlink(options['socket'])
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(options['socket'])
+    os.chmod(options['socket'], 0o600)
+    server.listen(64)
+    server.setblocking(False)
+    socket_inode = os.stat(options['socket']).st_ino
+    if os.path.exists(options['starting']):
+        os.unlink(options['starting'])
+
+    # SIGCHLD despierta el select para responder en cuanto termina un trabajo
+    wakeup_read, wakeup_write = socket.socketpair()
+    wakeup_read.setblocking(False)
+    wakeup_write.setblocking(False)
+    signal.set_wakeup_fd(wakeup_write.fileno())
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    selector.register(wakeup_read, selectors.EVENT_READ)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append('SIGTERM'))
+    print(f'Proceso de trabajo {os.getpid()} listo: {len(preloaded)} modulos en {preload_time:.2f} s', flush=True)
+
+    jobs, total, last_activity = {}, 0, time.monotonic()
+    restart_reason = None
+    while True:
+        # Trabajos terminados y limite de memoria de cada trabajo
+        for pid, (connection, started) in list(jobs.items()):
+            try:
+                finished, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished, status = pid, 0
+            if finished:
+                try:
+                    send(connection, {'exit': os.waitstatus_to_exitcode(status), 'wall': time.monotonic() - started})
+                except OSError:
+                    pass
+                connection.close()
+                del jobs[pid]
+                last_activity = time.monotonic()
+            elif options['job_memory_kb'] and (rss_kb(pid) or 0) > options['job_memory_kb']:
+                os.kill(pid, signal.SIGKILL)
+                try:
+                    send(connection, {'error': f"El trabajo superó el límite de memoria de {options['job_memory_kb'] // 1024} MB."})
+                except OSError:
+                    pass
+
+        if not stopping and not jobs and options['idle_timeout'] and time.monotonic() - last_activity > options['idle_timeout']:
+            stopping.append('inactividad')
+        # Si otro servidor reemplazo el socket, este deja de recibir trabajos
+        try:
+            replaced = os.stat(options['socket']).st_ino != socket_inode
+        except OSError:
+            replaced = True
+        if replaced and not stopping:
+            stopping.append('socket reemplazado')
+        if stopping and not jobs:
+            break
+
+        ready = [key.fileobj for key, _ in selector.select(POLL_INTERVAL if jobs else IDLE_INTERVAL)]
+        if wakeup_read in ready:
+            try:
+                while wakeup_read.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+        if server not in ready:
+            continue
+        try:
+            connection, _ = server.accept()
+        except BlockingIOError:
+            continue
+        connection.setblocking(True)
+        try:
+            request, fds = receive(connection, max_fds=3)
+        except (OSError, EOFError, ValueError):
+            connection.close()
+            continue
+
+        kind = request.get('type')
+        if kind == 'status':
+            send(connection, {'pid': os.getpid(), 'uptime': time.perf_counter() - start,
+                              'rss_kb': rss_kb(), 'preloaded': preloaded, 'failed': failed, 'preload_time': preload_time,
+                              'jobs_running': len(jobs), 'jobs_total': total, 'stale': fingerprint(options['watch']) != initial})
+            connection.close()
+            continue
+        if kind == 'stop':
+            stopping.append('stop')
+            send(connection, {'stopping': True, 'jobs_running': len(jobs)})
+            connection.close()
+            continue
+        if kind != 'run' or len(fds) < 3 or stopping:
+            for fd in fds:
+                os.close(fd)
+            send(connection, {'restart': 'stopping' if stopping else 'bad request'})
+            connection.close()
+            continue
+
+        # Si el ambiente, el archivo requirements o la memoria del servidor cambiaron, el cliente ejecuta el trabajo
+        # de forma normal y arranca un servidor nuevo
+        if fingerprint(options['watch']) != initial:
+            restart_reason = 'el ambiente o el archivo requirements cambió'
+        elif options['max_memory_kb'] and (rss_kb() or 0) > options['max_memory_kb']:
+            restart_reason = 'el servidor superó el límite de memoria'
+        if restart_reason:
+            for fd in fds:
+                os.close(fd)
+            send(connection, {'restart': restart_reason})
+            connection.close()
+            stopping.append(restart_reason)
+            continue
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            selector.close()
+            wakeup_read.close()
+            wakeup_write.close()
+            server.close()
+            connection.close()
+            for other, _ in jobs.values():
+                other.close()
+            run_job(request, fds)
+        for fd in fds:
+            os.close(fd)
+        send(connection, {'pid': pid})
+        jobs[pid] = (connection, time.monotonic())
+        total += 1
+        last_activity = time.monotonic()
+
+    server.close()
+    try:
+        if os.stat(options['socket']).st_ino == socket_inode:
+            os.unlink(options['socket'])
+    except OSError:
+        pass
+    print(f'Proceso de trabajo {os.getpid()} detenido ({stopping[0] if stopping else "fin"}) después de {total} trabajos.', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,809 @@
+"""
+Almacenes de ambientes virtuales de Project_toolbox: plantillas (VenvTemplateStore), instantaneas (VenvSnapshotStore)
+y deduplicacion de archivos entre ambientes (VenvDedupStore).
+
+Los tres trabajan sobre el arbol de archivos del ambiente con reflinks y enlaces duros, sin depender de Project.
+Project_toolbox importa y reexporta todos sus nombres publicos.
+"""
+# Librerias necesarias ---------------------------------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import contextlib
+import subprocess
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+# fcntl solo existe en sistemas tipo Unix, en Windows no se usan reflinks
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Funcion para obtener el directorio por defecto de un almacen dentro del directorio de trabajo del toolbox
+def _default_root(name:str) -> str:
+    # Igual que Project_toolbox.TOOLBOX_HOME; Project pasa siempre la ruta explicita
+    home = os.environ.get('PROJECT_TOOLBOX_HOME', os.path.join(os.path.expanduser('~'), '.project_toolbox'))
+    return os.path.join(home, name)
+
+
+# Funcion para ejecutar un comando cuando no se indica otro ejecutor
+def _run_command(command:list[str]):
+    subprocess.run(command, check=True)
+
+
+# Funcion para obtener el interprete de un ambiente virtual
+def _venv_python(venv_path:str) -> str:
+    if os.name == 'nt':
+        return os.path.join(venv_path, 'Scripts', 'python.exe')
+    return os.path.join(venv_path, 'bin', 'python')
+
+
+# Plantillas de ambientes virtuales --------------------------------------------------------------------------------------
+
+# Codigo de ioctl para clonar un archivo en Linux (reflink en btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+class _FileCopier:
+    """
+    Copia archivos con el metodo mas barato disponible: reflink, enlace duro o copia normal.
+    Si un metodo falla (por ejemplo el sistema de archivos no lo soporta) se descarta para los siguientes archivos.
+    """
+
+    MODES = ('reflink', 'hardlink', 'copy')
+
+    def __init__(self, link_mode:str='auto'):
+        if link_mode == 'auto':
+            self.modes = list(self.MODES) if fcntl is not None and sys.platform.startswith('linux') else ['hardlink', 'copy']
+        elif link_mode in self.MODES:
+            self.modes = [link_mode]
+        else:
+            raise ValueError(f"El parámetro 'link_mode' debe ser 'auto' o uno de {self.MODES}.")
+
+    def copy(self, source:str, target:str):
+        while True:
+            mode = self.modes[0]
+            try:
+                if mode == 'reflink':
+                    with open(source, 'rb') as source_file, open(target, 'wb') as target_file:
+                        fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+                    shutil.copystat(source, target)
+                elif mode == 'hardlink':
+                    os.link(source, target)
+                else:
+                    shutil.copy2(source, target)
+                return
+            except OSError:
+                if mode == 'copy' or len(self.modes) == 1:
+                    raise
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(target)
+                self.modes.pop(0)
+
+
+# Funcion para reescribir el shebang de un script cuando la ruta del interprete es demasiado larga
+def _fix_long_shebang(content:bytes) -> bytes:
+    first_line, _, rest = content.partition(b'\n')
+    # Linux limita el shebang a 127 caracteres, pip usa este mismo formato en ese caso
+    if os.name == 'nt' or len(first_line) <= 127 or b' ' in first_line.strip():
+        return content
+    interpreter = first_line[2:].strip()
+    return b"#!/bin/sh\n'''exec' \"" + interpreter + b"\" \"$0\" \"$@\"\n' '''\n" + rest
+
+
+# Funcion para clonar el directorio de un ambiente virtual reemplazando sus rutas internas
+def _clone_tree(source:str, target:str, link_mode:str='auto', rewrite:bool=True, final_path:str=None, copy_filter=None) -> int:
+    """
+    Clona el directorio de un ambiente virtual. Los archivos se enlazan (reflink o enlace duro) salvo los
+    scripts y pyvenv.cfg, que contienen la ruta absoluta del ambiente y se reescriben con la nueva ruta.
+
+    :param source: Directorio de origen.
+    :param target: Directorio de destino, no debe existir.
+    :param link_mode: 'auto', 'reflink', 'hardlink' o 'copy'.
+    :param rewrite: Indicador booleano, por defecto es igual a True con lo cual reemplaza la ruta de origen por la de destino.
+    :param final_path: Ruta donde quedara el clon si se va a mover despues, por defecto la ruta de destino.
+    :param copy_filter: Funcion que recibe la ruta relativa de un archivo y devuelve True si se debe copiar en lugar de
+        enlazarse, por ejemplo _is_in_place_file.
+    :return: Numero de archivos clonados.
+    """
+    source = os.path.abspath(source)
+    target = os.path.abspath(target)
+    final_path = os.path.abspath(final_path or target)
+    replacements = []
+    if rewrite:
+        for old_path in {source, os.path.realpath(source)}:
+            replacements.append((old_path.encode(), final_path.encode()))
+        replacements.append((f'({os.path.basename(source)}) '.encode(), f'({os.path.basename(final_path)}) '.encode()))
+
+    scripts_dir = os.path.join(source, 'Scripts' if os.name == 'nt' else 'bin')
+    copier = _FileCopier(link_mode)
+    count = 0
+
+    for root, dirs, files in os.walk(source):
+        target_root = os.path.normpath(os.path.join(target, os.path.relpath(root, source)))
+        os.makedirs(target_root, exist_ok=True)
+
+        for name in list(dirs) + files:
+            source_path = os.path.join(root, name)
+            target_path = os.path.join(target_root, name)
+
+            if os.path.islink(source_path):
+                link = os.readlink(source_path)
+                for old, new in replacements[:-1]:
+                    link = link.replace(old.decode(), new.decode())
+                os.symlink(link, target_path)
+                if name in dirs:
+                    # No se recorre el contenido de los enlaces a directorios (lib64 -> lib)
+                    dirs.remove(name)
+                continue
+            if name in dirs:
+                continue
+
+            if replacements and (root == scripts_dir or (root == source and name == 'pyvenv.cfg')):
+                with open(source_path, 'rb') as f:
+                    content = f.read()
+                new_content = content
+                for old, new in replacements:
+                    new_content = new_content.replace(old, new)
+                if new_content != content:
+                    if new_content.startswith(b'#!'):
+                        new_content = _fix_long_shebang(new_content)
+                    # Los archivos reescritos son propios del clon, nunca se enlazan
+                    with open(target_path, 'wb') as f:
+                        f.write(new_content)
+                    shutil.copymode(source_path, target_path)
+                    count += 1
+                    continue
+
+            if copy_filter is not None and copy_filter(os.path.relpath(source_path, source)):
+                shutil.copy2(source_path, target_path)
+            else:
+                copier.copy(source_path, target_path)
+            count += 1
+
+    return count
+
+
+class VenvTemplateStore:
+    """
+    Almacen de ambientes virtuales base, identificados por el interprete y el conjunto de librerias base.
+    Los nuevos ambientes se crean clonando la plantilla con reflinks o enlaces duros y corrigiendo las rutas
+    de los scripts y de pyvenv.cfg, con lo cual no se ejecuta python -m venv (ensurepip) ni se reinstalan las librerias base.
+    """
+
+    def __init__(self, root:str=None, link_mode:str='auto', run_command=None):
+        """
+        :param root: Directorio del almacen. Por defecto dentro de PROJECT_TOOLBOX_HOME (~/.project_toolbox).
+        :param link_mode: Metodo de clonacion: 'auto', 'reflink', 'hardlink' o 'copy'.
+        :param run_command: Funcion que ejecuta los comandos de venv y pip, por defecto con subprocess.
+            Project usa la de Project_toolbox, que pasa por el ejecutor activo.
+        """
+        self.root = root or _default_root('venv_templates')
+        self.link_mode = link_mode
+        self.run_command = run_command or _run_command
+
+    @staticmethod
+    def template_key(python_executable:str, base_packages:list[str]=None) -> str:
+        """
+        Calcula la llave de la plantilla a partir del interprete y de las librerias base.
+
+        :param python_executable: Ruta del interprete de Python base.
+        :param base_packages: Lista de librerias base (especificaciones de pip).
+        :return: Llave hexadecimal de la plantilla.
+        """
+        interpreter = os.path.realpath(python_executable)
+        stat = os.stat(interpreter)
+        identity = {
+            'interpreter': interpreter,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'packages': sorted(package.strip().lower() for package in base_packages or []),
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:20]
+
+    def template_path(self, python_executable:str, base_packages:list[str]=None) -> str:
+        return os.path.join(self.root, self.template_key(python_executable, base_packages), 'venv')
+
+    def get_or_create(self, python_executable:str, base_packages:list[str]=None, wheelhouse=None) -> str:
+        """
+        Devuelve la ruta de la plantilla, creandola si aun no existe.
+
+        :param python_executable: Ruta del interprete de Python base.
+        :param base_packages: Lista de librerias base a instalar en la plantilla.
+        :param wheelhouse: Almacen local de wheels (Wheelhouse) desde donde se instalan las librerias base.
+        :return: Ruta de la plantilla.
+        """
+        path = self.template_path(python_executable, base_packages)
+        if os.path.exists(os.path.join(path, 'pyvenv.cfg')):
+            return path
+
+        print(f"Creando la plantilla de ambiente virtual en {path}...")
+        key_dir = os.path.dirname(path)
+        os.makedirs(key_dir, exist_ok=True)
+
+        # Se construye en un directorio temporal y se mueve al final, para que otro proceso nunca vea una plantilla incompleta
+        build_dir = tempfile.mkdtemp(prefix='build-', dir=key_dir)
+        build_path = os.path.join(build_dir, 'venv')
+        staged_path = os.path.join(build_dir, 'staged')
+        try:
+            self.run_command([python_executable, '-m', 'venv', build_path])
+            if base_packages:
+                build_python = _venv_python(build_path)
+                install_command = [build_python, '-m', 'pip', 'install']
+                try:
+                    if wheelhouse is None:
+                        raise subprocess.CalledProcessError(1, install_command)
+                    wheelhouse.prefetch(build_python, requirements=list(base_packages))
+                    self.run_command(install_command + wheelhouse.install_args() + list(base_packages))
+                except subprocess.CalledProcessError:
+                    self.run_command(install_command + list(base_packages))
+
+            # Los scripts apuntan a la ruta de construccion, se reescriben con la ruta definitiva
+            _clone_tree(build_path, staged_path, link_mode='auto', final_path=path)
+
+            with open(os.path.join(staged_path, 'template.json'), 'w') as f:
+                json.dump({'python_executable': os.path.realpath(python_executable), 'base_packages': list(base_packages or []), 'created_at': time.time()}, f)
+            try:
+                os.rename(staged_path, path)
+            except OSError:
+                # Otro proceso termino primero
+                pass
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+        return path
+
+    def clone(self, template_path:str, target_path:str) -> str:
+        """
+        Crea un nuevo ambiente virtual clonando la plantilla.
+
+        :param template_path: Ruta de la plantilla.
+        :param target_path: Ruta del nuevo ambiente virtual, no debe existir.
+        :return: Ruta del nuevo ambiente virtual.
+        """
+        if os.path.exists(target_path):
+            raise FileExistsError(f'El directorio {target_path} ya existe.')
+
+        _clone_tree(template_path, target_path, link_mode=self.link_mode)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(target_path, 'template.json'))
+        return target_path
+
+    def remove(self, python_executable:str, base_packages:list[str]=None):
+        """
+        Elimina la plantilla, por ejemplo para forzar su reconstruccion.
+        """
+        shutil.rmtree(os.path.dirname(self.template_path(python_executable, base_packages)), ignore_errors=True)
+
+
+# Instantaneas de ambientes virtuales ------------------------------------------------------------------------------------
+
+# Nombre del archivo, dentro de cada instantanea, con su descripcion
+SNAPSHOT_INFO_NAME = 'snapshot.json'
+
+# Flag de renameat2 para intercambiar dos rutas de forma atomica (Linux)
+RENAME_EXCHANGE = 2
+
+
+class VenvSnapshot(NamedTuple):
+    """
+    Instantanea de un ambiente virtual.
+    """
+    id: str
+    path: str
+    created_at: float
+    label: str
+    packages: tuple = ()
+    files: int = 0
+
+
+# Funcion para intercambiar dos directorios
+def _exchange_paths(first:str, second:str):
+    """
+    Intercambia dos rutas del mismo sistema de archivos. En Linux se usa renameat2(RENAME_EXCHANGE), con lo cual
+    ninguna de las dos rutas deja de existir en ningun momento; en otros sistemas se hacen tres renombres.
+    """
+    if sys.platform.startswith('linux'):
+        # ctypes solo se importa aqui porque solo se usa al restaurar una instantanea
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = getattr(libc, 'renameat2', None)
+        if renameat2 is not None:
+            at_fdcwd = -100
+            if renameat2(at_fdcwd, os.fsencode(first), at_fdcwd, os.fsencode(second), RENAME_EXCHANGE) == 0:
+                return
+    temp_path = f'{second}.swap-{os.getpid()}'
+    os.rename(second, temp_path)
+    os.rename(first, second)
+    os.rename(temp_path, first)
+
+
+# Nombres de los archivos de los .dist-info que algunas herramientas modifican en el lugar (por ejemplo RECORD al
+# agregar los .pyc compilados despues de instalar)
+_IN_PLACE_DIST_INFO_FILES = ('RECORD', 'INSTALLER', 'REQUESTED', 'direct_url.json')
+
+
+# Funcion para saber si un archivo de un ambiente se puede modificar en el lugar y por eso nunca se enlaza
+def _is_in_place_file(relative_path:str) -> bool:
+    """
+    :param relative_path: Ruta del archivo relativa a la raiz del ambiente virtual.
+    :return: True para los archivos de la raiz del ambiente (pyvenv.cfg, marca de instalacion), los .pth y los
+        archivos de registro de los .dist-info (RECORD, INSTALLER, ...).
+    """
+    parent, name = os.path.split(relative_path)
+    return (not parent or name.endswith('.pth')
+            or (parent.endswith('.dist-info') and name in _IN_PLACE_DIST_INFO_FILES))
+
+
+class VenvSnapshotStore:
+    """
+    Instantaneas de un ambiente virtual para volver atras despues de una actualizacion fallida. Cada instantanea es un
+    clon del ambiente con reflinks o enlaces duros (ver _clone_tree), por lo que se crea en segundos y casi no ocupa
+    espacio. Las instantaneas se guardan junto al ambiente, en el mismo sistema de archivos, para poder enlazar los
+    archivos y restaurarlas con un intercambio atomico de directorios.
+
+    Requisito: con enlaces duros el ambiente y sus instantaneas comparten los inodos, por lo que ningun proceso debe
+    escribir en el lugar (abrir para escritura sin borrar antes) los archivos instalados del ambiente; una escritura
+    asi cambiaria tambien todas las instantaneas. pip cumple el requisito porque nunca modifica un archivo instalado:
+    lo borra y escribe uno nuevo, con lo cual la instantanea conserva la version anterior. Los archivos que pip y otras
+    herramientas si modifican en el lugar (pyvenv.cfg, la marca de instalacion, los .pth y los RECORD, INSTALLER, ...
+    de los .dist-info, ver _is_in_place_file) se copian en lugar de enlazarse. Si otras herramientas o scripts
+    modifican archivos del ambiente en el lugar (por ejemplo parches aplicados con un editor), se debe usar
+    link_mode='copy' o 'reflink', que no comparten los datos al escribir.
+    """
+
+    def __init__(self, venv_path:str, root:str=None, link_mode:str='auto'):
+        """
+        :param venv_path: Ruta del ambiente virtual.
+        :param root: Directorio de las instantaneas. Por defecto .<nombre del ambiente>_snapshots junto al ambiente.
+        :param link_mode: 'auto', 'reflink', 'hardlink' o 'copy'.
+        """
+        self.venv_path = venv_path
+        self._root = root
+        self.link_mode = link_mode
+
+    @property
+    def root(self) -> str:
+        if self._root:
+            return os.path.abspath(self._root)
+        venv_path = os.path.abspath(self.venv_path)
+        return os.path.join(os.path.dirname(venv_path), f'.{os.path.basename(venv_path)}_snapshots')
+
+    def create(self, label:str=None, packages:list[str]=None) -> VenvSnapshot:
+        """
+        Crea una instantanea del ambiente virtual.
+
+        :param label: Descripcion de la instantanea, por ejemplo la operacion que se va a hacer.
+        :param packages: Lineas de pip freeze del ambiente, para mostrarlas al listar las instantaneas.
+        :return: Objeto VenvSnapshot.
+        """
+        venv_path = os.path.abspath(self.venv_path)
+        if not os.path.isdir(venv_path):
+            raise FileNotFoundError(f'Ambiente virtual no encontrado en {venv_path}.')
+        os.makedirs(self.root, exist_ok=True)
+
+        created_at = time.time()
+        base_id = time.strftime('%Y%m%d-%H%M%S', time.localtime(created_at))
+        if label:
+            base_id += '-' + re.sub(r'[^A-Za-z0-9_.-]+', '-', label).strip('-')[:40]
+        snapshot_id, counter = base_id, 1
+        while os.path.exists(os.path.join(self.root, snapshot_id)):
+            counter += 1
+            snapshot_id = f'{base_id}-{counter}'
+
+        # Se construye en un directorio temporal y se renombra al final, para no dejar instantaneas incompletas
+        path = os.path.join(self.root, snapshot_id)
+        staged_path = f'{path}.tmp'
+        try:
+            # Los archivos que se modifican en el lugar se copian antes de enlazar los demas, nunca se comparten
+            files = _clone_tree(venv_path, staged_path, link_mode=self.link_mode, rewrite=False, copy_filter=_is_in_place_file)
+            snapshot = VenvSnapshot(snapshot_id, path, created_at, label or '', tuple(packages or ()), files)
+            with open(os.path.join(staged_path, SNAPSHOT_INFO_NAME), 'w') as f:
+                json.dump(snapshot._asdict(), f, indent=2)
+            os.rename(staged_path, path)
+        except BaseException:
+            shutil.rmtree(staged_path, ignore_errors=True)
+            raise
+        return snapshot
+
+    def snapshots(self) -> list[VenvSnapshot]:
+        """
+        :return: Lista de instantaneas, de la mas reciente a la mas antigua.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        snapshots = []
+        for name in os.listdir(self.root):
+            try:
+                with open(os.path.join(self.root, name, SNAPSHOT_INFO_NAME)) as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append(VenvSnapshot(**{**info, 'id': name, 'path': os.path.join(self.root, name), 'packages': tuple(info.get('packages', ()))}))
+        return sorted(snapshots, key=lambda snapshot: snapshot.created_at, reverse=True)
+
+    def get(self, snapshot_id:str=None) -> VenvSnapshot:
+        """
+        :param snapshot_id: Identificador de la instantanea. Por defecto la mas reciente.
+        :return: Objeto VenvSnapshot.
+        """
+        snapshots = self.snapshots()
+        for snapshot in snapshots:
+            if snapshot_id is None or snapshot.id == snapshot_id:
+                return snapshot
+        raise FileNotFoundError(f"No se encontró la instantánea {snapshot_id}." if snapshot_id else "No hay instantáneas del ambiente.")
+
+    def restore(self, snapshot_id:str=None, keep_current:bool=True, current_packages:list[str]=None) -> VenvSnapshot:
+        """
+        Restaura una instantanea: la clona (con enlaces, en segundos) junto al ambiente e intercambia los dos
+        directorios de forma atomica. La instantanea se conserva y puede volver a usarse.
+
+        :param snapshot_id: Identificador de la instantanea. Por defecto la mas reciente.
+        :param keep_current: Indicador booleano, si es True el ambiente reemplazado se guarda como una instantanea nueva.
+        :param current_packages: Lineas de pip freeze del ambiente reemplazado, para la instantanea que se guarda con keep_current.
+        :return: Instantanea restaurada.
+        """
+        snapshot = self.get(snapshot_id)
+        venv_path = os.path.abspath(self.venv_path)
+        staged_path = os.path.join(os.path.dirname(venv_path), f'.{os.path.basename(venv_path)}.restore-{os.getpid()}')
+        shutil.rmtree(staged_path, ignore_errors=True)
+        try:
+            _clone_tree(snapshot.path, staged_path, link_mode=self.link_mode, rewrite=False, copy_filter=_is_in_place_file)
+            os.remove(os.path.join(staged_path, SNAPSHOT_INFO_NAME))
+            if os.path.isdir(venv_path):
+                _exchange_paths(staged_path, venv_path)
+            else:
+                os.rename(staged_path, venv_path)
+        except BaseException:
+            shutil.rmtree(staged_path, ignore_errors=True)
+            raise
+
+        # El ambiente reemplazado queda en staged_path
+        if os.path.isdir(staged_path):
+            replaced_id = time.strftime('%Y%m%d-%H%M%S') + '-antes-de-restaurar'
+            replaced_path = os.path.join(self.root, replaced_id)
+            if keep_current and not os.path.exists(replaced_path):
+                replaced = VenvSnapshot(replaced_id, replaced_path, time.time(), f'antes de restaurar {snapshot.id}', tuple(current_packages or ()))
+                with open(os.path.join(staged_path, SNAPSHOT_INFO_NAME), 'w') as f:
+                    json.dump(replaced._asdict(), f, indent=2)
+                os.rename(staged_path, replaced_path)
+            else:
+                shutil.rmtree(staged_path, ignore_errors=True)
+        return snapshot
+
+    def remove(self, snapshot_id:str):
+        """
+        Elimina una instantanea.
+
+        :param snapshot_id: Identificador de la instantanea.
+        """
+        shutil.rmtree(os.path.join(self.root, snapshot_id))
+
+    def prune(self, keep:int=None, max_age_days:float=None) -> list[VenvSnapshot]:
+        """
+        Aplica la politica de retencion: conserva las keep instantaneas mas recientes y elimina las demas, y elimina
+        tambien las que tienen mas de max_age_days dias.
+
+        :param keep: Numero de instantaneas a conservar. Por defecto todas.
+        :param max_age_days: Antiguedad maxima en dias. Por defecto sin limite.
+        :return: Lista de instantaneas eliminadas.
+        """
+        removed = []
+        for position, snapshot in enumerate(self.snapshots()):
+            too_many = keep is not None and position >= keep
+            too_old = max_age_days is not None and time.time() - snapshot.created_at > max_age_days * 86400
+            if too_many or too_old:
+                self.remove(snapshot.id)
+                removed.append(snapshot)
+        return removed
+
+
+# Deduplicacion de archivos entre ambientes ------------------------------------------------------------------------------
+
+class DedupReport(NamedTuple):
+    """
+    Resultado de una pasada de deduplicacion.
+    """
+    venvs: int
+    files: int
+    hashed: int
+    linked: int
+    already_shared: int
+    bytes_reclaimed: int
+    store_objects: int
+    store_bytes: int
+    skipped: tuple = ()
+    elapsed: float = 0.0
+
+
+# Funcion para calcular el hash de un archivo (hashlib libera el GIL, por lo que se puede usar con hilos)
+def _file_digest(path:str) -> str|None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class VenvDedupStore:
+    """
+    Almacen direccionado por contenido para compartir los archivos identicos de varios ambientes virtuales.
+    Cada archivo duplicado se reemplaza por un enlace duro a un objeto del almacen, con lo cual ocupa espacio en disco
+    y en la cache de paginas una sola vez.
+
+    La separacion al actualizar es como la copia al escribir: pip nunca modifica un archivo instalado, lo borra y
+    escribe uno nuevo, por lo que al actualizar un ambiente este deja de compartir los archivos reemplazados sin afectar
+    a los demas. Los objetos del almacen son copias propias de solo lectura (y por lo tanto tambien los enlaces que las
+    reemplazan) para que una escritura en el lugar falle en lugar de modificar todos los ambientes; los inodos originales,
+    que pueden estar enlazados en plantillas o instantaneas, no se modifican. Los archivos que se modifican en el lugar (pyvenv.cfg,
+    .pth, la marca de instalacion) no se comparten. Los archivos solo se agrupan si tienen el mismo contenido y permisos.
+    Como los enlaces comparten la fecha de modificacion, los .pyc en modo timestamp de los archivos enlazados se
+    recompilan una vez; con precompile_bytecode(invalidation_mode='checked-hash') esto no ocurre.
+    El almacen debe estar en el mismo sistema de archivos que los ambientes.
+
+    Relacion con las instantaneas (VenvSnapshotStore): una instantanea enlaza los mismos inodos que el ambiente, por lo
+    que al deduplicar el ambiente el inodo anterior sigue vivo en la instantanea y su espacio no se recupera hasta
+    eliminarla; bytes_reclaimed solo cuenta los inodos que dejaron de existir. Una instantanea creada despues de
+    deduplicar enlaza los objetos del almacen, que son de solo lectura, y al restaurarla el ambiente vuelve a
+    compartirlos. collect_garbage elimina del almacen los objetos que ya no usa ningun ambiente registrado aunque una
+    instantanea los siga enlazando; la instantanea conserva el contenido y su espacio se libera al eliminarla.
+    """
+
+    def __init__(self, root:str=None, max_workers:int=None, min_size:int=1):
+        """
+        :param root: Directorio del almacen. Por defecto dentro de PROJECT_TOOLBOX_HOME (~/.project_toolbox).
+        :param max_workers: Numero maximo de hilos para calcular los hashes. Por defecto el doble de CPUs (lectura de disco).
+        :param min_size: Tamaño minimo en bytes de los archivos que se comparten.
+        """
+        self.root = os.path.abspath(root or _default_root('dedup'))
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.venvs_path = os.path.join(self.root, 'venvs.json')
+        self.max_workers = max_workers or 2 * (os.cpu_count() or 1)
+        self.min_size = min_size
+
+    def _object_path(self, digest:str, mode:int) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f'{digest[2:]}-{mode:o}')
+
+    def _objects(self) -> dict:
+        # {(dispositivo, inodo): (ruta, tamaño, enlaces)} de los objetos del almacen
+        objects = {}
+        for root, _, names in os.walk(self.objects_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.lstat(path)
+                objects[(stat.st_dev, stat.st_ino)] = (path, stat.st_size, stat.st_nlink)
+        return objects
+
+    @staticmethod
+    def _inode_usage(paths:list[str]) -> dict:
+        # {(dispositivo, inodo): (tamaño, enlaces, enlaces encontrados)} de los archivos regulares de los directorios
+        usage = {}
+        for path in paths:
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [name for name in dirs if not os.path.islink(os.path.join(root, name))]
+                for name in names:
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = os.lstat(os.path.join(root, name))
+                        if (stat.st_mode & 0o170000) == 0o100000:
+                            inode = (stat.st_dev, stat.st_ino)
+                            seen = usage[inode][2] if inode in usage else 0
+                            usage[inode] = (stat.st_size, stat.st_nlink, seen + 1)
+        return usage
+
+    def registered_venvs(self) -> list[str]:
+        """
+        :return: Rutas de los ambientes que se deduplicaron con este almacen y todavia existen.
+        """
+        try:
+            with open(self.venvs_path) as f:
+                venv_paths = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return [path for path in venv_paths if os.path.isdir(path)]
+
+    def _register_venvs(self, venv_paths:list[str]):
+        venv_paths = sorted(set(self.registered_venvs()) | set(venv_paths))
+        temp_path = f'{self.venvs_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(venv_paths, f, indent=2)
+        os.replace(temp_path, self.venvs_path)
+
+    def _venv_files(self, venv_path:str, objects:dict) -> tuple[list, int]:
+        # Archivos regulares del ambiente que se pueden compartir, sin los que se modifican en el lugar
+        files, shared = [], 0
+        for root, dirs, names in os.walk(venv_path):
+            dirs[:] = [name for name in dirs if not os.path.islink(os.path.join(root, name))]
+            for name in names:
+                path = os.path.join(root, name)
+                if _is_in_place_file(os.path.relpath(path, venv_path)):
+                    continue
+                stat = os.lstat(path)
+                if (stat.st_mode & 0o170000) != 0o100000 or stat.st_size < self.min_size:
+                    continue
+                if (stat.st_dev, stat.st_ino) in objects:
+                    shared += 1
+                    continue
+                files.append((path, stat))
+        return files, shared
+
+    def deduplicate(self, venv_paths:list[str], dry_run:bool=False) -> DedupReport:
+        """
+        Busca los archivos identicos de los ambientes (y de los objetos que ya estan en el almacen) y los reemplaza por
+        enlaces duros a un objeto del almacen. Solo se calcula el hash de los archivos cuyo tamaño coincide con el de otro
+        archivo; los archivos que ya estan enlazados al almacen no se vuelven a leer.
+
+        El espacio recuperado se mide comparando los inodos de los ambientes y del almacen antes y despues: cuentan los
+        inodos que desaparecieron y cuyos enlaces estaban todos en esos directorios (no los que una instantanea o una
+        plantilla sigue enlazando), menos los objetos nuevos del almacen. Con dry_run es una estimacion con el mismo criterio.
+
+        :param venv_paths: Rutas de los ambientes virtuales.
+        :param dry_run: Indicador booleano, si es True solo calcula el espacio que se recuperaria.
+        :return: Objeto DedupReport.
+        """
+        start = time.perf_counter()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        store_device = os.stat(self.objects_dir).st_dev
+        objects = self._objects()
+
+        candidates, skipped, scanned, files_count, already_shared = [], [], [], 0, 0
+        for venv_path in venv_paths:
+            venv_path = os.path.abspath(venv_path)
+            if not os.path.isdir(venv_path):
+                skipped.append(f'{venv_path}: no existe')
+                continue
+            if os.stat(venv_path).st_dev != store_device:
+                skipped.append(f'{venv_path}: está en otro sistema de archivos que el almacén')
+                continue
+            files, shared = self._venv_files(venv_path, objects)
+            candidates.extend(files)
+            files_count += len(files) + shared
+            already_shared += shared
+            scanned.append(venv_path)
+        before = None if dry_run else self._inode_usage(scanned + [self.objects_dir])
+
+        # Solo pueden ser iguales los archivos con el mismo tamaño que otro archivo o que un objeto del almacen
+        by_size = collections.Counter(stat.st_size for _, stat in candidates)
+        store_sizes = {size for _, size, _ in objects.values()}
+        to_hash = [(path, stat) for path, stat in candidates if by_size[stat.st_size] > 1 or stat.st_size in store_sizes]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = list(executor.map(_file_digest, [path for path, _ in to_hash], chunksize=64))
+
+        groups = {}
+        for (path, stat), digest in zip(to_hash, digests):
+            if digest is not None:
+                groups.setdefault((digest, stat.st_mode & 0o7777), []).append((path, stat))
+
+        linked, bytes_reclaimed = 0, 0
+        for (digest, mode), members in groups.items():
+            object_path = self._object_path(digest, mode & ~0o222)
+            in_store = os.path.exists(object_path)
+            # Los archivos que ya comparten un solo inodo (por ejemplo clonados de una plantilla) no se copian al almacen
+            if not in_store and len({(stat.st_dev, stat.st_ino) for _, stat in members}) < 2:
+                continue
+            if in_store:
+                object_stat = os.lstat(object_path)
+                replaced = [(path, stat) for path, stat in members if (stat.st_dev, stat.st_ino) != (object_stat.st_dev, object_stat.st_ino)]
+            else:
+                replaced = members
+
+            # Estimacion para dry_run: el espacio de un inodo solo se recupera si se reemplazan todos sus enlaces (por
+            # ejemplo, no si una instantanea del ambiente tambien lo enlaza); un objeto nuevo ocupa el espacio de una copia
+            links = collections.Counter((stat.st_dev, stat.st_ino) for _, stat in replaced)
+            sizes = {(stat.st_dev, stat.st_ino): stat for _, stat in replaced}
+            bytes_reclaimed += sum(stat.st_size for inode, stat in sizes.items() if links[inode] >= stat.st_nlink)
+            if not in_store:
+                bytes_reclaimed -= members[0][1].st_size
+            if dry_run:
+                linked += len(replaced)
+                continue
+
+            if not in_store:
+                # El objeto es una copia propia: cambiar sus permisos no afecta a los inodos de los ambientes, que
+                # pueden estar enlazados tambien en plantillas o instantaneas
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                temp_path = f'{object_path}.{os.getpid()}.tmp'
+                shutil.copy2(members[0][0], temp_path)
+                if os.name != 'nt':
+                    os.chmod(temp_path, mode & ~0o222)
+                os.replace(temp_path, object_path)
+            for path, stat in replaced:
+                # El reemplazo es atomico: el archivo nunca deja de existir para los procesos del ambiente
+                temp_path = f'{path}.dedup-{os.getpid()}'
+                try:
+                    os.link(object_path, temp_path)
+                    os.replace(temp_path, path)
+                    linked += 1
+                except OSError:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(temp_path)
+
+        if not dry_run:
+            after = self._inode_usage(scanned + [self.objects_dir])
+            # Un inodo se libero si ya no aparece y todos sus enlaces estaban en los directorios recorridos
+            bytes_reclaimed = (sum(size for inode, (size, links, seen) in before.items() if inode not in after and seen >= links)
+                               - sum(size for inode, (size, _, _) in after.items() if inode not in before))
+            self._register_venvs(scanned)
+
+        objects = self._objects()
+        return DedupReport(
+            venvs=len(venv_paths) - len(skipped),
+            files=files_count,
+            hashed=len(to_hash),
+            linked=linked,
+            already_shared=already_shared,
+            bytes_reclaimed=bytes_reclaimed,
+            store_objects=len(objects),
+            store_bytes=sum(size for _, size, _ in objects.values()),
+            skipped=tuple(skipped),
+            elapsed=time.perf_counter() - start,
+        )
+
+    def detach(self, venv_path:str) -> int:
+        """
+        Reemplaza los enlaces al almacen de un ambiente por copias propias, por ejemplo antes de modificar a mano
+        archivos del site-packages.
+
+        :param venv_path: Ruta del ambiente virtual.
+        :return: Numero de archivos copiados.
+        """
+        objects = self._objects()
+        count = 0
+        for root, dirs, names in os.walk(os.path.abspath(venv_path)):
+            dirs[:] = [name for name in dirs if not os.path.islink(os.path.join(root, name))]
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.lstat(path)
+                if (stat.st_dev, stat.st_ino) in objects:
+                    temp_path = f'{path}.detach-{os.getpid()}'
+                    shutil.copyfile(path, temp_path)
+                    os.chmod(temp_path, stat.st_mode | 0o200)
+                    os.replace(temp_path, path)
+                    count += 1
+        return count
+
+    def collect_garbage(self, venv_paths:list[str]=None) -> tuple[int, int]:
+        """
+        Elimina los objetos que ya no usa ningun ambiente (por ejemplo despues de actualizar una libreria en todos).
+        Un objeto esta en uso si algun archivo de los ambientes registrados (los que se deduplicaron con este almacen) o
+        de venv_paths lo enlaza; los enlaces de instantaneas, plantillas u otros directorios no cuentan, por lo que
+        tambien se eliminan los objetos que solo enlazan las instantaneas.
+
+        :param venv_paths: Rutas de ambientes adicionales que se consideran en uso.
+        :return: Tupla (objetos eliminados, bytes liberados). Los objetos que una instantanea sigue enlazando no liberan
+            espacio hasta eliminar la instantanea.
+        """
+        venvs = sorted(set(self.registered_venvs()) | {os.path.abspath(path) for path in venv_paths or [] if os.path.isdir(path)})
+        live = self._inode_usage(venvs)
+        removed, freed = 0, 0
+        for inode, (path, size, links) in self._objects().items():
+            if inode not in live:
+                os.remove(path)
+                removed += 1
+                if links == 1:
+                    freed += size
+        return removed, freed
+
+
+# Funcion para mostrar el resultado de una pasada de deduplicacion
+def print_dedup_report(report:DedupReport):
+    """
+    :param report: Objeto DedupReport.
+    """
+    for reason in report.skipped:
+        print(f"Omitido {reason}")
+    print(f"{report.venvs} ambientes, {report.files} archivos, {report.hashed} con hash calculado en {report.elapsed:.2f} s.")
+    print(f"{report.linked} archivos enlazados al almacén ({report.already_shared} ya estaban compartidos).")
+    print(f"Espacio recuperado: {report.bytes_reclaimed / 1024 ** 2:.2f} MB. "
+          f"Almacén: {report.store_objects} objetos, {report.store_bytes / 1024 ** 2:.2f} MB.")
@@ -0,0 +1,100 @@
+"""
+Pruebas basicas de los almacenes de ambientes virtuales (Project_toolbox_stores).
+Los ambientes se crean con python -m venv --without-pip para que cada prueba tome pocos segundos.
+"""
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+
+from Project_toolbox_stores import VenvTemplateStore, VenvSnapshotStore, VenvDedupStore, _venv_python
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason='Las pruebas usan enlaces duros y rutas de Linux/macOS.')
+
+
+# Funcion para crear un ambiente minimo con una libreria falsa en su site-packages
+def make_venv(path, content='x = 1\n'):
+    subprocess.run([sys.executable, '-m', 'venv', '--without-pip', str(path)], check=True)
+    site_packages = subprocess.check_output([_venv_python(str(path)), '-c', 'import sysconfig; print(sysconfig.get_path("purelib"))'], text=True).strip()
+    os.makedirs(os.path.join(site_packages, 'demo'))
+    os.makedirs(os.path.join(site_packages, 'demo-1.0.dist-info'))
+    with open(os.path.join(site_packages, 'demo', '__init__.py'), 'w') as f:
+        f.write(content)
+    with open(os.path.join(site_packages, 'demo-1.0.dist-info', 'RECORD'), 'w') as f:
+        f.write('demo/__init__.py,,\n')
+    return site_packages
+
+
+def test_template_get_or_create_and_clone_rewrite_paths(tmp_path):
+    # El comando de venv pasa por run_command, que aqui evita instalar pip
+    store = VenvTemplateStore(str(tmp_path / 'templates'), link_mode='hardlink',
+                              run_command=lambda command: subprocess.run(command + ['--without-pip'], check=True))
+    template_path = store.get_or_create(sys.executable)
+    assert store.get_or_create(sys.executable) == template_path
+
+    target = tmp_path / 'project' / 'venv'
+    store.clone(template_path, str(target))
+
+    # Los scripts y pyvenv.cfg apuntan al clon, no a la plantilla
+    with open(target / 'bin' / 'activate') as f:
+        activate = f.read()
+    assert str(target) in activate and template_path not in activate
+    assert not os.path.exists(target / 'template.json')
+    prefix = subprocess.check_output([_venv_python(str(target)), '-c', 'import sys; print(sys.prefix)'], text=True).strip()
+    assert os.path.realpath(prefix) == os.path.realpath(target)
+
+
+def test_snapshot_restore_copies_in_place_files(tmp_path):
+    venv = tmp_path / 'venv'
+    site_packages = make_venv(venv)
+    store = VenvSnapshotStore(str(venv), link_mode='hardlink')
+    snapshot = store.create('antes', packages=['demo==1.0'])
+
+    module_path = os.path.join(site_packages, 'demo', '__init__.py')
+    record_path = os.path.join(site_packages, 'demo-1.0.dist-info', 'RECORD')
+    # Los archivos instalados se enlazan, los que se modifican en el lugar se copian
+    assert os.stat(module_path).st_nlink == 2
+    assert os.stat(record_path).st_nlink == 1
+
+    os.remove(module_path)
+    with open(record_path, 'a') as f:
+        f.write('demo/nuevo.py,,\n')
+
+    restored = store.restore(snapshot.id, current_packages=['demo==2.0'])
+    assert restored.id == snapshot.id
+    assert os.path.exists(module_path)
+    with open(record_path) as f:
+        assert f.read() == 'demo/__init__.py,,\n'
+    labels = {item.label: item for item in store.snapshots()}
+    assert labels[f'antes de restaurar {snapshot.id}'].packages == ('demo==2.0',)
+
+
+def test_dedup_link_detach_and_collect_garbage(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    content = 'value = 1\n' * 1000
+    first_module = os.path.join(make_venv(first, content), 'demo', '__init__.py')
+    second_module = os.path.join(make_venv(second, content), 'demo', '__init__.py')
+    store = VenvDedupStore(str(tmp_path / 'store'))
+
+    report = store.deduplicate([str(first), str(second)])
+    first_stat, second_stat = os.stat(first_module), os.stat(second_module)
+    assert (first_stat.st_dev, first_stat.st_ino) == (second_stat.st_dev, second_stat.st_ino)
+    assert not first_stat.st_mode & stat.S_IWUSR
+    assert report.bytes_reclaimed >= len(content)
+    assert sorted(store.registered_venvs()) == sorted([str(first), str(second)])
+
+    # Una segunda pasada no vuelve a enlazar nada
+    assert store.deduplicate([str(first), str(second)]).linked == 0
+
+    assert store.detach(str(first)) > 0
+    assert store.detach(str(second)) > 0
+    first_stat, second_stat = os.stat(first_module), os.stat(second_module)
+    assert first_stat.st_ino != second_stat.st_ino
+    assert first_stat.st_mode & stat.S_IWUSR
+    with open(first_module) as f:
+        assert f.read() == content
+
+    removed, _ = store.collect_garbage()
+    assert removed == report.store_objects